@@ -17,237 +17,30 @@ from typing import Dict, Any, Tuple, List
 import math
 import json
 import os 
+import time
+from payroll_engine import (
+    ANNUAL_CAPS, MX_IMSS_CAP_MONTHLY, COUNTRIES, STI_RANGES, STI_LEVEL_OPTIONS,
+    US_STATE_RATES, BR_INSS_TBL, BR_IRRF_TBL, CA_CPP_EI_DEFAULT, TAX_SCHEDULES, CA_PROVINCES, load_tables_data, get_sti_range,
+    calc_country_net, calc_employer_charges, calc_params,
+)
+from money_format import fmt_money, money_or_blank, fmt_percent, format_money, format_percent, format_cap
+from i18n import I18N_FALLBACK, available_languages, get_bundle, component_labels
+from compute_graph import ComputeGraph
+from scenario_store import get_store
+from hiring_optimizer import max_salary_plan, max_headcount_plan
+from prefetch import Prefetcher
+from workforce_upload import UploadJob
 
 st.set_page_config(page_title="Simulador de Salário Líquido", layout="wide")
 
 # ======================== HELPERS INICIAIS (Formatação - NOVO TOPO ABSOLUTO) =========================
-# Variável global temporária para o código do país, será definida na sidebar
-_COUNTRY_CODE_FOR_FMT = "Brasil" 
 INPUT_FORMAT = "%.2f" # Variável de formato para number_input (escopo global)
-
-def fmt_money(v: float, sym: str) -> str:
-    """Formata um float como moeda no padrão brasileiro (1.000,00) a partir do padrão en_US."""
-    # Formato padrão americano com separador de milhar (, ) e decimal ( . ), depois inverte para o BR/EUR
-    return f"{sym} {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def money_or_blank(v: float, sym: str) -> str:
-    """Retorna a string formatada ou vazia se o valor for zero."""
-    return "" if abs(v) < 1e-9 else fmt_money(v, sym)
-
-def fmt_percent(v: float) -> str:
-    """Formata um float como porcentagem."""
-    if v is None: return ""
-    return f"{v:.2f}%"
-
-def fmt_cap(cap_value: Any, sym: str = None) -> str:
-    """Formata tetos, lidando com UF (Chile) e moedas."""
-    global _COUNTRY_CODE_FOR_FMT 
-    country_code = _COUNTRY_CODE_FOR_FMT
-    if cap_value is None: return "—"
-    if isinstance(cap_value, str): return cap_value
-    if isinstance(cap_value, (int, float)):
-        if country_code == "Chile" and cap_value < 200: return f"~{cap_value:.1f} UF"
-        return fmt_money(cap_value, sym if sym else "")
-    return str(cap_value)
-
-# ======================== CONSTANTES e TETOS GLOBAIS =========================
-ANNUAL_CAPS = { "US_FICA": 168600.0, "US_SUTA_BASE": 7000.0, "CA_CPP_YMPEx1": 68500.0, "CA_CPP_YMPEx2": 73200.0, "CA_CPP_EXEMPT": 3500.0, "CA_EI_MIE": 63200.0, "CL_TETO_UF": 84.3, "CL_TETO_CESANTIA_UF": 126.6, }
-UMA_DIARIA_MX = 108.57
-MX_IMSS_CAP_MONTHLY = 25 * UMA_DIARIA_MX * 30.4
+UPLOAD_POLL_SECONDS = 0.5 # Intervalo de atualização do progresso do processamento de planilhas
+# Modo debug (?debug=1 na URL ou SIMULATOR_DEBUG=1): mostra os nós do grafo executados/reaproveitados
+DEBUG_MODE = st.query_params.get("debug") in ("1", "true") or os.environ.get("SIMULATOR_DEBUG") == "1"
 
 # ======================== CARREGAMENTO DE CONFIGS JSON LOCAIS =========================
-try:
-    CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
-except NameError:
-    CONFIG_DIR = "." 
-
-I18N_FILE = os.path.join(CONFIG_DIR, "i18n.json")
-COUNTRIES_FILE = os.path.join(CONFIG_DIR, "countries.json")
-STI_CONFIG_FILE = os.path.join(CONFIG_DIR, "sti_config.json")
-US_STATES_FILE = os.path.join(CONFIG_DIR, "us_state_tax_rates.json")
-COUNTRY_TABLES_FILE = os.path.join(CONFIG_DIR, "country_tables.json")
-BR_INSS_FILE = os.path.join(CONFIG_DIR, "br_inss.json")
-BR_IRRF_FILE = os.path.join(CONFIG_DIR, "br_irrf.json")
-
-
-def load_json(filepath, default_value={}):
-    if not os.path.exists(filepath):
-        return default_value
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        return default_value
-
-# --- Fallbacks Mínimos (COM TEXTOS ANUAIS AJUSTADOS) ---
-# ALTERAÇÃO: sidebar_title ajustado com quebra de linha e subtítulo
-I18N_FALLBACK = { 
-    "Português": { 
-        "sidebar_title": "Simulador de Remuneração<br><span style='font-size: 14px; font-weight: 400;'>Região das Américas</span>", 
-        "app_title": "Simulador de Salário Líquido e Custo do Empregador", 
-        "menu_calc": "Simulador de Remuneração", 
-        "menu_rules": "Regras de Contribuições", 
-        "menu_rules_sti": "Regras de Cálculo do STI", 
-        "menu_cost": "Custo do Empregador", 
-        "title_calc": "Simulador de Remuneração", 
-        "title_rules": "Regras de Contribuições", 
-        "title_rules_sti": "Regras de Cálculo do STI", 
-        "title_cost": "Custo do Empregador", 
-        "country": "País", 
-        "salary": "Salário Bruto", 
-        "state": "Estado (EUA)", 
-        "state_rate": "State Tax (%)", 
-        "dependents": "Dependentes (IR)", 
-        "bonus": "Bônus", # CORREÇÃO
-        "other_deductions": "Outras Deduções Mensais", 
-        "earnings": "Proventos", 
-        "deductions": "Descontos", 
-        "net": "Salário Líquido", 
-        "fgts_deposit": "Depósito FGTS", 
-        "tot_earnings": "Total de Proventos", 
-        "tot_deductions": "Total de Descontos", 
-        "valid_from": "Vigência", 
-        "rules_emp": "Contribuições do Empregado", 
-        "rules_er": "Contribuições do Empregador", 
-        "rules_table_desc": "Descrição", 
-        "rules_table_rate": "Alíquota (%)", 
-        "rules_table_base": "Base de Cálculo", 
-        "rules_table_obs": "Observações / Teto", 
-        "official_source": "Fonte Oficial", 
-        "employer_cost_total": "Custo Total do Empregador", 
-        "annual_comp_title": "Composição da Remuneração Total Bruta", # CORREÇÃO
-        "calc_params_title": "Parâmetros de Cálculo da Remuneração", 
-        "monthly_comp_title": "Remuneração Mensal Bruta e Líquida", 
-        "annual_salary": "Salário Anual", 
-        "annual_bonus": "Bônus", 
-        "annual_total": "Remuneração Total", 
-        "months_factor": "Meses considerados", "pie_title": "Distribuição Anual: Salário vs Bônus", "pie_chart_title_dist": "Distribuição da Remuneração Total", "reload": "Recarregar tabelas", "source_remote": "Tabelas remotas", "source_local": "Fallback local", "choose_country": "Selecione o país", "menu_title": "Menu", "language_title": "🌐 Idioma / Language / Idioma", "area": "Área (STI)", "level": "Career Level (STI)", "rules_expanded": "Detalhes das Contribuições Obrigatórias", "salary_tooltip": "Seu salário mensal antes de impostos e deduções.", "dependents_tooltip": "Número de dependentes para dedução no Imposto de Renda (aplicável apenas no Brasil).", 
-        "bonus_tooltip": "Valor total do bônus esperado no ano (pago de uma vez ou parcelado).", 
-        "other_deductions_tooltip": "Soma de outras deduções mensais recorrentes (ex: plano de saúde, vale-refeição, contribuição sindical).", "sti_area_tooltip": "Selecione sua área de atuação (Vendas ou Não Vendas) para verificar a faixa de bônus (STI).", "sti_level_tooltip": "Selecione seu nível de carreira para verificar a faixa de bônus (STI). 'Others' inclui níveis não listados.", "sti_area_non_sales": "Não Vendas", "sti_area_sales": "Vendas", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Membros do GEB", "sti_level_executive_manager": "Gerente Executivo", "sti_level_senior_group_manager": "Gerente de Grupo Sênior", "sti_level_group_manager": "Gerente de Grupo", "sti_level_lead_expert_program_manager": "Especialista Líder / Gerente de Programa", "sti_level_senior_manager": "Gerente Sênior", "sti_level_senior_expert_senior_project_manager": "Especialista Sênior / Gerente de Projeto Sênior", "sti_level_manager_selected_expert_project_manager": "Gerente / Especialista Selecionado / Gerente de Projeto", "sti_level_others": "Outros", "sti_level_executive_manager_senior_group_manager": "Gerente Executivo / Gerente de Grupo Sênior", "sti_level_group_manager_lead_sales_manager": "Gerente de Grupo / Gerente de Vendas Líder", "sti_level_senior_manager_senior_sales_manager": "Gerente Sênior / Gerente de Vendas Sênior", "sti_level_manager_selected_sales_manager": "Gerente / Gerente de Vendas Selecionado", "sti_in_range": "Dentro do range", "sti_out_range": "Fora do range", "cost_header_charge": "Encargo", "cost_header_percent": "Percentual (%)", "cost_header_base": "Base", "cost_header_obs": "Observação", "cost_header_bonus": "Incide Bônus", "cost_header_vacation": "Incide Férias", "cost_header_13th": "Incide 13º", "sti_table_header_level": "Nível de Carreira", "sti_table_header_pct": "STI %" 
-    }, 
-    "English": { 
-        "sidebar_title": "Compensation Simulator<br><span style='font-size: 14px; font-weight: 400;'>Americas Region</span>", 
-        "other_deductions": "Other Monthly Deductions", 
-        "salary_tooltip": "Your monthly salary before taxes and deductions.", 
-        "dependents_tooltip": "Number of dependents for Income Tax deduction (applicable only in Brazil).", 
-        "bonus_tooltip": "Total expected bonus amount for the year (paid lump sum or installments).", 
-        "other_deductions_tooltip": "Sum of other recurring monthly deductions (e.g., health plan, meal voucher, union dues).", 
-        "sti_area_tooltip": "Select your area (Sales or Non Sales) to check the bonus (STI) range.", 
-        "sti_level_tooltip": "Select your career level to check the bonus (STI) range. 'Others' includes unlisted levels.", 
-        "app_title": "Net Salary & Employer Cost Simulator", 
-        "menu_calc": "Compensation Simulator", 
-        "menu_rules": "Contribution Rules", 
-        "menu_rules_sti": "STI Calculation Rules", 
-        "menu_cost": "Employer Cost", 
-        "title_calc": "Compensation Simulator", 
-        "title_rules": "Contribution Rules", 
-        "title_rules_sti": "STI Calculation Rules", 
-        "title_cost": "Employer Cost", 
-        "country": "Country", 
-        "salary": "Gross Salary", 
-        "state": "State (USA)", 
-        "state_rate": "State Tax (%)", 
-        "dependents": "Dependents (Tax)", 
-        "bonus": "Bonus", # CORREÇÃO
-        "earnings": "Earnings", 
-        "deductions": "Deductions", 
-        "net": "Net Salary", 
-        "fgts_deposit": "FGTS Deposit", 
-        "tot_earnings": "Total Earnings", 
-        "tot_deductions": "Total Deductions", 
-        "valid_from": "Effective Date", 
-        "rules_emp": "Employee Contributions", 
-        "rules_er": "Employer Contributions", 
-        "rules_table_desc": "Description", 
-        "rules_table_rate": "Rate (%)", 
-        "rules_table_base": "Calculation Base", 
-        "rules_table_obs": "Notes / Cap", 
-        "official_source": "Official Source", 
-        "employer_cost_total": "Total Employer Cost", 
-        "annual_comp_title": "Total Gross Compensation", # CORREÇÃO
-        "annual_salary": "Annual Salary", 
-        "annual_bonus": "Bonus", 
-        "annual_total": "Total Compensation", 
-        "months_factor": "Months considered", "pie_title": "Annual Split: Salary vs Bonus", "pie_chart_title_dist": "Total Compensation Distribution", "reload": "Reload tables", "source_remote": "Remote tables", "source_local": "Local fallback", "choose_country": "Select a country", "menu_title": "Menu", "language_title": "🌐 Idioma / Language / Idioma", "area": "Area (STI)", "level": "Career Level (STI)", "rules_expanded": "Details of Mandatory Contributions", "sti_area_non_sales": "Non Sales", "sti_area_sales": "Sales", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Members of the GEB", "sti_level_executive_manager": "Executive Manager", "sti_level_senior_group_manager": "Senior Group Manager", "sti_level_group_manager": "Group Manager", "sti_level_lead_expert_program_manager": "Lead Expert / Program Manager", "sti_level_senior_manager": "Senior Manager", "sti_level_senior_expert_senior_project_manager": "Senior Expert / Senior Project Manager", "sti_level_manager_selected_expert_project_manager": "Manager / Selected Expert / Project Manager", "sti_level_others": "Others", "sti_level_executive_manager_senior_group_manager": "Executive Manager / Senior Group Manager", "sti_level_group_manager_lead_sales_manager": "Group Manager / Lead Sales Manager", "sti_level_senior_manager_senior_sales_manager": "Senior Manager / Senior Sales Manager", "sti_level_manager_selected_sales_manager": "Manager / Selected Sales Manager", "sti_in_range": "Within range", "sti_out_range": "Outside range", "cost_header_charge": "Charge", "cost_header_percent": "Percent (%)", "cost_header_base": "Base", "cost_header_obs": "Observation", "cost_header_bonus": "Applies to Bonus", "cost_header_vacation": "Applies to Vacation", "cost_header_13th": "Applies to 13th", "sti_table_header_level": "Career Level", "sti_table_header_pct": "STI %" 
-    }, 
-    "Español": { 
-        "sidebar_title": "Simulador de Remuneración<br><span style='font-size: 14px; font-weight: 400;'>Región Américas</span>", 
-        "other_deductions": "Otras Deducciones Mensuales", 
-        "salary_tooltip": "Su salario mensual antes de impuestos y deducciones.", 
-        "dependents_tooltip": "Número de dependientes para deducción en el Impuesto de Renta (solo aplicable en Brasil).", 
-        "bonus_tooltip": "Monto total del bono esperado en el año (pago único o en cuotas).", 
-        "other_deductions_tooltip": "Suma de otras deducciones mensuales recurrentes (ej: plan de salud, ticket de comida, cuota sindical).", 
-        "sti_area_tooltip": "Seleccione su área (Ventas o No Ventas) para verificar el rango del bono (STI).", 
-        "sti_level_tooltip": "Seleccione su nivel de carrera para verificar el rango del bono (STI). 'Otros' incluye niveles no listados.", 
-        "app_title": "Simulador de Salario Neto y Costo del Empleador", 
-        "menu_calc": "Simulador de Remuneração", 
-        "menu_rules": "Regras de Contribuições", 
-        "menu_rules_sti": "Regras de Cálculo del STI", 
-        "menu_cost": "Costo del Empleador", 
-        "title_calc": "Simulador de Remuneração", 
-        "title_rules": "Regras de Contribuições", 
-        "title_rules_sti": "Reglas de Cálculo del STI", 
-        "title_cost": "Costo del Empleador", 
-        "country": "País", 
-        "salary": "Salario Bruto", 
-        "state": "Estado (EE. UU.)", 
-        "state_rate": "Impuesto Estatal (%)", 
-        "dependents": "Dependientes (Impuesto)", 
-        "bonus": "Bono", # CORREÇÃO
-        "earnings": "Ingresos", 
-        "deductions": "Descuentos", 
-        "net": "Salario Neto", 
-        "fgts_deposit": "Depósito de FGTS", 
-        "tot_earnings": "Total Ingresos", 
-        "tot_deductions": "Total Descuentos", 
-        "valid_from": "Vigencia", 
-        "rules_emp": "Contribuições del Empleado", 
-        "rules_er": "Contribuições del Empleador", 
-        "rules_table_desc": "Descripción", 
-        "rules_table_rate": "Tasa (%)", 
-        "rules_table_base": "Base de Cálculo", 
-        "rules_table_obs": "Notas / Tope", 
-        "official_source": "Fuente Oficial", 
-        "employer_cost_total": "Costo Total del Empleador", 
-        "annual_comp_title": "Composição de la Remuneração Total Bruta", # CORREÇÃO
-        "annual_salary": "Salario Anual", 
-        "annual_bonus": "Bono", 
-        "annual_total": "Remuneração Total", 
-        "months_factor": "Meses considerados", "pie_title": "Distribuição Anual: Salario vs Bono", "pie_chart_title_dist": "Distribución de la Remuneração Total", "reload": "Recarregar tablas", "source_remote": "Tablas remotas", "source_local": "Copia local", "choose_country": "Seleccione un país", "menu_title": "Menú", "language_title": "🌐 Idioma / Language / Idioma", "area": "Área (STI)", "level": "Career Level (STI)", "rules_expanded": "Detalles de las Contribuições Obligatorias", "sti_area_non_sales": "No Ventas", "sti_area_sales": "Ventas", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Miembros del GEB", "sti_level_executive_manager": "Gerente Ejecutivo", "sti_level_senior_group_manager": "Gerente de Grupo Sénior", "sti_level_group_manager": "Gerente de Grupo", "sti_level_lead_expert_program_manager": "Experto Líder / Gerente de Programa", "sti_level_senior_manager": "Gerente Sénior", "sti_level_senior_expert_senior_project_manager": "Experto Sénior / Gerente de Proyecto Sénior", "sti_level_manager_selected_expert_project_manager": "Gerente / Experto Seleccionado / Gerente de Proyecto", "sti_level_others": "Otros", "sti_level_executive_manager_senior_group_manager": "Gerente Ejecutivo / Gerente de Grupo Sénior", "sti_level_group_manager_lead_sales_manager": "Gerente de Grupo / Gerente de Ventas Líder", "sti_level_senior_manager_senior_sales_manager": "Gerente Sénior / Gerente de Ventas Sénior", "sti_level_manager_selected_sales_manager": "Gerente / Gerente de Ventas Seleccionado", "sti_in_range": "Dentro del rango", "sti_out_range": "Fuera del rango", "cost_header_charge": "Encargo", "cost_header_percent": "Percentual (%)", "cost_header_base": "Base", "cost_header_obs": "Observação", "cost_header_bonus": "Incide Bono", "cost_header_vacation": "Incide Vacaciones", "cost_header_13th": "Incide 13º", "sti_table_header_level": "Nivel de Carrera", "sti_table_header_pct": "STI %" 
-    } 
-}
-COUNTRIES_FALLBACK = {"Brasil": {"symbol": "R$", "flag": "🇧🇷", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "México": {"symbol": "MX$", "flag": "🇲🇽", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Chile": {"symbol": "CLP$", "flag": "🇨🇱", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": False}}, "Argentina": {"symbol": "ARS$", "flag": "🇦🇷", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Colômbia": {"symbol": "COP$", "flag": "🇨🇴", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Estados Unidos": {"symbol": "US$", "flag": "🇺🇸", "valid_from": "2025-01-01", "benefits": {"ferias": False, "decimo": False}}, "Canadá": {"symbol": "CAD$", "flag": "🇨🇦", "valid_from": "2025-01-01", "benefits": {"ferias": False, "decimo": False}}}
-STI_CONFIG_FALLBACK = {"STI_RANGES": { "Non Sales": { "CEO": [1.00, 1.00], "Members of the GEB": [0.50, 0.80], "Executive Manager": [0.45, 0.70], "Senior Group Manager": [0.40, 0.60], "Group Manager": [0.30, 0.50], "Lead Expert / Program Manager": [0.25, 0.40], "Senior Manager": [0.20, 0.40], "Senior Expert / Senior Project Manager": [0.15, 0.35], "Manager / Selected Expert / Project Manager": [0.10, 0.30], "Others": [0.0, 0.10] }, "Sales": { "Executive Manager / Senior Group Manager": [0.45, 0.70], "Group Manager / Lead Sales Manager": [0.35, 0.50], "Senior Manager / Senior Sales Manager": [0.25, 0.45], "Manager / Selected Sales Manager": [0.20, 0.35], "Others": [0.0, 0.15] } }, "STI_LEVEL_OPTIONS": { "Non Sales": [ "CEO", "Members of the GEB", "Executive Manager", "Senior Group Manager", "Group Manager", "Lead Expert / Program Manager", "Senior Manager", "Senior Expert / Senior Project Manager", "Manager / Selected Expert / Project Manager", "Others" ], "Sales": [ "Executive Manager / Senior Group Manager", "Group Manager / Lead Sales Manager", "Senior Manager / Senior Sales Manager", "Manager / Selected Sales Manager", "Others" ]}}
-BR_INSS_FALLBACK = { "vigencia": "2025-01-01", "teto_contribuicao": 1146.68, "teto_base": 8157.41, "faixas": [ {"ate": 1412.00, "aliquota": 0.075}, {"ate": 2666.68, "aliquota": 0.09}, {"ate": 4000.03, "aliquota": 0.12}, {"ate": 8157.41, "aliquota": 0.14} ] }
-BR_IRRF_FALLBACK = { "vigencia": "2025-01-01", "deducao_dependente": 189.59, "faixas": [ {"ate": 2259.20, "aliquota": 0.00, "deducao": 0.00}, {"ate": 2826.65, "aliquota": 0.075, "deducao": 169.44}, {"ate": 3751.05, "aliquota": 0.15, "deducao": 381.44}, {"ate": 4664.68, "aliquota": 0.225, "deducao": 662.77}, {"ate": 999999999.0, "aliquota": 0.275, "deducao": 896.00} ] }
-
-
-# --- Carrega Configurações ---
-I18N = load_json(I18N_FILE, I18N_FALLBACK)
-COUNTRIES_DATA = load_json(COUNTRIES_FILE, COUNTRIES_FALLBACK)
-STI_CONFIG_DATA = load_json(STI_CONFIG_FILE, STI_CONFIG_FALLBACK)
-US_STATE_RATES = load_json(US_STATES_FILE, {}) 
-BR_INSS_TBL = load_json(BR_INSS_FILE, BR_INSS_FALLBACK)
-BR_IRRF_TBL = load_json(BR_IRRF_FILE, BR_IRRF_FALLBACK)
-COUNTRY_TABLES_DATA = load_json(COUNTRY_TABLES_FILE, {})
-
-# --- Extrai Dados Carregados ---
-COUNTRIES = COUNTRIES_DATA if COUNTRIES_DATA else COUNTRIES_FALLBACK 
-if not COUNTRIES: COUNTRIES = COUNTRIES_FALLBACK 
-
-if not STI_CONFIG_DATA or "STI_RANGES" not in STI_CONFIG_DATA:
-    STI_RANGES = STI_CONFIG_FALLBACK.get("STI_RANGES", {})
-    STI_LEVEL_OPTIONS = STI_CONFIG_FALLBACK.get("STI_LEVEL_OPTIONS", {})
-else:
-    STI_RANGES = STI_CONFIG_DATA.get("STI_RANGES", {})
-    STI_LEVEL_OPTIONS = STI_CONFIG_DATA.get("STI_LEVEL_OPTIONS", {})
-
-
-COUNTRY_BENEFITS = {k: v.get("benefits", {}) for k, v in COUNTRIES.items()}
-TABLES_DEFAULT = COUNTRY_TABLES_DATA.get("TABLES", {})
-EMPLOYER_COST_DEFAULT = COUNTRY_TABLES_DATA.get("EMPLOYER_COST", {})
-REMUN_MONTHS_DEFAULT = COUNTRY_TABLES_DATA.get("REMUN_MONTHS", {})
-CA_CPP_EI_DEFAULT = { "cpp_rate": 0.0595, "cpp_exempt_monthly": ANNUAL_CAPS["CA_CPP_EXEMPT"] / 12.0, "cpp_cap_monthly": ANNUAL_CAPS["CA_CPP_YMPEx1"] / 12.0, "cpp2_rate": 0.04, "cpp2_cap_monthly": ANNUAL_CAPS["CA_CPP_YMPEx2"] / 12.0, "ei_rate": 0.0163, "ei_cap_monthly": ANNUAL_CAPS["CA_EI_MIE"] / 12.0 }
+# Constantes, tetos, tabelas fiscais e funções de cálculo ficam em payroll_engine.py
 
 STI_I18N_KEYS = {
     "CEO": "sti_level_ceo",
@@ -266,133 +59,9 @@ STI_I18N_KEYS = {
     "Manager / Selected Sales Manager": "sti_level_manager_selected_sales_manager"
 }
 
-def load_tables_data(): 
-    country_tables_dict = {
-        "TABLES": COUNTRY_TABLES_DATA.get("TABLES", TABLES_DEFAULT),
-        "EMPLOYER_COST": COUNTRY_TABLES_DATA.get("EMPLOYER_COST", EMPLOYER_COST_DEFAULT),
-        "REMUN_MONTHS": COUNTRY_TABLES_DATA.get("REMUN_MONTHS", REMUN_MONTHS_DEFAULT)
-    }
-    return US_STATE_RATES, country_tables_dict, BR_INSS_TBL, BR_IRRF_TBL
-
-
-# ======================== FUNÇÕES DE CÁLCULO E AUXÍLIO (Movidas para o topo) =========================
-
-def get_sti_range(area: str, level: str) -> Tuple[float, float]:
-    area_tbl = STI_RANGES.get(area, {}) 
-    rng = area_tbl.get(level)
-    return rng if rng else (0.0, None)
-
-def calc_inss_progressivo(salario: float, inss_tbl: Dict[str, Any]) -> float:
-    if not isinstance(inss_tbl, dict): return 0.0
-    contrib = 0.0; limite_anterior = 0.0
-    for faixa in inss_tbl.get("faixas", []):
-        teto_faixa = float(faixa["ate"]); aliquota = float(faixa["aliquota"])
-        if salario > limite_anterior:
-            base_faixa = min(salario, teto_faixa) - limite_anterior
-            contrib += base_faixa * aliquota
-            limite_anterior = teto_faixa
-        else: break
-    teto = inss_tbl.get("teto_contribuicao", None) 
-    if teto is not None: contrib = min(contrib, float(teto))
-    return max(contrib, 0.0)
-
-def calc_irrf(base: float, dep: int, irrf_tbl: Dict[str, Any]) -> float:
-    if not isinstance(irrf_tbl, dict): return 0.0
-    ded_dep = float(irrf_tbl.get("deducao_dependente", 0.0))
-    base_calc = max(base - ded_dep * max(int(dep), 0), 0.0)
-    for faixa in irrf_tbl.get("faixas", []):
-        if base_calc <= float(faixa["ate"]):
-            aliq = float(faixa["aliquota"]); ded = float(faixa.get("deducao", 0.0))
-            return max(base_calc * aliq - ded, 0.0)
-    return 0.0
-
-def br_net(salary: float, dependentes: int, other_deductions: float, br_inss_tbl: Dict[str, Any], br_irrf_tbl: Dict[str, Any]):
-    lines = []; total_earn = salary
-    inss = calc_inss_progressivo(salary, br_inss_tbl)
-    base_ir = max(salary - inss, 0.0)
-    irrf = calc_irrf(base_ir, dependentes, br_irrf_tbl)
-    lines.append(("Salário Base", salary, 0.0)); lines.append(("INSS", 0.0, inss)); lines.append(("IRRF", 0.0, irrf))
-    if other_deductions > 0: lines.append(("Outras Deduções", 0.0, other_deductions))
-    total_ded = inss + irrf + other_deductions
-    fgts_value = salary * 0.08; net = total_earn - total_ded
-    return lines, total_earn, total_ded, net, fgts_value
-
-def generic_net(salary: float, other_deductions: float, rates: Dict[str, float], country_code: str):
-    lines = [("Base", salary, 0.0)]; total_earn = salary; total_ded = 0.0
-    for k, aliq in rates.items():
-        v = salary * float(aliq); total_ded += v; lines.append((k, 0.0, v))
-    if other_deductions > 0: lines.append(("Outras Deduções", 0.0, other_deductions))
-    total_ded += other_deductions
-    net = total_earn - total_ded
-    return lines, total_earn, total_ded, net
-
-def us_net(salary: float, other_deductions: float, state_code: str, state_rate: float):
-    FICA_WAGE_BASE_MONTHLY = ANNUAL_CAPS["US_FICA"] / 12.0
-    lines = [("Base Pay", salary, 0.0)]; total_earn = salary
-    salario_base_fica = min(salary, FICA_WAGE_BASE_MONTHLY); fica = salario_base_fica * 0.062
-    medic = salary * 0.0145; total_ded = fica + medic
-    lines += [("FICA (Social Security)", 0.0, fica), ("Medicare", 0.0, medic)]
-    if state_code:
-        sr = state_rate if state_rate is not None else 0.0
-        if sr > 0: sttax = salary * sr; total_ded += sttax; lines.append((f"State Tax ({state_code})", 0.0, sttax))
-    if other_deductions > 0: lines.append(("Other Deductions", 0.0, other_deductions))
-    total_ded += other_deductions
-    net = total_earn - total_ded
-    return lines, total_earn, total_ded, net
-
-def ca_net(salary: float, other_deductions: float, ca_tbl: Dict[str, Any]):
-    lines = [("Base Pay", salary, 0.0)]; total_earn = salary
-    cpp_base = max(0, min(salary, ca_tbl["cpp_cap_monthly"]) - ca_tbl["cpp_exempt_monthly"]); cpp = cpp_base * ca_tbl["cpp_rate"]
-    cpp2_base = max(0, min(salary, ca_tbl["cpp2_cap_monthly"]) - ca_tbl["cpp_cap_monthly"]); cpp2 = cpp2_base * ca_tbl["cpp2_rate"]
-    ei_base = min(salary, ca_tbl["ei_cap_monthly"]); ei = ei_base * ca_tbl["ei_rate"]
-    income_tax = salary * 0.15 
-    total_ded = cpp + cpp2 + ei + income_tax
-    lines.append(("CPP", 0.0, cpp)); lines.append(("CPP2", 0.0, cpp2)); lines.append(("EI", 0.0, ei)); lines.append(("Income Tax (Est.)", 0.0, income_tax))
-    if other_deductions > 0: lines.append(("Other Deductions", 0.0, other_deductions))
-    total_ded += other_deductions
-    net = total_earn - total_ded
-    return lines, total_earn, total_ded, net
-
-def mx_net(salary: float, other_deductions: float, tables_ext: Dict[str, Any]):
-    lines = [("Base", salary, 0.0)]; total_earn = salary; total_ded = 0.0
-    rates = tables_ext.get("TABLES", {}).get("México", {}).get("rates", {}) or TABLES_DEFAULT.get("México", {}).get("rates", {})
-
-    imss_rate = rates.get("IMSS_Simplificado", 0.05) or rates.get("IMSS", 0.05) 
-    isr_rate = rates.get("ISR_Simplificado", 0.15) or rates.get("ISR", 0.15)   
-
-    imss_base = min(salary, MX_IMSS_CAP_MONTHLY)
-    imss = imss_base * imss_rate; total_ded += imss
-    lines.append(("IMSS (Est.)", 0.0, imss))
-    
-    isr = (salary - imss) * isr_rate 
-    total_ded += isr
-    lines.append(("ISR (Est.)", 0.0, isr))
-    if other_deductions > 0: lines.append(("Otras Deducciones", 0.0, other_deductions))
-    total_ded += other_deductions
-    net = total_earn - total_ded
-    return lines, total_earn, total_ded, net
-
-def calc_country_net(country_code: str, salary: float, other_deductions: float, state_code=None, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None):
-    if country_code == "Brasil":
-        lines, te, td, net, fgts = br_net(salary, dependentes, other_deductions, br_inss_tbl, br_irrf_tbl)
-        return {"lines": lines, "total_earn": te, "total_ded": td, "net": net, "fgts": fgts}
-    elif country_code == "Estados Unidos":
-        lines, te, td, net = us_net(salary, other_deductions, state_code, state_rate)
-        return {"lines": lines, "total_earn": te, "total_ded": td, "net": net, "fgts": 0.0}
-    elif country_code == "Canadá":
-        lines, te, td, net = ca_net(salary, other_deductions, CA_CPP_EI_DEFAULT)
-        return {"lines": lines, "total_earn": te, "total_ded": td, "net": net, "fgts": 0.0}
-    elif country_code == "México":
-        lines, te, td, net = mx_net(salary, other_deductions, tables_ext)
-        return {"lines": lines, "total_earn": te, "total_ded": td, "net": net, "fgts": 0.0}
-    else:
-        rates = (tables_ext or {}).get("TABLES", {}).get(country_code, {}).get("rates", {})
-        if not rates: rates = TABLES_DEFAULT.get(country_code, {}).get("rates", {})
-        lines, te, td, net = generic_net(salary, other_deductions, rates, country_code)
-        return {"lines": lines, "total_earn": te, "total_ded": td, "net": net, "fgts": 0.0}
+# ======================== FUNÇÕES DE EXIBIÇÃO E AUXÍLIO =========================
 
 def calc_employer_cost(country_code: str, salary: float, bonus: float, T: Dict[str, str], tables_ext=None):
-    months = (tables_ext or {}).get("REMUN_MONTHS", {}).get(country_code, 12.0)
     enc_list = tables_ext.get("EMPLOYER_COST", {}).get(country_code, [])
     
     country_info = COUNTRIES.get(country_code, {})
@@ -404,39 +73,118 @@ def calc_employer_cost(country_code: str, salary: float, bonus: float, T: Dict[s
         df_display = df.copy()
         df_display[T["cost_header_charge"]] = df_display["nome"]
         df_display["percentual"] = df_display["percentual"].astype(float) 
-        df_display[T["cost_header_percent"]] = df_display["percentual"].apply(lambda p: f"{p:.2f}%")
+        df_display[T["cost_header_percent"]] = format_percent(df_display["percentual"].to_numpy())
         df_display[T["cost_header_base"]] = df_display["base"]
         
-        df_display[T["cost_header_obs"]] = df_display.apply(
-            lambda row: fmt_cap(row.get('teto'), symbol_local) if row.get('teto') is not None else row.get('obs', '—'), 
-            axis=1
-        )
+        teto = df_display["teto"].tolist() if "teto" in df_display else [None] * len(df_display)
+        obs = df_display["obs"].tolist() if "obs" in df_display else ["—"] * len(df_display)
+        caps = format_cap(teto, symbol_local, country_code)
+        df_display[T["cost_header_obs"]] = [c if t is not None else o for c, t, o in zip(caps, teto, obs)]
         df_display[T["cost_header_bonus"]] = ["✅" if b else "❌" for b in df_display["bonus"]]
         cols = [T["cost_header_charge"], T["cost_header_percent"], T["cost_header_base"], T["cost_header_bonus"], T["cost_header_obs"]]
         if benefits.get("ferias", False): df_display[T["cost_header_vacation"]] = ["✅" if b else "❌" for b in df_display["ferias"]]; cols.insert(3, T["cost_header_vacation"])
         if benefits.get("decimo", False): df_display[T["cost_header_13th"]] = ["✅" if b else "❌" for b in df_display["decimo"]]; insert_pos = 4 if benefits.get("ferias", False) else 3; cols.insert(insert_pos, T["cost_header_13th"])
         df_display = df_display[cols]
     
-    salario_anual_base = salary * 12.0; salario_anual_beneficios = salary * months; total_cost_items = []
-    
-    for index, item in df.iterrows():
-        perc = item.get("percentual", 0.0) / 100.0; teto = item.get("teto"); incide_bonus = item.get("bonus", False)
-        base_calc_anual = salario_anual_base if country_code in ["Estados Unidos", "Canadá"] else salario_anual_beneficios
-        if incide_bonus: base_calc_anual += bonus
-        
-        if teto is not None and isinstance(teto, (int, float)):
-            if country_code == "Canadá": 
-                 if item.get("nome") == "CPP2 (ER)": base_calc_anual = max(0, min(base_calc_anual, ANNUAL_CAPS["CA_CPP_YMPEx2"]) - ANNUAL_CAPS["CA_CPP_YMPEx1"])
-                 else: base_calc_anual = min(base_calc_anual, teto)
-            else: 
-                base_calc_anual = min(base_calc_anual, teto)
-        
-        custo_item = base_calc_anual * perc; total_cost_items.append(custo_item)
-        
-    total_encargos = sum(total_cost_items); custo_total_anual = (salary * months) + bonus + total_encargos
-    mult = (custo_total_anual / salario_anual_base) if salario_anual_base > 0 else 0.0
+    custo_total_anual, mult, months = calc_employer_charges(country_code, salary, bonus, tables_ext)
     return custo_total_anual, mult, df_display, months
 
+def render_monthly(calc, T: Dict[str, str], lang: str, symbol: str, country: str) -> Dict[str, Any]:
+    """Tabela HTML e cards do demonstrativo mensal (sem chamadas ao Streamlit: roda também no pré-cálculo)."""
+    # Rótulos traduzidos só aqui, na exibição; o resultado do cálculo guarda apenas códigos
+    df_detalhe = pd.DataFrame(calc.lines(component_labels(lang)), columns=["Descrição", T.get("earnings","Earnings"), T.get("deductions","Deductions")])
+    df_detalhe[T.get("earnings","Earnings")] = format_money(df_detalhe[T.get("earnings","Earnings")].to_numpy(), symbol, blank_zero=True)
+    df_detalhe[T.get("deductions","Deductions")] = format_money(df_detalhe[T.get("deductions","Deductions")].to_numpy(), symbol, blank_zero=True)
+    # 5) FORMATANDO TABELA MENSAL (CONVERTENDO PARA HTML E INJETANDO COM CSS)
+    # O DataFrame deve ser convertido para HTML com o índice DESABILITADO.
+    table_html = df_detalhe.to_html(index=False, classes='monthly-table')
+    cards = [
+        f"<div class='metric-card card-earn'><h4>💰 {T.get('tot_earnings','Total Earnings')}</h4><h3>{fmt_money(calc['total_earn'], symbol)}</h3></div>",
+        f"<div class='metric-card card-ded'><h4>📉 {T.get('tot_deductions','Total Deductions')}</h4><h3>{fmt_money(calc['total_ded'], symbol)}</h3></div>",
+        f"<div class='metric-card card-net'><h4>💵 {T.get('net','Net Salary')}</h4><h3>{fmt_money(calc['net'], symbol)}</h3></div>",
+    ]
+    fgts_html = f"""
+        <div style="margin-top: 10px; padding: 5px 0;">
+            <p style="font-size: 17px; font-weight: 600; color: #0a3d62; margin: 0;">
+                💼 {T.get('fgts_deposit','Depósito FGTS')}: {fmt_money(calc['fgts'], symbol)}
+            </p>
+        </div>
+        """ if country == "Brasil" else None
+    return {"table_html": table_html, "cards": cards, "fgts_html": fgts_html}
+
+def build_chart(T: Dict[str, str], salario_anual: float, bonus_anual: float):
+    """Gráfico de pizza salário x bônus anual."""
+    chart_df = pd.DataFrame({
+        # Usa os rótulos atualizados do I18N
+        "Componente": [T.get('annual_salary'), T.get('annual_bonus')], 
+        "Valor": [salario_anual, bonus_anual]
+    })
+
+    base = alt.Chart(chart_df).transform_joinaggregate(
+        Total='sum(Valor)'
+    ).transform_calculate(
+        Percent='datum.Valor / datum.Total',
+        # Usando a template string nativa para formar o rótulo
+        Label=alt.expr.if_(alt.datum.Valor > alt.datum.Total * 0.05, 
+                            alt.datum.Componente + " (" + alt.expr.format(alt.datum.Percent, ".1%") + ")", 
+                            "") 
+    )
+    
+    pie = base.mark_arc(outerRadius=120, innerRadius=80, cornerRadius=2).encode(
+        theta=alt.Theta("Valor:Q", stack=True),
+        color=alt.Color("Componente:N", legend=None), # Remove a legenda
+        order=alt.Order("Percent:Q", sort="descending"),
+        tooltip=[alt.Tooltip("Componente:N"), alt.Tooltip("Valor:Q", format=",.2f")]
+    )
+    
+    text = base.mark_text(radius=140).encode(
+        text=alt.Text("Label:N"),
+        theta=alt.Theta("Valor:Q", stack=True),
+        order=alt.Order("Percent:Q", sort="descending"),
+        color=alt.value("black") 
+    )
+
+    return alt.layer(pie, text).properties(
+        title=T.get("pie_chart_title_dist", "Distribuição da Remuneração Total")
+    ).configure_view(
+        strokeWidth=0
+    ).configure_title(
+        fontSize=17, anchor='middle', color='#0a3d62'
+    )
+
+# Pré-cálculo especulativo (prefetch.py): enquanto um país está aberto, os outros são calculados em segundo plano
+# com as mesmas entradas. As chaves abaixo são as mesmas no script e na thread, então só há acerto com entradas idênticas.
+def net_inputs(country_code: str, salario: float, other_deductions: float, state_code, state_rate, dependentes: int) -> Tuple:
+    """Entradas do cálculo líquido (chave do nó "net" do grafo e do cache de pré-cálculo)."""
+    return (country_code, salario, other_deductions, state_code, state_rate, dependentes, id(COUNTRY_TABLES), id(BR_INSS_TBL), id(BR_IRRF_TBL))
+
+def compute_net(inputs: Tuple):
+    country_code, salario, other_deductions, state_code, state_rate, dependentes = inputs[:6]
+    return calc_country_net(country_code, salario, other_deductions, state_code=state_code, state_rate=state_rate, dependentes=dependentes,
+                            tables_ext=COUNTRY_TABLES, br_inss_tbl=BR_INSS_TBL, br_irrf_tbl=BR_IRRF_TBL)
+
+def speculative_net_inputs(country_code: str) -> Tuple[Any, Any, int]:
+    """(estado/província, alíquota estadual, dependentes) com os valores padrão dos campos específicos do país."""
+    if country_code == "Estados Unidos" and US_STATE_RATES:
+        state = next(iter(US_STATE_RATES)); return state, float(US_STATE_RATES.get(state, 0.0)), 0
+    if country_code == "Canadá" and CA_PROVINCES: return ("ON" if "ON" in CA_PROVINCES else CA_PROVINCES[0]), None, 0
+    return None, None, 0
+
+def simulator_tasks(country_code: str, salario: float, other_deductions: float, bonus_anual: float, T: Dict[str, str], lang: str, prefetch: Prefetcher) -> List[Tuple]:
+    """Tarefas de pré-cálculo do simulador de um país: líquido, demonstrativo mensal renderizado e gráfico anual."""
+    inputs = net_inputs(country_code, salario, other_deductions, *speculative_net_inputs(country_code))
+    sym = COUNTRIES.get(country_code, {}).get("symbol", "")
+    salario_anual = salario * COUNTRY_TABLES.get("REMUN_MONTHS", {}).get(country_code, 12.0)
+    def monthly():
+        calc = prefetch.peek(("net",) + inputs)
+        return render_monthly(calc if calc is not None else compute_net(inputs), T, lang, sym, country_code)
+    return [(("net",) + inputs, lambda: compute_net(inputs)),
+            (("monthly_view", lang, sym) + inputs, monthly),
+            (("chart", lang, salario_anual, bonus_anual), lambda: build_chart(T, salario_anual, bonus_anual))]
+
+def cost_key(country_code: str, salario: float, bonus_anual: float, lang: str) -> Tuple:
+    return ("cost", country_code, salario, bonus_anual, lang, id(COUNTRY_TABLES))
+
 def get_sti_area_map(T: Dict[str, str]) -> Tuple[List[str], Dict[str, str]]:
     display_list = [T.get("sti_area_non_sales", "Non Sales"), T.get("sti_area_sales", "Sales")]; keys = ["Non Sales", "Sales"]
     return display_list, dict(zip(display_list, keys))
@@ -446,6 +194,26 @@ def get_sti_level_map(area: str, T: Dict[str, str]) -> Tuple[List[str], Dict[str
     display_list = [T.get(STI_I18N_KEYS.get(key, key), key) for key in keys]
     return display_list, dict(zip(display_list, keys))
 
+def load_scenario_inputs(scenario_id: int, T: Dict[str, str]):
+    """Callback do botão "Carregar": copia as entradas salvas para os widgets antes do próximo rerun."""
+    saved = get_store().get(scenario_id)
+    if saved is None: return
+    inputs = saved["inputs"]; ss = st.session_state
+    ss.salary_input = float(inputs.get("salary", 0.0)); ss.bonus_input = float(inputs.get("bonus", 0.0))
+    ss.other_ded_input = float(inputs.get("other_deductions", 0.0))
+    if saved["country"] == "Brasil": ss.dep_input = int(inputs.get("dependents", 0) or 0)
+    elif saved["country"] == "Estados Unidos" and inputs.get("state_code") in US_STATE_RATES:
+        ss.state_select_main = inputs["state_code"]
+        if inputs.get("state_rate") is not None: ss.state_rate_input = float(inputs["state_rate"])
+    elif saved["country"] == "Canadá" and inputs.get("state_code") in CA_PROVINCES: ss.province_select = inputs["state_code"]
+    _, area_map = get_sti_area_map(T)
+    area_display = {v: k for k, v in area_map.items()}.get(saved["sti_area"])
+    if area_display is not None:
+        ss.sti_area = area_display
+        level_display = {v: k for k, v in get_sti_level_map(saved["sti_area"], T)[1].items()}.get(saved["sti_level"])
+        if level_display is not None: ss.sti_level = level_display
+    ss._scenario_loaded = (saved["name"], saved["stale"])
+
 # ============================== CSS (REFINADO E SIMPLIFICADO + TABELA) ================================
 st.markdown("""
 <style>
@@ -605,7 +373,7 @@ section[data-testid="stSidebar"] .stRadio div[role="radiogroup"] label span { co
 # ============================== SIDEBAR (MANTIDO) ===============================
 with st.sidebar:
     # 1. TÍTULO PRINCIPAL (Ordem Corrigida)
-    T_temp = I18N.get(st.session_state.get('idioma', 'Português'), I18N_FALLBACK["Português"])
+    T_temp = get_bundle(st.session_state.get('idioma', 'Português'))
     # ALTERAÇÃO: Título da sidebar formatado com H2 e estilo para aceitar a quebra de linha do HTML e garantir que a barra azul não fique justa.
     st.markdown(f"""
         <h2 style='color:white; text-align:center; font-size:20px; line-height: 1.3; margin-bottom: 25px;'>
@@ -621,13 +389,13 @@ with st.sidebar:
         
     idioma = st.selectbox(
         label="Language Select", 
-        options=list(I18N.keys()), 
-        index=list(I18N.keys()).index(st.session_state.idioma), 
+        options=available_languages(), 
+        index=available_languages().index(st.session_state.idioma), 
         key="lang_select", 
         label_visibility="collapsed"
     )
     
-    T = I18N.get(idioma, I18N_FALLBACK["Português"])
+    T = get_bundle(idioma)
     
     if idioma != st.session_state.idioma:
         st.session_state.idioma = idioma
@@ -655,14 +423,13 @@ with st.sidebar:
     
     country_selected = st.selectbox(T.get("choose_country", "Selecione"), country_options, index=country_index, key="country_select", label_visibility="collapsed")
     
-    _COUNTRY_CODE_FOR_FMT = country_selected
     if country_selected != st.session_state.country_select:
         st.session_state.country_select = country_selected
         st.experimental_rerun() 
 
     # 4. MENU DE NAVEGAÇÃO
     st.markdown(f"<h3 style='margin-top: 1.5rem; margin-bottom: 0.5rem;'>{T.get('menu_title', 'Menu')}</h3>", unsafe_allow_html=True)
-    menu_options = [T.get("menu_calc", "Calc"), T.get("menu_rules", "Rules"), T.get("menu_rules_sti", "STI Rules"), T.get("menu_cost", "Cost")]
+    menu_options = [T.get("menu_calc", "Calc"), T.get("menu_rules", "Rules"), T.get("menu_rules_sti", "STI Rules"), T.get("menu_cost", "Cost"), T.get("menu_upload", "Upload"), T.get("menu_hiring", "Hiring")]
 
     if 'active_menu' not in st.session_state or st.session_state.active_menu not in menu_options:
         st.session_state.active_menu = menu_options[0]
@@ -686,7 +453,7 @@ with st.sidebar:
 
 # ======================= INICIALIZAÇÃO PÓS-SIDEBAR (MANTIDO) =======================
 if 'idioma' in st.session_state:
-    T = I18N.get(st.session_state.idioma, I18N_FALLBACK["Português"])
+    T = get_bundle(st.session_state.idioma)
 else:
     T = I18N_FALLBACK["Português"]
 
@@ -712,6 +479,8 @@ except KeyError as e:
 if active_menu == T.get("menu_calc"): title = T.get("title_calc", "Calculator")
 elif active_menu == T.get("menu_rules"): title = T.get("title_rules", "Rules")
 elif active_menu == T.get("menu_rules_sti"): title = T.get("title_rules_sti", "STI Rules")
+elif active_menu == T.get("menu_hiring"): title = T.get("title_hiring", "Hiring Budget")
+elif active_menu == T.get("menu_upload"): title = T.get("title_upload", "Upload")
 else: title = T.get("title_cost", "Cost")
 
 st.markdown(f"<div class='country-header'><div class='country-title'>{title}</div><div class='country-flag'>{flag}</div></div>", unsafe_allow_html=True)
@@ -793,7 +562,8 @@ if active_menu == T.get("menu_calc"):
         salario = c1.number_input("Salário", min_value=0.0, value=10000.0, step=100.0, key="salary_input", help=T.get("salary_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
         state_code = c2.selectbox("Estado", list(US_STATE_RATES.keys()), index=0, key="state_select_main", help=T.get("state"), label_visibility="collapsed")
         default_rate = float(US_STATE_RATES.get(state_code, 0.0))
-        state_rate = c3.number_input("Taxa Estadual", min_value=0.0, max_value=0.20, value=default_rate, step=0.001, format="%.3f", key="state_rate_input", help=T.get("state_rate"), label_visibility="collapsed")
+        # Estados com tabela progressiva (tax_brackets.json) não usam a alíquota fixa
+        state_rate = c3.number_input("Taxa Estadual", min_value=0.0, max_value=0.20, value=default_rate, step=0.001, format="%.3f", key="state_rate_input", help=T.get("state_rate"), label_visibility="collapsed", disabled=f"US-{state_code}" in TAX_SCHEDULES)
         other_deductions = c4.number_input("Outras Ded.", min_value=0.0, value=0.0, step=10.0, key="other_ded_input", help=T.get("other_deductions_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
         bonus_anual = c5.number_input("Bônus", min_value=0.0, value=0.0, step=100.0, key="bonus_input", help=T.get("bonus_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
         
@@ -823,7 +593,7 @@ if active_menu == T.get("menu_calc"):
             <div style="width: 25%;"><h5>{get_simple_label('salary', 'Salário Bruto', symbol)}</h5></div>
             <div style="width: 25%;"><h5>{get_simple_label('other_deductions', 'Outras Deduções', symbol)}</h5></div>
             <div style="width: 25%;"><h5>{get_simple_label('bonus', 'Bônus', symbol)}</h5></div>
-            <div style="width: 25%;"></div>
+            <div style="width: 25%;">{f"<h5>{get_simple_label('province', 'Province')}</h5>" if country == "Canadá" else ""}</div>
         </div>
         """, unsafe_allow_html=True)
         
@@ -832,6 +602,10 @@ if active_menu == T.get("menu_calc"):
         salario = c1.number_input("Salário", min_value=0.0, value=10000.0, step=100.0, key="salary_input", help=T.get("salary_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
         other_deductions = c2.number_input("Outras Ded.", min_value=0.0, value=0.0, step=10.0, key="other_ded_input", help=T.get("other_deductions_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
         bonus_anual = c3.number_input("Bônus", min_value=0.0, value=0.0, step=100.0, key="bonus_input", help=T.get("bonus_tooltip"), label_visibility="collapsed", format=INPUT_FORMAT)
+        province_code = None
+        if country == "Canadá" and CA_PROVINCES:
+            province_index = CA_PROVINCES.index("ON") if "ON" in CA_PROVINCES else 0
+            province_code = c4.selectbox("Província", CA_PROVINCES, index=province_index, key="province_select", help=T.get("province"), label_visibility="collapsed")
         
         # RÓTULOS LINHA 2 (STI)
         st.markdown(f"""
@@ -850,7 +624,7 @@ if active_menu == T.get("menu_calc"):
         level_display = r2.selectbox("Nível STI", level_options_display, index=level_default_index, key="sti_level", help=T.get("sti_level_tooltip"), label_visibility="collapsed")
         level = level_display_map.get(level_display, level_options_display[level_default_index] if level_options_display else "Others")
         dependentes_fixed = 0
-        state_code, state_rate = None, None
+        state_code, state_rate = province_code, None
 
     # 3) DIVISOR ACIMA DE REMUNERAÇÃO MENSAL
     st.write("---") 
@@ -859,86 +633,89 @@ if active_menu == T.get("menu_calc"):
     
     dependentes = dependentes_fixed
 
-    calc = calc_country_net(country, salario, other_deductions, state_code=state_code, state_rate=state_rate, dependentes=dependentes, tables_ext=COUNTRY_TABLES, br_inss_tbl=BR_INSS_TBL, br_irrf_tbl=BR_IRRF_TBL)
-    df_detalhe = pd.DataFrame(calc["lines"], columns=["Descrição", T.get("earnings","Earnings"), T.get("deductions","Deductions")])
-    df_detalhe[T.get("earnings","Earnings")] = df_detalhe[T.get("earnings","Earnings")].apply(lambda v: money_or_blank(v, symbol))
-    df_detalhe[T.get("deductions","Deductions")] = df_detalhe[T.get("deductions","Deductions")].apply(lambda v: money_or_blank(v, symbol))
-    
-    # 5) FORMATANDO TABELA MENSAL (CONVERTENDO PARA HTML E INJETANDO COM CSS)
-    
-    # O DataFrame deve ser convertido para HTML com o índice DESABILITADO.
-    table_html = df_detalhe.to_html(index=False, classes='monthly-table')
+    # Grafo incremental: entradas -> líquido -> composição anual -> checagem STI -> render.
+    # Cada nó só reexecuta quando as próprias entradas (ou um nó anterior) mudam;
+    # bônus e STI, por exemplo, não recalculam o demonstrativo mensal.
+    graph = ComputeGraph(st.session_state.setdefault("_sim_graph", {}))
+    lang = st.session_state.get("idioma")
+
+    # Nós consultam primeiro o cache de pré-cálculo da sessão (preenchido em segundo plano para os outros países)
+    prefetch = st.session_state.setdefault("_prefetch", Prefetcher())
+    net_args = net_inputs(country, salario, other_deductions, state_code, state_rate, dependentes)
+
+    calc = graph.compute("net", lambda: prefetch.get(("net",) + net_args, lambda: compute_net(net_args)), inputs=net_args, cutoff=True)
+
+    monthly_view = graph.compute("monthly_view", lambda: prefetch.get(("monthly_view", lang, symbol) + net_args, lambda: render_monthly(calc, T, lang, symbol, country)),
+                                 inputs=(lang, symbol, country), after=("net",))
     
-    st.markdown(f"<div class='table-wrap'>{table_html}</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='table-wrap'>{monthly_view['table_html']}</div>", unsafe_allow_html=True)
 
     # NOVO CONTAINER COM MARGEM SUPERIOR PARA ESPAÇAMENTO
     st.markdown("<div class='card-row-spacing'>", unsafe_allow_html=True)
     
     cc1, cc2, cc3 = st.columns(3)
     # Cards Mensais (APLICADAS AS CORES MAIS SUTIS)
-    cc1.markdown(f"<div class='metric-card card-earn'><h4>💰 {T.get('tot_earnings','Total Earnings')}</h4><h3>{fmt_money(calc['total_earn'], symbol)}</h3></div>", unsafe_allow_html=True)
-    cc2.markdown(f"<div class='metric-card card-ded'><h4>📉 {T.get('tot_deductions','Total Deductions')}</h4><h3>{fmt_money(calc['total_ded'], symbol)}</h3></div>", unsafe_allow_html=True)
-    cc3.markdown(f"<div class='metric-card card-net'><h4>💵 {T.get('net','Net Salary')}</h4><h3>{fmt_money(calc['net'], symbol)}</h3></div>", unsafe_allow_html=True)
+    for col, card_html in zip((cc1, cc2, cc3), monthly_view["cards"]): col.markdown(card_html, unsafe_allow_html=True)
 
     st.markdown("</div>", unsafe_allow_html=True) # Fechando o container de espaçamento
 
     # 2) REPOSICIONAMENTO DO FGTS ABAIXO DOS CARDS MENSAIS
-    if country == "Brasil": 
-        st.markdown(f"""
-        <div style="margin-top: 10px; padding: 5px 0;">
-            <p style="font-size: 17px; font-weight: 600; color: #0a3d62; margin: 0;">
-                💼 {T.get('fgts_deposit','Depósito FGTS')}: {fmt_money(calc['fgts'], symbol)}
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+    if monthly_view["fgts_html"] is not None: 
+        st.markdown(monthly_view["fgts_html"], unsafe_allow_html=True)
 
 
     st.write("---")
     # NOVO LAYOUT ANUAL: Cards na Horizontal e Gráfico Abaixo
     st.subheader(T.get("annual_comp_title", "Composição da Remuneração Total Bruta"))
     
-    months = COUNTRY_TABLES.get("REMUN_MONTHS", {}).get(country, 12.0)
-    salario_anual = salario * months
-    total_anual = salario_anual + bonus_anual
-    min_pct, max_pct = get_sti_range(area, level)
-    bonus_pct = (bonus_anual / salario_anual) if salario_anual > 0 else 0.0
-    pct_txt = f"{bonus_pct*100:.1f}%"
-    faixa_txt = f"≤ {(max_pct or 0)*100:.0f}%" if level == "Others" else f"{min_pct*100:.0f}% – {max_pct*100:.0f}%"
-    dentro = (bonus_pct <= (max_pct or 0)) if level == "Others" else (min_pct <= bonus_pct <= max_pct)
-    cor = "#1976d2" if dentro else "#d32f2f"; status_txt = T.get("sti_in_range", "In") if dentro else T.get("sti_out_range", "Out"); 
-    bg_cor = "card-bonus-in" if dentro else "card-bonus-out" # Usando as novas classes
-    sti_note_text = f"<span style='color:{cor};'><strong>{pct_txt}</strong> — <strong>{status_txt}</strong></span> ({faixa_txt}) — <em>{area_display} • {level_display}</em>"
-
-
-    # 1. LINHA DE CARDS NA HORIZONTAL COM ALTURA IGUAL
-    col_salario, col_bonus, col_total = st.columns(3)
-
-    # Card Salário Anual
-    col_salario.markdown(f"""
+    def annual_composition():
+        months = COUNTRY_TABLES.get("REMUN_MONTHS", {}).get(country, 12.0)
+        salario_anual = salario * months
+        return {"months": months, "salario_anual": salario_anual, "bonus_anual": bonus_anual, "total_anual": salario_anual + bonus_anual}
+
+    annual = graph.compute("annual", annual_composition, inputs=(country, salario, bonus_anual, id(COUNTRY_TABLES)), cutoff=True)
+    months = annual["months"]; salario_anual = annual["salario_anual"]; total_anual = annual["total_anual"]
+
+    def sti_check():
+        min_pct, max_pct = get_sti_range(area, level)
+        bonus_pct = (bonus_anual / salario_anual) if salario_anual > 0 else 0.0
+        dentro = (bonus_pct <= (max_pct or 0)) if level == "Others" else (min_pct <= bonus_pct <= max_pct)
+        faixa_txt = f"≤ {(max_pct or 0)*100:.0f}%" if level == "Others" else f"{min_pct*100:.0f}% – {max_pct*100:.0f}%"
+        return {"bonus_pct": bonus_pct, "dentro": dentro, "faixa_txt": faixa_txt}
+
+    sti = graph.compute("sti", sti_check, inputs=(area, level), after=("annual",), cutoff=True)
+
+    def render_annual():
+        pct_txt = f"{sti['bonus_pct']*100:.1f}%"
+        dentro = sti["dentro"]
+        cor = "#1976d2" if dentro else "#d32f2f"; status_txt = T.get("sti_in_range", "In") if dentro else T.get("sti_out_range", "Out"); 
+        bg_cor = "card-bonus-in" if dentro else "card-bonus-out" # Usando as novas classes
+        sti_note_text = f"<span style='color:{cor};'><strong>{pct_txt}</strong> — <strong>{status_txt}</strong></span> ({sti['faixa_txt']}) — <em>{area_display} • {level_display}</em>"
+        cards = [
+            # Card Salário Anual
+            f"""
     <div class='metric-card card-earn'>
         <h4> {T.get('annual_salary','Salário Anual')} </h4>
         <h3>{fmt_money(salario_anual, symbol)}</h3>
     </div>
-    """, unsafe_allow_html=True)
-
-    # Card Bônus (Usando a cor STI para o texto, mas a cor sutil para o fundo)
-    col_bonus.markdown(f"""
+    """,
+            # Card Bônus (Usando a cor STI para o texto, mas a cor sutil para o fundo)
+            f"""
     <div class='metric-card {bg_cor}'>
         <h4 style='color:{cor};'> {T.get('annual_bonus','Bônus')} </h4>
         <h3 style='color:{cor};'>{fmt_money(bonus_anual, symbol)}</h3>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Card Remuneração Total
-    col_total.markdown(f"""
+    """,
+            # Card Remuneração Total
+            f"""
     <div class='metric-card card-total'>
         <h4> {T.get('annual_total','Remuneração Total')} </h4>
         <h3>{fmt_money(total_anual, symbol)}</h3>
     </div>
-    """, unsafe_allow_html=True)
-
-    # 2. NOTAS ABAIXO DA LINHA DE CARDS (APLICANDO FORMATO FGTS E EMOJIS)
-    st.markdown(f"""
+    """,
+        ]
+        # 2. NOTAS ABAIXO DA LINHA DE CARDS (APLICANDO FORMATO FGTS E EMOJIS)
+        notes = f"""
     <div style="margin-top: 10px; padding: 5px 0;">
         <p style="font-size: 17px; font-weight: 600; color: #0a3d62; margin: 0;">
             📅 {T.get('months_factor','Meses considerados')}: {months}
@@ -947,60 +724,54 @@ if active_menu == T.get("menu_calc"):
             🎯 STI Ratio: {sti_note_text}
         </p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    st.write("---") # Divisor visual
+    """
+        return {"cards": cards, "notes": notes}
 
-    # 3. GRÁFICO DE PIZZA ABAIXO DOS CARDS
-    
-    chart_df = pd.DataFrame({
-        # Usa os rótulos atualizados do I18N
-        "Componente": [T.get('annual_salary'), T.get('annual_bonus')], 
-        "Valor": [salario_anual, bonus_anual]
-    })
-    
-    # Renomeando colunas para a exibição no gráfico usando os rótulos dinâmicos
-    salary_name = T.get('annual_salary')
-    bonus_name = T.get('annual_bonus')
-    
-    chart_df['Componente'] = chart_df['Componente'].replace({
-        T.get('annual_salary'): salary_name,
-        T.get('annual_bonus'): bonus_name
-    })
+    annual_view = graph.compute("annual_view", render_annual, inputs=(lang, symbol, area_display, level_display), after=("annual", "sti"))
 
-    base = alt.Chart(chart_df).transform_joinaggregate(
-        Total='sum(Valor)'
-    ).transform_calculate(
-        Percent='datum.Valor / datum.Total',
-        # Usando a template string nativa para formar o rótulo
-        Label=alt.expr.if_(alt.datum.Valor > alt.datum.Total * 0.05, 
-                            alt.datum.Componente + " (" + alt.expr.format(alt.datum.Percent, ".1%") + ")", 
-                            "") 
-    )
-    
-    pie = base.mark_arc(outerRadius=120, innerRadius=80, cornerRadius=2).encode(
-        theta=alt.Theta("Valor:Q", stack=True),
-        color=alt.Color("Componente:N", legend=None), # Remove a legenda
-        order=alt.Order("Percent:Q", sort="descending"),
-        tooltip=[alt.Tooltip("Componente:N"), alt.Tooltip("Valor:Q", format=",.2f")]
-    )
+    # 1. LINHA DE CARDS NA HORIZONTAL COM ALTURA IGUAL
+    col_salario, col_bonus, col_total = st.columns(3)
+    for col, card_html in zip((col_salario, col_bonus, col_total), annual_view["cards"]): col.markdown(card_html, unsafe_allow_html=True)
+
+    st.markdown(annual_view["notes"], unsafe_allow_html=True)
     
-    text = base.mark_text(radius=140).encode(
-        text=alt.Text("Label:N"),
-        theta=alt.Theta("Valor:Q", stack=True),
-        order=alt.Order("Percent:Q", sort="descending"),
-        color=alt.value("black") 
-    )
+    st.write("---") # Divisor visual
 
-    final_chart = alt.layer(pie, text).properties(
-        title=T.get("pie_chart_title_dist", "Distribuição da Remuneração Total")
-    ).configure_view(
-        strokeWidth=0
-    ).configure_title(
-        fontSize=17, anchor='middle', color='#0a3d62'
-    )
+    # 3. GRÁFICO DE PIZZA ABAIXO DOS CARDS
+    final_chart = graph.compute("chart", lambda: prefetch.get(("chart", lang, salario_anual, bonus_anual), lambda: build_chart(T, salario_anual, bonus_anual)),
+                                inputs=(lang,), after=("annual",))
     st.altair_chart(final_chart, use_container_width=True)
 
+    if DEBUG_MODE:
+        with st.expander("🔧 Debug — grafo de cálculo"):
+            st.dataframe(pd.DataFrame(graph.summary()), use_container_width=True, hide_index=True)
+            st.caption(f"Pré-cálculo: {len(prefetch)} resultados em cache | {prefetch.stats}")
+
+    # Cenários salvos (SQLite local): guardar a simulação atual e recarregar entradas salvas deste país
+    with st.expander(T.get("scenarios_title", "💾 Cenários salvos")):
+        store = get_store()
+        sc1, sc2 = st.columns(2)
+        scenario_name = sc1.text_input(T.get("scenario_name", "Nome do cenário"), key="scenario_name_input")
+        if sc1.button(T.get("scenario_save", "Salvar cenário"), key="scenario_save_btn", disabled=not scenario_name):
+            inputs = {"salary": salario, "bonus": bonus_anual, "other_deductions": other_deductions, "dependents": dependentes,
+                      "state_code": state_code, "state_rate": state_rate, "language": lang}
+            employer_cost = calc_employer_charges(country, salario, bonus_anual, COUNTRY_TABLES)[0]
+            store.save_single(scenario_name, country, inputs, calc, employer_cost=employer_cost, sti_area=area, sti_level=level)
+            sc1.success(T.get("scenario_saved", "Cenário salvo."))
+        saved = store.list(country=country, kind="single", limit=50)
+        if saved:
+            options = {s["id"]: f"{s['name']} — {s['created_at'][:16].replace('T', ' ')}" for s in saved}
+            picked = sc2.selectbox(T.get("scenario_load", "Carregar cenário"), list(options), format_func=options.get, key="scenario_pick")
+            sc2.button(T.get("scenario_load_btn", "Carregar"), key="scenario_load_btn", on_click=load_scenario_inputs, args=(picked, T))
+        else:
+            sc2.caption(T.get("scenario_none", "Nenhum cenário salvo para este país."))
+        loaded = st.session_state.pop("_scenario_loaded", None)
+        if loaded and loaded[1]: st.warning(T.get("scenario_stale", "As tabelas de regras mudaram desde que este cenário foi salvo; os valores acima foram recalculados."))
+
+    # Com a página renderizada, calcula os outros países com as mesmas entradas em segundo plano (cancela o job anterior)
+    prefetch.schedule(("sim", country, salario, other_deductions, bonus_anual, lang, net_args[6:]),
+                      [task for c in COUNTRIES if c != country for task in simulator_tasks(c, salario, other_deductions, bonus_anual, T, lang, prefetch)])
+
 
     
 # =========================== REGRAS DE CONTRIBUIÇÕES (MANTIDO) ===================
@@ -1009,13 +780,13 @@ elif active_menu == T.get("menu_rules"):
     
     br_emp_contrib = [ {"desc": "INSS", "rate": "7.5% - 14% (Prog.)", "base": "Salário Bruto", "obs": f"Teto Base {fmt_money(BR_INSS_TBL.get('teto_base', 0), 'R$')}, Teto Contrib. {fmt_money(BR_INSS_TBL.get('teto_contribuicao', 0), 'R$')}"}, {"desc": "IRRF", "rate": "0% - 27.5% (Prog.)", "base": "Salário Bruto - INSS - Dep.", "obs": f"Ded. Dep. {fmt_money(BR_IRRF_TBL.get('deducao_dependente', 0), 'R$')}"} ]
     br_er_contrib = [ {"desc": "INSS Patronal", "rate": "20.00%", "base": "Folha", "obs": "Regra Geral"}, {"desc": "RAT/FAP", "rate": "~2.00%", "base": "Folha", "obs": "Varia (1% a 3%)"}, {"desc": "Sistema S", "rate": "~5.80%", "base": "Folha", "obs": "Terceiros"}, {"desc": "FGTS", "rate": "8.00%", "base": "Folha", "obs": "Depósito (Custo)"} ]
-    us_emp_contrib = [ {"desc": "FICA (Social Sec.)", "rate": "6.20%", "base": "Sal. Bruto", "obs": f"Teto Anual {fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}"}, {"desc": "Medicare", "rate": "1.45%", "base": "Sal. Bruto", "obs": "Sem teto"}, {"desc": "State Tax", "rate": "Varia (0-8%+)","base": "Sal. Bruto", "obs": "Depende do Estado"} ]
+    us_emp_contrib = [ {"desc": "FICA (Social Sec.)", "rate": "6.20%", "base": "Sal. Bruto", "obs": f"Teto Anual {fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}"}, {"desc": "Medicare", "rate": "1.45%", "base": "Sal. Bruto", "obs": "Sem teto"}, {"desc": "Federal Income Tax", "rate": "10% - 37% (Prog.)", "base": "Sal. Bruto - Ded. Padrão", "obs": "Tabela anual"}, {"desc": "State Tax", "rate": "Varia (0-13.3%)","base": "Sal. Bruto", "obs": "Progressivo ou fixo, por Estado"} ]
     us_er_contrib = [ {"desc": "FICA Match", "rate": "6.20%", "base": "Sal. Bruto", "obs": f"Teto Anual {fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}"}, {"desc": "Medicare Match", "rate": "1.45%", "base": "Sal. Bruto", "obs": "Sem teto"}, {"desc": "SUTA/FUTA", "rate": "~2.00%", "base": "Sal. Bruto", "obs": f"Teto Base ~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}"} ]
-    ca_emp_contrib = [ {"desc": "CPP", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp_rate']*100), "base": "Sal. Bruto (c/ Isenção)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}"}, {"desc": "CPP2", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp2_rate']*100), "base": "Sal. Bruto (pós Teto 1)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}"}, {"desc": "EI", "rate": fmt_percent(CA_CPP_EI_DEFAULT['ei_rate']*100), "base": "Sal. Bruto", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}"}, {"desc": "Income Tax", "rate": "Prog. Federal+Prov.", "base": "Renda Tributável", "obs": "Complexo"} ]
+    ca_emp_contrib = [ {"desc": "CPP", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp_rate']*100), "base": "Sal. Bruto (c/ Isenção)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}"}, {"desc": "CPP2", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp2_rate']*100), "base": "Sal. Bruto (pós Teto 1)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}"}, {"desc": "EI", "rate": fmt_percent(CA_CPP_EI_DEFAULT['ei_rate']*100), "base": "Sal. Bruto", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}"}, {"desc": "Income Tax", "rate": "Prog. Federal+Prov.", "base": "Renda Tributável", "obs": "Crédito Basic Personal Amount"} ]
     ca_er_contrib = [ {"desc": "CPP Match", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp_rate']*100), "base": "Sal. Bruto (c/ Isenção)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}"}, {"desc": "CPP2 Match", "rate": fmt_percent(CA_CPP_EI_DEFAULT['cpp2_rate']*100), "base": "Sal. Bruto (pós Teto 1)", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}"}, {"desc": "EI Match", "rate": fmt_percent(CA_CPP_EI_DEFAULT['ei_rate']*100 * 1.4), "base": "Sal. Bruto", "obs": f"Teto {fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}"} ]
     mx_emp_contrib = [{"desc": "ISR", "rate": "~15% (Simpl.)", "base": "Sal. Bruto", "obs": "Progressivo"}, {"desc": "IMSS", "rate": "~5% (Simpl.)", "base": "Sal. Bruto", "obs": f"Com Teto (~{fmt_money(MX_IMSS_CAP_MONTHLY, 'MX$')} /mês)"}]
     mx_er_contrib = [{"desc": "IMSS", "rate": "~7% (Simpl.)", "base": "SBC", "obs": "Complexo"}, {"desc": "INFONAVIT", "rate": "5.00%", "base": "SBC", "obs": "Habitação"}, {"desc": "SAR", "rate": "2.00%", "base": "SBC", "obs": "Aposentadoria"}, {"desc": "ISN", "rate": "~2.5%", "base": "Folha", "obs": "Imposto Estadual"}]
-    cl_emp_contrib = [{"desc": "AFP", "rate": "~11.15%", "base": "Sal. Bruto", "obs": f"10% + Comissão (Teto {ANNUAL_CAPS['CL_TETO_UF']:.1f} UF)"}, {"desc": "Saúde", "rate": "7.00%", "base": "Sal. Bruto", "obs": f"Teto {ANNUAL_CAPS['CL_TETO_UF']:.1f} UF"}]
+    cl_emp_contrib = [{"desc": "AFP", "rate": "~11.15%", "base": "Sal. Bruto", "obs": f"10% + Comissão (Teto {ANNUAL_CAPS['CL_TETO_UF']:.1f} UF ≈ {fmt_money(calc_params()['CL_TETO_MONTHLY'], 'CLP$')} /mês)"}, {"desc": "Saúde", "rate": "7.00%", "base": "Sal. Bruto", "obs": f"Teto {ANNUAL_CAPS['CL_TETO_UF']:.1f} UF ≈ {fmt_money(calc_params()['CL_TETO_MONTHLY'], 'CLP$')} /mês"}]
     cl_er_contrib = [{"desc": "Seg. Cesantía", "rate": "2.40%", "base": "Sal. Bruto", "obs": f"Teto {ANNUAL_CAPS['CL_TETO_CESANTIA_UF']:.1f} UF"}, {"desc": "SIS", "rate": "1.53%", "base": "Sal. Bruto", "obs": f"Teto {ANNUAL_CAPS['CL_TETO_UF']:.1f} UF"}]
     ar_emp_contrib = [{"desc": "Jubilación", "rate": "11.00%", "base": "Sal. Bruto", "obs": "Com Teto"}, {"desc": "Obra Social", "rate": "3.00%", "base": "Sal. Bruto", "obs": "Com Teto"}, {"desc": "PAMI", "rate": "3.00%", "base": "Sal. Bruto", "obs": "Com Teto"}]
     ar_er_contrib = [{"desc": "Cargas Sociales", "rate": "~23.50%", "base": "Sal. Bruto", "obs": "Com Teto (Média)"}]
@@ -1040,11 +811,11 @@ elif active_menu == T.get("menu_rules"):
         if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação:**\n- **INSS:** Calculado de forma progressiva sobre faixas salariais (7.5% a 14%). A contribuição total é a soma do valor calculado em cada faixa, limitada ao teto de contribuição.\n- **IRRF:** Calculado sobre o Salário Bruto após deduzir o INSS e um valor fixo por dependente. Aplica-se a alíquota da faixa (0% a 27.5%) e subtrai-se a parcela a deduzir.\n\n**{T["rules_er"]} - Explicação:**\n- **INSS Patronal, RAT, Sistema S:** Percentuais aplicados sobre o total da folha.\n- **FGTS:** Depósito mensal de 8% sobre o Salário Bruto.\n\n**{T['cost_header_13th']} e {T['cost_header_vacation']}:**\n- Custo anual inclui 13º (1 salário) e Férias (1 salário + 1/3). Fator `13.33`. Encargos incidem sobre essa base ampliada.""", unsafe_allow_html=True)
         else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **INSS:** Progressive rate (7.5% to 14%) on brackets, capped.\n- **IRRF:** Progressive rate (0% to 27.5%) on (Gross - INSS - Dep. Allowance) minus deduction.\n\n**{T["rules_er"]} - Explanation:**\n- **INSS Patronal, RAT, Sistema S:** Percentages on total payroll.\n- **FGTS:** 8% deposit.\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Annual cost factor `13.33` includes 13th Salary and Vacation + 1/3 bonus. Charges apply to this base.""", unsafe_allow_html=True)
     elif country == "Estados Unidos":
-        if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação:**\n- **FICA (Social Security):** 6.2% sobre Sal. Bruto, até teto anual ({fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}).\n- **Medicare:** 1.45% sobre Sal. Bruto total.\n- **State Tax:** Varia por estado.\n\n**{T["rules_er"]} - Explicação:**\n- **FICA & Medicare Match:** Empregador paga o mesmo que o empregado.\n- **SUTA/FUTA:** Desemprego sobre base baixa (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T["rules_er"]} - Explanation:**\n- **FICA & Medicare Match:** Employer pays the same.\n- **SUTA/FUTA:** Unemployment on low base (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
-        else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **FICA (Social Security):** 6.2% on Gross Salary, up to cap ({fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}).\n- **Medicare:** 1.45% on total Gross Salary.\n- **State Tax:** Varies.\n\n**{T["rules_er"]} - Explanation:**\n- **FICA & Medicare Match:** Employer pays the same.\n- **SUTA/FUTA:** Unemployment on low base (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
+        if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação:**\n- **FICA (Social Security):** 6.2% sobre Sal. Bruto, até teto anual ({fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}).\n- **Medicare:** 1.45% sobre Sal. Bruto total.\n- **Federal Income Tax:** Tabela progressiva anual (10% a 37%) após a dedução padrão.\n- **State Tax:** Tabela progressiva do estado quando houver; nos demais, alíquota fixa.\n\n**{T["rules_er"]} - Explicação:**\n- **FICA & Medicare Match:** Empregador paga o mesmo que o empregado.\n- **SUTA/FUTA:** Desemprego sobre base baixa (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T["rules_er"]} - Explanation:**\n- **FICA & Medicare Match:** Employer pays the same.\n- **SUTA/FUTA:** Unemployment on low base (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
+        else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **FICA (Social Security):** 6.2% on Gross Salary, up to cap ({fmt_money(ANNUAL_CAPS['US_FICA'], 'US$')}).\n- **Medicare:** 1.45% on total Gross Salary.\n- **Federal Income Tax:** Annual progressive schedule (10% to 37%) after the standard deduction.\n- **State Tax:** State progressive schedule where available; flat rate otherwise.\n\n**{T["rules_er"]} - Explanation:**\n- **FICA & Medicare Match:** Employer pays the same.\n- **SUTA/FUTA:** Unemployment on low base (~{fmt_money(ANNUAL_CAPS['US_SUTA_BASE'], 'US$')}).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
     elif country == "Canadá":
-          if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação:**\n- **CPP:** 5.95% sobre Sal. Bruto (após isenção {fmt_money(ANNUAL_CAPS['CA_CPP_EXEMPT'], 'CAD$')}) até Teto 1 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}).\n- **CPP2:** 4.0% sobre Sal. Bruto entre Teto 1 e Teto 2 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}).\n- **EI:** 1.63% sobre Sal. Bruto até Teto ({fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}).\n- **Income Tax:** Progressivo Federal + Provincial (Simplificado no simulador).\n\n**{T["rules_er"]} - Explicação:**\n- **CPP/CPP2 Match:** Empregador paga o mesmo.\n- **EI Match:** Empregador paga 1.4x (2.28%).\n\n**{T['cost_header_13th']} e {T['cost_header_vacation']}:**\n- Não obrigatórios. Fator `12.00`.""", unsafe_allow_html=True)
-          else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **CPP:** 5.95% on Gross (after exempt {fmt_money(ANNUAL_CAPS['CA_CPP_EXEMPT'], 'CAD$')}) up to Cap 1 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}).\n- **CPP2:** 4.0% on Gross between Cap 1 and Cap 2 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}).\n- **EI:** 1.63% on Gross up to Cap ({fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}).\n- **Income Tax:** Progressive Federal + Provincial (Simplified in simulator).\n\n**{T["rules_er"]} - Explanation:**\n- **CPP/CPP2 Match:** Employer pays the same.\n- **EI Match:** Employer pays 1.4x (2.28%).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
+          if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação:**\n- **CPP:** 5.95% sobre Sal. Bruto (após isenção {fmt_money(ANNUAL_CAPS['CA_CPP_EXEMPT'], 'CAD$')}) até Teto 1 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}).\n- **CPP2:** 4.0% sobre Sal. Bruto entre Teto 1 e Teto 2 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}).\n- **EI:** 1.63% sobre Sal. Bruto até Teto ({fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}).\n- **Income Tax:** Tabelas progressivas Federal + Provincial (província selecionada), com crédito do Basic Personal Amount.\n\n**{T["rules_er"]} - Explicação:**\n- **CPP/CPP2 Match:** Empregador paga o mesmo.\n- **EI Match:** Empregador paga 1.4x (2.28%).\n\n**{T['cost_header_13th']} e {T['cost_header_vacation']}:**\n- Não obrigatórios. Fator `12.00`.""", unsafe_allow_html=True)
+          else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **CPP:** 5.95% on Gross (after exempt {fmt_money(ANNUAL_CAPS['CA_CPP_EXEMPT'], 'CAD$')}) up to Cap 1 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx1'], 'CAD$')}).\n- **CPP2:** 4.0% on Gross between Cap 1 and Cap 2 ({fmt_money(ANNUAL_CAPS['CA_CPP_YMPEx2'], 'CAD$')}).\n- **EI:** 1.63% on Gross up to Cap ({fmt_money(ANNUAL_CAPS['CA_EI_MIE'], 'CAD$')}).\n- **Income Tax:** Federal + Provincial progressive schedules (selected province), with the Basic Personal Amount credit.\n\n**{T["rules_er"]} - Explanation:**\n- **CPP/CPP2 Match:** Employer pays the same.\n- **EI Match:** Employer pays 1.4x (2.28%).\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- Not mandatory. Factor `12.00`.""", unsafe_allow_html=True)
     elif country == "México":
         if idioma == "Português": st.markdown(f""" **{T["rules_emp"]} - Explicação (Simplificada):**\n- **ISR:** Imposto de renda progressivo. Cálculo exato usa tabelas complexas. O simulador usa uma taxa fixa como aproximação.\n- **IMSS:** Seguridade social (doenças, invalidez, etc.). Taxas variam e aplicam-se sobre o Salário Base de Contribuição (SBC), com teto (aprox. 25 UMAs). O simulador usa taxa e teto simplificados.\n\n**{T["rules_er"]} - Explicação:**\n- **IMSS, INFONAVIT, SAR, ISN:** Contribuições patronais sobre SBC (com tetos) e folha.\n\n**{T['cost_header_13th']} e {T['cost_header_vacation']}:**\n- **Aguinaldo (13º):** Mín. 15 dias. Fator `12.50`.\n- **Prima Vacacional:** 25% sobre dias de férias.""", unsafe_allow_html=True)
         else: st.markdown(f""" **{T["rules_emp"]} - Explanation:**\n- **ISR:** Progressive income tax. Exact calculation uses complex tables. Simulator uses a flat rate approximation.\n- **IMSS:** Social security (illness, disability, etc.). Rates vary and apply to the Contribution Base Salary (SBC), capped (approx. 25 UMAs). Simulator uses simplified rate and cap.\n\n**{T["rules_er"]} - Explanation:**\n- **IMSS, INFONAVIT, SAR, ISN:** Contributions on SBC (capped) and payroll.\n\n**{T['cost_header_13th']} & {T['cost_header_vacation']}:**\n- **Aguinaldo (13th):** Min. 15 days. Factor `12.50`.\n- **Prima Vacacional:** 25% on vacation days.""", unsafe_allow_html=True)
@@ -1096,10 +867,115 @@ elif active_menu == T.get("menu_cost"):
     # APLICADO: T.get('bonus', 'Bônus')
     bonus_anual = c2.number_input(f"{T.get('bonus', 'Bônus')} ({symbol})", min_value=0.0, value=0.0, step=100.0, key="bonus_cost_input", format=INPUT_FORMAT)
     st.write("---")
-    anual, mult, df_cost, months = calc_employer_cost(country, salario, bonus_anual, T, tables_ext=COUNTRY_TABLES)
+    lang = st.session_state.get("idioma"); prefetch = st.session_state.setdefault("_prefetch", Prefetcher())
+    anual, mult, df_cost, months = prefetch.get(cost_key(country, salario, bonus_anual, lang), lambda: calc_employer_cost(country, salario, bonus_anual, T, tables_ext=COUNTRY_TABLES))
     st.markdown(f"**{T.get('employer_cost_total', 'Total Cost')} (Salário + Bônus + Encargos):** {fmt_money(anual, symbol)}  \n"
                  f"**Multiplicador de Custo (vs Salário Base 12 meses):** {mult:.3f} × (12 meses)  \n"
                  f"**{T.get('months_factor', 'Meses')} (Base Salarial):** {months}")
     # As tabelas de custo (que usam st.dataframe) manterão o índice por padrão, mas terão um visual melhor.
     if not df_cost.empty: st.dataframe(df_cost, use_container_width=True, hide_index=True)
     else: st.info("Sem encargos configurados para este país.")
+    prefetch.schedule(("cost", country, salario, bonus_anual, lang),
+                      [(cost_key(c, salario, bonus_anual, lang), lambda c=c: calc_employer_cost(c, salario, bonus_anual, T, tables_ext=COUNTRY_TABLES)) for c in COUNTRIES if c != country])
+
+# ========================= PROCESSAR PLANILHA DE EMPREGADOS ========================
+elif active_menu == T.get("menu_upload"):
+    # O arquivo é processado em blocos numa thread (workforce_upload.py); o job fica na sessão e sobrevive aos reruns
+    st.caption(T.get("upload_help", "Colunas: country, salary, bonus, dependents, other_deductions, state, sti_area, sti_level."))
+    job = st.session_state.get("_upload_job")
+    uploaded = st.file_uploader(T.get("upload_file", "Planilha (CSV ou XLSX)"), type=["csv", "xlsx"], key="upload_file")
+    b1, b2, _ = st.columns([1, 1, 4])
+    if b1.button(T.get("upload_start", "Processar"), key="upload_start_btn", disabled=uploaded is None or (job is not None and job.running)):
+        if job is not None: job.cleanup()
+        job = st.session_state["_upload_job"] = UploadJob(uploaded.name, uploaded)
+    if job is not None and job.running and b2.button(T.get("upload_cancel", "Cancelar"), key="upload_cancel_btn"): job.cancel()
+
+    if job is not None:
+        st.write("---")
+        bar = st.progress(0.0)
+        def show_progress():
+            if job.state == "queued": bar.progress(0.0, text=T.get("upload_queued", "Aguardando...")); return
+            total = f"{job.total:,}" if job.total is not None else "?"
+            bar.progress(job.fraction or 0.0, text=T.get("upload_progress", "{done:,} de {total} linhas • {rate:,.0f} linhas/s").format(done=job.done, total=total, rate=job.rate))
+        # Só acompanha o job: qualquer interação interrompe este laço com um rerun e o processamento continua na thread
+        while job.running:
+            show_progress(); time.sleep(UPLOAD_POLL_SECONDS)
+        show_progress()
+
+        if job.state == "error": st.error(T.get("upload_error", "Erro: {error}").format(error=job.error))
+        elif job.state == "cancelled": st.info(T.get("upload_cancelled", "Cancelado ({rows:,} linhas).").format(rows=job.done))
+        else:
+            st.success(T.get("upload_done", "{rows:,} linhas em {secs:.1f} s ({rate:,.0f} linhas/s).").format(rows=job.done, secs=job.elapsed, rate=job.rate))
+            if job.skipped: st.warning(T.get("upload_skipped", "{rows:,} linhas sem resultado (país vazio ou não suportado).").format(rows=job.skipped))
+            st.subheader(T.get("upload_summary", "Resumo por país"))
+            st.dataframe(pd.DataFrame([{
+                T.get("country", "País"): c, T.get("upload_rows", "Linhas"): f"{v['rows']:,}",
+                T.get("upload_net_total", "Líquido mensal"): fmt_money(v["net"], COUNTRIES.get(c, {}).get("symbol", "")),
+                T.get("employer_cost_total", "Custo Total do Empregador"): fmt_money(v["employer_cost"], COUNTRIES.get(c, {}).get("symbol", "")),
+                T.get("upload_sti_out", "Fora da faixa STI"): f"{v['sti_out']:,}",
+            } for c, v in job.summary.items()]), use_container_width=True, hide_index=True)
+            if job.preview is not None:
+                with st.expander(T.get("upload_preview", "Primeiras linhas")): st.dataframe(job.preview, use_container_width=True, hide_index=True)
+            # O resultado fica na pasta temporária do job, apagada quando a sessão termina ou outro arquivo é processado
+            if os.path.exists(job.output_path):
+                with open(job.output_path, "rb") as result_file:
+                    st.download_button(T.get("upload_download", "Baixar resultados (CSV)"), data=result_file, mime="text/csv",
+                                       file_name=f"{os.path.splitext(job.name)[0]}_resultado.csv", key="upload_download_btn")
+
+# ========================= ORÇAMENTO DE CONTRATAÇÃO ========================
+elif active_menu == T.get("menu_hiring"):
+    c1, c2, c3 = st.columns(3)
+    budget = c1.number_input(f"{T.get('hiring_budget', 'Orçamento anual')} ({symbol})", min_value=0.0, value=1000000.0, step=10000.0, key="hiring_budget", format=INPUT_FORMAT)
+    mode_map = {T.get("hiring_mode_salary", "Maior salário"): "salary", T.get("hiring_mode_headcount", "Maior quadro"): "headcount"}
+    mode = mode_map[c2.radio(T.get("hiring_mode", "Otimizar"), list(mode_map), key="hiring_mode")]
+    target_map = {T.get("hiring_target_min", "Mínimo"): "min", T.get("hiring_target_mid", "Médio"): "mid", T.get("hiring_target_max", "Máximo"): "max"}
+    target = target_map[c3.selectbox(T.get("hiring_target", "Bônus alvo"), list(target_map), index=1, key="hiring_target")]
+
+    # Cargos exibidos como "área — nível" traduzidos; a otimização recebe as chaves do STI_RANGES
+    area_display_list, area_map = get_sti_area_map(T); role_map = {}
+    for area_display in area_display_list:
+        level_display_list, level_map = get_sti_level_map(area_map[area_display], T)
+        for level_display in level_display_list: role_map[f"{area_display} — {level_display}"] = (area_map[area_display], level_map[level_display])
+    role_labels = list(role_map); senior = next((r for r, v in role_map.items() if v == ("Non Sales", "Senior Manager")), role_labels[0])
+    others = next((r for r, v in role_map.items() if v == ("Non Sales", "Others")), role_labels[-1])
+    col_role, col_count, col_weight = T.get("hiring_role", "Cargo"), T.get("hiring_count", "Quantidade"), T.get("hiring_weight", "Peso")
+    col_share, col_salary = T.get("hiring_share", "Proporção"), T.get("hiring_salary", "Salário mensal")
+    if mode == "salary":
+        default_roles = pd.DataFrame({col_role: [senior, others], col_count: [2, 8], col_weight: [1.5, 1.0]})
+        column_config = {col_count: st.column_config.NumberColumn(min_value=0, step=1), col_weight: st.column_config.NumberColumn(min_value=0.01, step=0.1)}
+    else:
+        default_roles = pd.DataFrame({col_role: [senior, others], col_share: [0.2, 0.8], col_salary: [15000.0, 10000.0]})
+        column_config = {col_share: st.column_config.NumberColumn(min_value=0.0, step=0.05), col_salary: st.column_config.NumberColumn(min_value=0.0, step=100.0)}
+    column_config[col_role] = st.column_config.SelectboxColumn(options=role_labels, required=True)
+    edited = st.data_editor(default_roles, num_rows="dynamic", use_container_width=True, hide_index=True, column_config=column_config,
+                            key=f"hiring_roles_{mode}_{st.session_state.get('idioma')}")
+    st.write("---")
+
+    edited = edited.dropna().loc[lambda df: df[col_role].isin(role_map)]
+    if edited.empty: st.info(T.get("hiring_empty", "Adicione ao menos um cargo."))
+    else:
+        roles = pd.DataFrame({"area": [role_map[r][0] for r in edited[col_role]], "level": [role_map[r][1] for r in edited[col_role]]})
+        try:
+            if mode == "salary":
+                roles["count"] = edited[col_count].to_numpy(dtype=float); roles["weight"] = edited[col_weight].to_numpy(dtype=float)
+                result = max_salary_plan(country, budget, roles, target, COUNTRY_TABLES)
+            else:
+                roles["share"] = edited[col_share].to_numpy(dtype=float); roles["salary"] = edited[col_salary].to_numpy(dtype=float)
+                result = max_headcount_plan(country, budget, roles, target, COUNTRY_TABLES)
+        except ValueError as e:
+            st.warning(str(e)); result = None
+        if result is not None:
+            m1, m2, m3 = st.columns(3)
+            if mode == "salary": m1.metric(T.get("hiring_base_salary", "Salário base"), fmt_money(result["base_salary"], symbol))
+            else: m1.metric(T.get("hiring_headcount", "Quadro"), f"{result['headcount']}")
+            m2.metric(T.get("hiring_total_cost", "Custo total"), fmt_money(result["total_cost"], symbol))
+            m3.metric(T.get("hiring_slack", "Sobra"), fmt_money(result["slack"], symbol))
+            if not result["feasible"]: st.warning(T.get("hiring_infeasible", "Nenhum plano cabe no orçamento."))
+            plan = result["plan"]
+            st.dataframe(pd.DataFrame({
+                col_role: list(edited[col_role]), col_count: plan["count"].to_numpy(),
+                col_salary: [fmt_money(v, symbol) for v in plan["salary"]], T.get("annual_bonus", "Bônus"): [fmt_money(v, symbol) for v in plan["bonus"]],
+                T.get("hiring_cost_per_head", "Custo por pessoa"): [fmt_money(v, symbol) for v in plan["cost_per_head"]],
+                T.get("hiring_total_cost", "Custo total"): [fmt_money(v, symbol) for v in plan["cost"]],
+            }), use_container_width=True, hide_index=True)
+            st.caption(T.get("hiring_solved", "Resolvido em {ms:.1f} ms ({n} iterações).").format(ms=result["elapsed_ms"], n=result["iterations"]))
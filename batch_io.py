@@ -0,0 +1,214 @@
+# -------------------------------------------------------------
+# 📦 Cálculo em Lote com Entrada/Saída Colunar (Parquet / Arrow IPC / CSV)
+# Lê o arquivo por row group (memory-map), entrega as colunas direto para o
+# motor vetorizado e grava o resultado em streaming, um lote por vez.
+#
+# Uso:
+#   python batch_io.py run entrada.parquet saida.parquet
+#   python batch_io.py run entrada.parquet saida.parquet --exact   (centavos inteiros, int64)
+#   python batch_io.py bench --rows 2000000
+#
+# Colunas de entrada: country, salary (mensal) e, opcionais, bonus (anual),
+# dependents, other_deductions, state (sigla do estado nos EUA ou da província no Canadá).
+# -------------------------------------------------------------
+
+from typing import Dict, Any, Iterator, Optional
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from payroll_engine import COUNTRIES, US_STATE_RATES, CA_PROVINCES, load_tables_data, calc_country_net_vec, calc_country_net_cents_vec, employer_cost_vec
+from fixed_point import to_cents_vec
+
+PARQUET_EXT = (".parquet", ".pq")
+ARROW_EXT = (".arrow", ".feather", ".ipc")
+CSV_EXT = (".csv",)
+ROW_GROUP_SIZE = 256_000 # Linhas por row group / lote gravado
+
+RESULT_FIELDS = [("total_ded", pa.float64()), ("net", pa.float64()), ("fgts", pa.float64()), ("employer_cost", pa.float64())]
+# Modo exato: líquido em centavos inteiros com o arredondamento legal de cada país (o custo do empregador segue em float)
+RESULT_FIELDS_EXACT = [("total_ded_cents", pa.int64()), ("net_cents", pa.int64()), ("fgts_cents", pa.int64()), ("employer_cost", pa.float64())]
+
+
+def _format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in PARQUET_EXT: return "parquet"
+    if ext in ARROW_EXT: return "arrow"
+    if ext in CSV_EXT: return "csv"
+    raise ValueError(f"Formato não suportado: '{ext}' (use .parquet, .arrow ou .csv)")
+
+def read_batches(path: str, batch_size: int = ROW_GROUP_SIZE) -> Iterator[pa.RecordBatch]:
+    """Itera o arquivo em RecordBatches sem materializar a tabela inteira."""
+    fmt = _format(path)
+    if fmt == "parquet":
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size)
+    elif fmt == "arrow":
+        with pa.memory_map(path, "r") as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches): yield reader.get_batch(i)
+    else:
+        convert = pa_csv.ConvertOptions(column_types={"country": pa.string(), "state": pa.string()})
+        yield from pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=64 << 20), convert_options=convert)
+
+def _column(batch: pa.RecordBatch, name: str, default: float) -> np.ndarray:
+    idx = batch.schema.get_field_index(name)
+    if idx < 0: return np.full(batch.num_rows, default, dtype=np.float64)
+    return pc.fill_null(batch.column(idx), default).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+
+def compute_batch(batch: pa.RecordBatch, tables_ext: Dict[str, Any], br_inss_tbl: Dict[str, Any], br_irrf_tbl: Dict[str, Any], exact: bool = False) -> pa.RecordBatch:
+    """Acrescenta total_ded, net, fgts e employer_cost (anual) ao lote, agrupando por país.
+
+    Com `exact`, salário e outras deduções são convertidos para centavos e o líquido sai em
+    colunas int64 `*_cents` (RESULT_FIELDS_EXACT), calculado em ponto fixo.
+    Linhas com país nulo ou fora de COUNTRIES ficam com as colunas de resultado nulas (ver `skipped_rows`).
+    """
+    salary = _column(batch, "salary", 0.0); bonus = _column(batch, "bonus", 0.0)
+    dependents = _column(batch, "dependents", 0.0).astype(np.int64); other = _column(batch, "other_deductions", 0.0)
+
+    state_rate = None; state_idx = None
+    if batch.schema.get_field_index("state") >= 0:
+        # Alíquota estadual e tabela progressiva resolvidas uma vez por sigla distinta (dicionário), não por linha
+        states = pc.dictionary_encode(batch.column("state"))
+        state_codes = states.dictionary.to_pylist()
+        rates = np.array([float(US_STATE_RATES.get(code, 0.0)) for code in state_codes] + [0.0])
+        state_idx = pc.fill_null(states.indices, len(state_codes)).to_numpy(zero_copy_only=False)
+        state_rate = rates[state_idx]
+
+    fields = RESULT_FIELDS_EXACT if exact else RESULT_FIELDS
+    out = {name: np.zeros(batch.num_rows, dtype=typ.to_pandas_dtype()) for name, typ in fields}
+    computed = np.zeros(batch.num_rows, dtype=bool)
+    if exact: salary_c = to_cents_vec(salary); other_c = to_cents_vec(other)
+    countries = pc.dictionary_encode(batch.column("country"))
+    country_idx = countries.indices.to_numpy(zero_copy_only=False)
+    for code, country in enumerate(countries.dictionary.to_pylist()):
+        if country not in COUNTRIES: continue
+        sel = np.flatnonzero(country_idx == code)
+        sal = salary[sel]
+        kwargs = dict(state_rate=None if state_rate is None else state_rate[sel], dependentes=dependents[sel], tables_ext=tables_ext, br_inss_tbl=br_inss_tbl, br_irrf_tbl=br_irrf_tbl,
+                      state_code=None if state_idx is None else (state_codes, state_idx[sel]))
+        if exact:
+            res = calc_country_net_cents_vec(country, salary_c[sel], other_c[sel], **kwargs)
+            out["total_ded_cents"][sel] = res["total_ded"]; out["net_cents"][sel] = res["net"]; out["fgts_cents"][sel] = res["fgts"]
+        else:
+            res = calc_country_net_vec(country, sal, other[sel], **kwargs)
+            out["total_ded"][sel] = res["total_ded"]; out["net"][sel] = res["net"]; out["fgts"][sel] = res["fgts"]
+        out["employer_cost"][sel] = employer_cost_vec(country, sal, bonus[sel], tables_ext)
+        computed[sel] = True
+
+    mask = None if computed.all() else ~computed
+    arrays = batch.columns + [pa.array(out[name], type=typ, mask=mask) for name, typ in fields]
+    names = batch.schema.names + [name for name, _ in fields]
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+def skipped_rows(result: pa.RecordBatch) -> int:
+    """Linhas de um lote de `compute_batch` sem resultado (país nulo ou não suportado)."""
+    return result.column(result.schema.get_field_index("employer_cost")).null_count
+
+class BatchWriter:
+    """Gravação em streaming no formato do arquivo de saída (um row group por lote)."""
+    def __init__(self, path: str, schema: pa.Schema):
+        self.fmt = _format(path)
+        if self.fmt == "parquet":
+            # Dicionário só nas colunas de texto; tentar dicionário em colunas float de alta cardinalidade custa caro
+            text_cols = [f.name for f in schema if pa.types.is_string(f.type) or pa.types.is_large_string(f.type) or pa.types.is_dictionary(f.type)]
+            self.writer = pq.ParquetWriter(path, schema, use_dictionary=text_cols)
+        elif self.fmt == "arrow": self.sink = pa.OSFile(path, "wb"); self.writer = ipc.new_file(self.sink, schema)
+        else: self.writer = pa_csv.CSVWriter(path, schema)
+
+    def write(self, batch: pa.RecordBatch):
+        if self.fmt == "parquet": self.writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
+        else: self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        if self.fmt == "arrow": self.sink.close()
+
+def process_file(input_path: str, output_path: str, batch_size: int = ROW_GROUP_SIZE, exact: bool = False) -> Dict[str, int]:
+    """Calcula líquido e custo do empregador para todo o arquivo; devolve as linhas lidas e as sem resultado (`skipped`)."""
+    _, tables_ext, br_inss_tbl, br_irrf_tbl = load_tables_data()
+    writer = None; rows = skipped = 0
+    try:
+        for batch in read_batches(input_path, batch_size):
+            result = compute_batch(batch, tables_ext, br_inss_tbl, br_irrf_tbl, exact)
+            if writer is None: writer = BatchWriter(output_path, result.schema)
+            writer.write(result); rows += result.num_rows; skipped += skipped_rows(result)
+    finally:
+        if writer is not None: writer.close()
+    return {"rows": rows, "skipped": skipped}
+
+
+# ======================== BENCHMARK (IDA E VOLTA vs CSV) =========================
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Pico de memória residente em MB do processo (ou do maior filho); None sem o módulo `resource` (Windows)."""
+    try:
+        import resource # Só Unix: importado aqui para não impedir o uso do módulo no Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024 # ru_maxrss: bytes no macOS, KB no Linux
+
+def synthetic_table(n_rows: int, seed: int = 42) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    countries = list(COUNTRIES.keys()); states = [k for k in US_STATE_RATES.keys() if len(k) == 2]
+    country = np.array(countries)[rng.integers(0, len(countries), n_rows)]
+    state = np.where(country == "Estados Unidos", np.array(states)[rng.integers(0, len(states), n_rows)], None)
+    state = np.where(country == "Canadá", np.array(CA_PROVINCES)[rng.integers(0, len(CA_PROVINCES), n_rows)], state)
+    return pa.table({
+        "employee_id": np.arange(n_rows, dtype=np.int64),
+        "country": country,
+        "salary": rng.uniform(1500.0, 40000.0, n_rows).round(2),
+        "bonus": rng.uniform(0.0, 80000.0, n_rows).round(2),
+        "dependents": rng.integers(0, 4, n_rows),
+        "other_deductions": rng.choice([0.0, 150.0, 420.5], n_rows),
+        "state": pa.array(state, type=pa.string()),
+    })
+
+def benchmark(n_rows: int, workdir: str = None) -> Dict[str, Dict[str, float]]:
+    table = synthetic_table(n_rows)
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for fmt, ext in (("csv", ".csv"), ("parquet", ".parquet"), ("arrow", ".arrow")):
+            src = os.path.join(tmp, "in" + ext); dst = os.path.join(tmp, "out" + ext)
+            if fmt == "csv": pa_csv.write_csv(table, src)
+            elif fmt == "parquet": pq.write_table(table, src, row_group_size=ROW_GROUP_SIZE)
+            else:
+                with pa.OSFile(src, "wb") as sink, ipc.new_file(sink, table.schema) as writer: writer.write_table(table, max_chunksize=ROW_GROUP_SIZE)
+            t0 = time.perf_counter(); rows = process_file(src, dst)["rows"]; elapsed = time.perf_counter() - t0
+            results[fmt] = {"seconds": elapsed, "rows_per_s": rows / elapsed, "input_mb": os.path.getsize(src) / 2**20, "output_mb": os.path.getsize(dst) / 2**20}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo em lote de salário líquido e custo do empregador.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="Processa um arquivo (.parquet, .arrow ou .csv)")
+    run.add_argument("input"); run.add_argument("output")
+    run.add_argument("--batch-size", type=int, default=ROW_GROUP_SIZE)
+    run.add_argument("--exact", action="store_true", help="Líquido em centavos inteiros com o arredondamento legal de cada país")
+    bench = sub.add_parser("bench", help="Compara ida e volta CSV vs Parquet vs Arrow")
+    bench.add_argument("--rows", type=int, default=2_000_000)
+    bench.add_argument("--workdir", default=None)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        t0 = time.perf_counter(); r = process_file(args.input, args.output, args.batch_size, args.exact)
+        print(f"{r['rows']:,} linhas em {time.perf_counter() - t0:.2f}s -> {args.output}")
+        if r["skipped"]: print(f"{r['skipped']:,} linhas com país vazio ou não suportado ficaram sem resultado (colunas nulas)")
+    else:
+        results = benchmark(args.rows, args.workdir)
+        base = results["csv"]["seconds"]
+        for fmt, r in results.items():
+            print(f"{fmt:<8} {r['seconds']:8.2f}s  {r['rows_per_s']:>12,.0f} linhas/s  entrada {r['input_mb']:8.1f} MB  saída {r['output_mb']:8.1f} MB  ({base / r['seconds']:.1f}x vs CSV)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# -------------------------------------------------------------
+# 💸 Fluxo de Caixa Mensal do Empregador (empregados x meses x encargos)
+# O custo anual de `calc_employer_charges` vira um calendário de desembolsos:
+# salário todo mês, 13º/extras nos meses do país, adicional de férias no mês
+# de férias de cada empregado e bônus no mês de pagamento. Cada encargo do
+# EMPLOYER_COST incide só nos pagamentos marcados (flags ferias/decimo/bonus)
+# e o teto anual é aplicado sobre a base acumulada no ano (o encargo para no
+# mês em que o teto é atingido). O cubo fica em float32, um bloco por país;
+# as somas (por mês, encargo, país ou empregado) são feitas na hora, em float64.
+#
+# Uso:
+#   python cash_flow.py run workforce.csv [--out mensal.csv]
+#   python cash_flow.py bench --employees 50000
+# O CSV precisa de country e salary (mensal) e aceita bonus (anual), area/level
+# (bônus alvo da faixa STI quando não há bonus), vacation_month e bonus_month (1-12).
+# -------------------------------------------------------------
+
+from typing import Any, Dict, List, Optional, Sequence
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from payroll_engine import COUNTRIES, BASE_12_MONTHS_COUNTRIES, ANNUAL_CAPS, load_tables_data, employer_cost_vec, resolve_tables
+from monte_carlo import sti_bonus_bounds
+
+MONTHS = 12
+PAY_CHARGES = ("Salário", "13º / Extras", "Adicional de Férias", "Bônus") # Pagamentos ao empregado, antes dos encargos
+CHUNK_DEFAULT = 16384 # Empregados por bloco de cálculo (temporários float64 limitados a ~poucos MB)
+
+
+class CashFlowBlock:
+    """Cubo de um país: `values[i, m, k]` é o desembolso do empregado `rows[i]` no mês m+1 na coluna `charges[k]`."""
+    __slots__ = ("rows", "charges", "values")
+
+    def __init__(self, rows: np.ndarray, charges: Sequence[str], values: np.ndarray):
+        self.rows = rows; self.charges = tuple(charges); self.values = values
+
+
+class CashFlowCube:
+    """Projeção anual mês a mês; `blocks` guarda um `CashFlowBlock` por país (encargos diferem entre países)."""
+    __slots__ = ("blocks", "n_employees")
+
+    def __init__(self, blocks: Dict[str, CashFlowBlock], n_employees: int):
+        self.blocks = blocks; self.n_employees = n_employees
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.values.nbytes + b.rows.nbytes for b in self.blocks.values())
+
+    def monthly(self, country: Optional[str] = None) -> pd.DataFrame:
+        """Meses x colunas do país (soma dos empregados) ou, sem país, meses x países (custo total)."""
+        index = pd.RangeIndex(1, MONTHS + 1, name="month")
+        if country is not None:
+            block = self.blocks[country]
+            return pd.DataFrame(block.values.sum(axis=0, dtype=np.float64), index=index, columns=list(block.charges))
+        return pd.DataFrame({c: b.values.sum(axis=(0, 2), dtype=np.float64) for c, b in self.blocks.items()}, index=index)
+
+    def annual(self, country: str) -> pd.Series:
+        """Total anual de cada coluna do país."""
+        block = self.blocks[country]
+        return pd.Series(block.values.sum(axis=(0, 1), dtype=np.float64), index=list(block.charges))
+
+    def employee_totals(self) -> np.ndarray:
+        """Custo anual por empregado, na ordem da força de trabalho de entrada."""
+        out = np.zeros(self.n_employees)
+        for block in self.blocks.values(): out[block.rows] = block.values.sum(axis=(1, 2), dtype=np.float64)
+        return out
+
+    def employee(self, row: int) -> pd.DataFrame:
+        """Meses x colunas de um empregado (posição na força de trabalho de entrada)."""
+        for block in self.blocks.values():
+            pos = np.flatnonzero(block.rows == row)
+            if pos.size: return pd.DataFrame(block.values[pos[0]].astype(np.float64), index=pd.RangeIndex(1, MONTHS + 1, name="month"), columns=list(block.charges))
+        raise KeyError(row)
+
+
+def payout_calendar(country: str, months: float, calendar: Dict[str, Any]) -> Dict[str, Any]:
+    """Frações do salário mensal pagas como 13º/extras por mês e como adicional de férias.
+
+    As frações do calendário são escaladas para somar `months - 12` (REMUN_MONTHS), de modo que o total
+    anual do cubo coincida com `calc_employer_charges`; sem calendário, o excedente é pago em dezembro.
+    """
+    spec = calendar.get(country, {})
+    decimo = np.zeros(MONTHS)
+    for month, share in spec.get("decimo", {}).items(): decimo[int(month) - 1] += float(share)
+    ferias = float(spec.get("ferias", 0.0))
+    extra = 0.0 if country in BASE_12_MONTHS_COUNTRIES else max(float(months) - MONTHS, 0.0)
+    weight = decimo.sum() + ferias
+    if weight > 0: decimo *= extra / weight; ferias *= extra / weight
+    else: decimo[-1] = extra
+    return {"decimo": decimo, "ferias": ferias, "ferias_month": int(spec.get("ferias_month", 1)), "bonus_month": int(spec.get("bonus_month", 12))}
+
+
+def _charge_bases(country: str, item: Dict[str, Any], cumulative: np.ndarray) -> np.ndarray:
+    # Teto anual sobre a base acumulada: o que entra em cada mês é a diferença do acumulado já limitado
+    teto = item.get("teto")
+    if teto is None or not isinstance(teto, (int, float)): return np.diff(cumulative, axis=1, prepend=0.0)
+    if country == "Canadá" and item.get("nome") == "CPP2 (ER)":
+        capped = np.clip(cumulative, ANNUAL_CAPS["CA_CPP_YMPEx1"], ANNUAL_CAPS["CA_CPP_YMPEx2"]) - ANNUAL_CAPS["CA_CPP_YMPEx1"]
+    else:
+        capped = np.minimum(cumulative, teto)
+    return np.diff(capped, axis=1, prepend=0.0)
+
+
+def project_country(country: str, salary: np.ndarray, bonus: np.ndarray, vacation_month: np.ndarray, bonus_month: np.ndarray,
+                    tables_ext: Dict[str, Any], out: np.ndarray) -> List[str]:
+    """Preenche `out` (empregados x 12 x colunas, float32) para um país; devolve os nomes das colunas."""
+    months = tables_ext.get("REMUN_MONTHS", {}).get(country, 12.0)
+    items = tables_ext.get("EMPLOYER_COST", {}).get(country, [])
+    cal = payout_calendar(country, months, tables_ext.get("PAYOUT_CALENDAR", {}))
+    n = salary.shape[0]; rows = np.arange(n)
+    pay = np.zeros((n, MONTHS, len(PAY_CHARGES)))
+    pay[:, :, 0] = salary[:, None]
+    pay[:, :, 1] = salary[:, None] * cal["decimo"]
+    pay[rows, vacation_month - 1, 2] = salary * cal["ferias"]
+    pay[rows, bonus_month - 1, 3] = bonus
+    out[:, :, :len(PAY_CHARGES)] = pay
+    for k, item in enumerate(items):
+        # Incidência de cada encargo: salário sempre; 13º, férias e bônus conforme as flags do item
+        incid = np.array([1.0, float(bool(item.get("decimo", False))), float(bool(item.get("ferias", False))), float(bool(item.get("bonus", False)))])
+        base = _charge_bases(country, item, np.cumsum(pay @ incid, axis=1))
+        out[:, :, len(PAY_CHARGES) + k] = base * (item.get("percentual", 0.0) / 100.0)
+    return list(PAY_CHARGES) + [item.get("nome", f"#{k}") for k, item in enumerate(items)]
+
+
+def _months_column(workforce: pd.DataFrame, column: str, default: int) -> np.ndarray:
+    if column not in workforce: return np.full(len(workforce), default, dtype=np.int64)
+    values = pd.to_numeric(workforce[column], errors="coerce").fillna(default).to_numpy(dtype=np.int64)
+    if ((values < 1) | (values > MONTHS)).any(): raise ValueError(f"Coluna '{column}' deve ter meses de 1 a 12")
+    return values
+
+def project_cash_flow(workforce: pd.DataFrame, tables_ext: Dict[str, Any] = None, chunk: int = CHUNK_DEFAULT, period: str = None) -> CashFlowCube:
+    """Cubo do ano para a força de trabalho (uma linha por empregado), calculado em blocos de `chunk` empregados.
+
+    Sem coluna `bonus`, usa o bônus alvo (meio da faixa STI de `area`/`level`) sobre o salário anual com extras.
+    Tetos em UF/UMA são convertidos uma vez, com o valor do índice em `period` ("AAAA-MM", padrão: mês corrente).
+    """
+    tables_ext = resolve_tables(tables_ext if tables_ext is not None else load_tables_data()[1], period)
+    countries = workforce["country"].astype(str).to_numpy()
+    salary_all = pd.to_numeric(workforce["salary"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    blocks = {}
+    for country in pd.unique(countries):
+        rows = np.flatnonzero(countries == country)
+        salary = salary_all[rows]; sub = workforce.iloc[rows]
+        months = tables_ext.get("REMUN_MONTHS", {}).get(country, 12.0)
+        if "bonus" in sub: bonus = pd.to_numeric(sub["bonus"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+        elif "area" in sub and "level" in sub:
+            share = np.array([sum(sti_bonus_bounds(a, l)) / 2.0 for a, l in zip(sub["area"], sub["level"])])
+            bonus = share * salary * months
+        else: bonus = np.zeros(rows.size)
+        cal = payout_calendar(country, months, tables_ext.get("PAYOUT_CALENDAR", {}))
+        vacation = _months_column(sub, "vacation_month", cal["ferias_month"]); payout = _months_column(sub, "bonus_month", cal["bonus_month"])
+        n_charges = len(PAY_CHARGES) + len(tables_ext.get("EMPLOYER_COST", {}).get(country, []))
+        values = np.empty((rows.size, MONTHS, n_charges), dtype=np.float32)
+        for s0 in range(0, rows.size, chunk):
+            s1 = min(s0 + chunk, rows.size)
+            charges = project_country(country, salary[s0:s1], bonus[s0:s1], vacation[s0:s1], payout[s0:s1], tables_ext, values[s0:s1])
+        blocks[country] = CashFlowBlock(rows, charges if rows.size else list(PAY_CHARGES), values)
+    return CashFlowCube(blocks, len(workforce))
+
+
+def synthetic_workforce(n: int, seed: int = 0) -> pd.DataFrame:
+    """Força de trabalho sintética com salários e bônus plausíveis por país (para benchmark)."""
+    rng = np.random.default_rng(seed)
+    countries = np.array(list(COUNTRIES))
+    scale = {"Brasil": 12000.0, "México": 40000.0, "Chile": 2_500_000.0, "Argentina": 2_000_000.0, "Colômbia": 8_000_000.0, "Estados Unidos": 9000.0, "Canadá": 8000.0}
+    country = countries[rng.integers(0, countries.size, n)]
+    salary = np.array([scale.get(c, 10000.0) for c in country]) * rng.lognormal(0.0, 0.6, n)
+    return pd.DataFrame({"country": country, "salary": salary.round(2), "bonus": (salary * 12 * rng.uniform(0.0, 0.4, n)).round(2),
+                         "vacation_month": rng.integers(1, 13, n), "bonus_month": rng.choice([3, 4], n)})
+
+
+def benchmark(n: int = 50000, seed: int = 0) -> Dict[str, float]:
+    """Tempo e pico de memória da projeção; confere o total anual por empregado contra `employer_cost_vec`."""
+    workforce = synthetic_workforce(n, seed); tables_ext = load_tables_data()[1]
+    tracemalloc.start(); t0 = time.perf_counter()
+    cube = project_cash_flow(workforce, tables_ext)
+    elapsed = time.perf_counter() - t0; _, peak = tracemalloc.get_traced_memory(); tracemalloc.stop()
+    expected = np.zeros(n)
+    for country in cube.blocks:
+        rows = cube.blocks[country].rows
+        expected[rows] = employer_cost_vec(country, workforce["salary"].to_numpy()[rows], workforce["bonus"].to_numpy()[rows], tables_ext)
+    rel = np.abs(cube.employee_totals() - expected) / np.maximum(expected, 1.0)
+    return {"employees": n, "seconds": elapsed, "cube_mb": cube.nbytes / 2 ** 20, "peak_mb": peak / 2 ** 20, "max_rel_diff_vs_annual": float(rel.max())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Projeção mensal do fluxo de caixa do empregador (salários, extras, bônus e encargos).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="Projeta uma força de trabalho em CSV")
+    run.add_argument("workforce", help="CSV com as colunas country, salary e opcionais bonus, area, level, vacation_month, bonus_month")
+    run.add_argument("--out", help="Grava o total mensal por país e coluna em CSV (formato longo)")
+    bench = sub.add_parser("bench", help="Força de trabalho sintética: tempo, memória e conferência com o custo anual")
+    bench.add_argument("--employees", type=int, default=50000)
+    bench.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench":
+        for key, value in benchmark(args.employees, args.seed).items(): print(f"{key}: {value:,.6g}")
+        return
+    cube = project_cash_flow(pd.read_csv(args.workforce))
+    print(cube.monthly().to_string(float_format=lambda v: f"{v:,.2f}"))
+    if args.out:
+        frames = [cube.monthly(c).stack().rename("amount").reset_index().rename(columns={"level_1": "charge"}).assign(country=c) for c in cube.blocks]
+        pd.concat(frames, ignore_index=True)[["country", "month", "charge", "amount"]].to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -------------------------------------------------------------
+# 🔁 Grafo de Cálculo Incremental (memoização por nó)
+# Cada nó guarda as entradas com que foi calculado e uma versão do resultado.
+# Num novo rerun o nó só executa se as próprias entradas ou a versão de algum
+# nó de que depende mudaram; caso contrário devolve o valor guardado. Assim
+# uma alteração só reexecuta os nós a jusante dela.
+# Sem dependência do Streamlit: o estado é qualquer dicionário persistente
+# (no app, uma entrada do st.session_state, ou seja, um grafo por sessão).
+# -------------------------------------------------------------
+
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import time
+
+
+class ComputeGraph:
+    """Memoização de nós encadeados, com registro do que executou e do que foi reaproveitado.
+
+    Uso:
+        graph = ComputeGraph(state)
+        calc = graph.compute("net", lambda: calc_country_net(...), inputs=(country, salary))
+        view = graph.compute("view", lambda: render(calc), inputs=(lang,), after=("net",))
+    """
+
+    def __init__(self, state: Dict[str, Tuple[Any, int, Any]]):
+        self.state = state
+        self.log: List[Tuple[str, bool, float]] = [] # (nó, executou?, ms)
+
+    def version(self, name: str) -> int:
+        entry = self.state.get(name)
+        return entry[1] if entry is not None else -1
+
+    def compute(self, name: str, fn: Callable[[], Any], inputs: Sequence[Any] = (), after: Sequence[str] = (), cutoff: bool = False) -> Any:
+        """Valor do nó `name`; `fn` só roda se `inputs` ou as versões dos nós em `after` mudaram.
+
+        Com `cutoff`, um resultado igual ao anterior mantém a versão e não invalida os nós a jusante.
+        """
+        key = (tuple(inputs), tuple(self.version(dep) for dep in after))
+        entry = self.state.get(name)
+        if entry is not None and _same(entry[0], key):
+            self.log.append((name, False, 0.0))
+            return entry[2]
+        t0 = time.perf_counter()
+        value = fn()
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        version = entry[1] + 1 if entry is not None else 0
+        if cutoff and entry is not None and _same(entry[2], value): version = entry[1]
+        self.state[name] = (key, version, value)
+        self.log.append((name, True, elapsed))
+        return value
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Linhas para exibição em modo debug: nó, executado/reaproveitado e tempo."""
+        return [{"node": name, "executed": ran, "ms": round(ms, 3)} for name, ran, ms in self.log]
+
+
+def _same(a: Any, b: Any) -> bool:
+    # Comparação tolerante a objetos sem `==` booleano (ex.: DataFrames): na dúvida, considera diferente
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
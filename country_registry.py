@@ -0,0 +1,507 @@
+# -------------------------------------------------------------
+# 🗂️ Registro de Calculadoras por País (dirigido por configuração)
+# Cada país é descrito em country_calculators.json como uma lista de componentes
+# declarativos (alíquota fixa, alíquota com teto, faixa entre limites, tabela
+# progressiva, tabela com parcela a deduzir e dedução por dependente, imposto estadual,
+# imposto de renda por tabela anual da jurisdição federal/estadual/provincial).
+# As calculadoras são compiladas uma única vez, no primeiro uso de cada país:
+# alíquotas, tetos e faixas já ficam resolvidos e a chamada só faz as contas.
+# Os resultados identificam cada linha por um código de componente ("br_inss",
+# "us_fica", ...); o rótulo só é resolvido (e traduzido) na hora de exibir.
+# -------------------------------------------------------------
+
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import re
+import unicodedata
+
+import numpy as np
+
+from fixed_point import RATE_SCALE, to_cents, rate_units, rate_units_vec, Rounding, MAX_SAFE_CENTS
+from tax_schedules import as_categories
+
+
+# ======================== COMPONENTES =========================
+# Cada componente expõe `amount` (escalar, floats Python) e `amount_vec` (arrays NumPy).
+# Devolver None significa "não se aplica" (a linha não aparece no demonstrativo).
+# No vetorizado, `regions` traz o estado/província por empregado como (categorias, índices).
+# `explain` (só chamado com rastreio ligado) descreve a conta: base usada, faixa atingida, teto aplicado.
+# `units`/`units_vec` são o cálculo exato: base em centavos inteiros e resultado em centavos x RATE_SCALE,
+# ainda sem arredondar (a calculadora arredonda cada linha pela regra do país).
+# O `code` de cada componente é atribuído na compilação (campo "code" da especificação).
+
+class FlatRate:
+    """Alíquota fixa sobre a base."""
+    __slots__ = ("code", "label", "base", "rate", "_rate_u")
+    def __init__(self, label, base, rate): self.label = label; self.base = base; self.rate = rate; self._rate_u = rate_units(rate)
+    def amount(self, base, state_code, state_rate, dependentes): return base * self.rate
+    def amount_vec(self, base, state_rate, dependentes, regions): return base * self.rate
+    def units(self, base, state_code, state_rate, dependentes): return base * self._rate_u
+    def units_vec(self, base, state_rate, dependentes, regions): return base * self._rate_u
+    def explain(self, base, state_code, state_rate, dependentes): return {"base": base, "rate": self.rate}
+
+class CappedRate:
+    """Alíquota sobre a base limitada a um teto mensal (FICA, IMSS, EI)."""
+    __slots__ = ("code", "label", "base", "rate", "cap", "_rate_u", "_cap_c")
+    def __init__(self, label, base, rate, cap):
+        self.label = label; self.base = base; self.rate = rate; self.cap = cap
+        self._rate_u = rate_units(rate); self._cap_c = to_cents(cap)
+    def amount(self, base, state_code, state_rate, dependentes): return min(base, self.cap) * self.rate
+    def amount_vec(self, base, state_rate, dependentes, regions): return np.minimum(base, self.cap) * self.rate
+    def units(self, base, state_code, state_rate, dependentes): return min(base, self._cap_c) * self._rate_u
+    def units_vec(self, base, state_rate, dependentes, regions): return np.minimum(base, self._cap_c) * self._rate_u
+    def explain(self, base, state_code, state_rate, dependentes): return {"base": base, "rate": self.rate, "cap": self.cap, "cap_applied": base > self.cap}
+
+class BandRate:
+    """Alíquota sobre a parte da base entre `lower` e `upper` (CPP com isenção, CPP2)."""
+    __slots__ = ("code", "label", "base", "rate", "lower", "upper", "_rate_u", "_lower_c", "_upper_c")
+    def __init__(self, label, base, rate, lower, upper):
+        self.label = label; self.base = base; self.rate = rate; self.lower = lower; self.upper = upper
+        self._rate_u = rate_units(rate); self._lower_c = to_cents(lower); self._upper_c = to_cents(upper)
+    def amount(self, base, state_code, state_rate, dependentes): return max(0, min(base, self.upper) - self.lower) * self.rate
+    def amount_vec(self, base, state_rate, dependentes, regions): return np.maximum(0, np.minimum(base, self.upper) - self.lower) * self.rate
+    def units(self, base, state_code, state_rate, dependentes): return max(0, min(base, self._upper_c) - self._lower_c) * self._rate_u
+    def units_vec(self, base, state_rate, dependentes, regions): return np.maximum(0, np.minimum(base, self._upper_c) - self._lower_c) * self._rate_u
+    def explain(self, base, state_code, state_rate, dependentes):
+        return {"base": base, "rate": self.rate, "lower": self.lower, "upper": self.upper, "cap_applied": base > self.upper}
+
+class Progressive:
+    """Tabela progressiva por faixas (soma de cada faixa), com teto de contribuição opcional (INSS)."""
+    __slots__ = ("code", "label", "base", "brackets", "cap", "_brackets_u", "_cap_u")
+    def __init__(self, label, base, tbl):
+        self.label = label; self.base = base
+        valid = isinstance(tbl, dict)
+        self.brackets = tuple((float(f["ate"]), float(f["aliquota"])) for f in tbl.get("faixas", [])) if valid else ()
+        teto = tbl.get("teto_contribuicao", None) if valid else None
+        self.cap = float(teto) if teto is not None else None
+        self._brackets_u = tuple((to_cents(ate), rate_units(aliq)) for ate, aliq in self.brackets)
+        self._cap_u = to_cents(self.cap) * RATE_SCALE if self.cap is not None else None
+
+    def amount(self, base, state_code, state_rate, dependentes):
+        contrib = 0.0; limite_anterior = 0.0
+        for teto_faixa, aliquota in self.brackets:
+            if base > limite_anterior:
+                contrib += (min(base, teto_faixa) - limite_anterior) * aliquota
+                limite_anterior = teto_faixa
+            else: break
+        if self.cap is not None: contrib = min(contrib, self.cap)
+        return max(contrib, 0.0)
+
+    def amount_vec(self, base, state_rate, dependentes, regions):
+        contrib = np.zeros_like(base); limite_anterior = 0.0
+        for teto_faixa, aliquota in self.brackets:
+            contrib += np.maximum(np.minimum(base, teto_faixa) - limite_anterior, 0.0) * aliquota
+            limite_anterior = teto_faixa
+        if self.cap is not None: contrib = np.minimum(contrib, self.cap)
+        return np.maximum(contrib, 0.0)
+
+    def units(self, base, state_code, state_rate, dependentes):
+        contrib = 0; limite_anterior = 0
+        for teto_faixa, aliquota in self._brackets_u:
+            if base > limite_anterior:
+                contrib += (min(base, teto_faixa) - limite_anterior) * aliquota
+                limite_anterior = teto_faixa
+            else: break
+        if self._cap_u is not None: contrib = min(contrib, self._cap_u)
+        return max(contrib, 0)
+
+    def units_vec(self, base, state_rate, dependentes, regions):
+        contrib = np.zeros_like(base); limite_anterior = 0
+        for teto_faixa, aliquota in self._brackets_u:
+            contrib += np.maximum(np.minimum(base, teto_faixa) - limite_anterior, 0) * aliquota
+            limite_anterior = teto_faixa
+        if self._cap_u is not None: contrib = np.minimum(contrib, self._cap_u)
+        return np.maximum(contrib, 0)
+
+    def explain(self, base, state_code, state_rate, dependentes):
+        bracket = -1; contrib = 0.0; limite_anterior = 0.0
+        for teto_faixa, aliquota in self.brackets:
+            if base > limite_anterior:
+                contrib += (min(base, teto_faixa) - limite_anterior) * aliquota
+                limite_anterior = teto_faixa; bracket += 1
+            else: break
+        return {"base": base, "bracket": bracket, "rate": self.brackets[bracket][1] if bracket >= 0 else 0.0,
+                "cap": self.cap, "cap_applied": self.cap is not None and contrib > self.cap}
+
+class BracketDeduction:
+    """Tabela com alíquota e parcela a deduzir por faixa, após dedução por dependente (IRRF)."""
+    __slots__ = ("code", "label", "base", "brackets", "ded_dep", "_ates", "_aliqs", "_deds", "_ded_dep_c", "_brackets_u", "_ates_c", "_aliqs_u", "_deds_u")
+    def __init__(self, label, base, tbl):
+        self.label = label; self.base = base
+        valid = isinstance(tbl, dict)
+        self.ded_dep = float(tbl.get("deducao_dependente", 0.0)) if valid else 0.0
+        self.brackets = tuple((float(f["ate"]), float(f["aliquota"]), float(f.get("deducao", 0.0))) for f in tbl.get("faixas", [])) if valid else ()
+        self._ates = np.array([b[0] for b in self.brackets])
+        # Alíquota/dedução extra (zero) para bases acima da última faixa
+        self._aliqs = np.array([b[1] for b in self.brackets] + [0.0])
+        self._deds = np.array([b[2] for b in self.brackets] + [0.0])
+        # Inteiros: limites e dedução por dependente em centavos, alíquota em milionésimos, parcela a deduzir em centavos x RATE_SCALE
+        self._ded_dep_c = to_cents(self.ded_dep)
+        self._brackets_u = tuple((to_cents(ate), rate_units(aliq), to_cents(ded) * RATE_SCALE) for ate, aliq, ded in self.brackets)
+        self._ates_c = np.array([b[0] for b in self._brackets_u], dtype=np.int64)
+        self._aliqs_u = np.array([b[1] for b in self._brackets_u] + [0], dtype=np.int64)
+        self._deds_u = np.array([b[2] for b in self._brackets_u] + [0], dtype=np.int64)
+
+    def amount(self, base, state_code, state_rate, dependentes):
+        base_calc = max(base - self.ded_dep * max(int(dependentes), 0), 0.0)
+        for ate, aliq, ded in self.brackets:
+            if base_calc <= ate: return max(base_calc * aliq - ded, 0.0)
+        return 0.0
+
+    def amount_vec(self, base, state_rate, dependentes, regions):
+        base_calc = np.maximum(base - self.ded_dep * np.maximum(np.asarray(dependentes, dtype=np.int64), 0), 0.0)
+        idx = np.searchsorted(self._ates, base_calc, side="left")
+        return np.maximum(base_calc * self._aliqs[idx] - self._deds[idx], 0.0)
+
+    def units(self, base, state_code, state_rate, dependentes):
+        base_calc = max(base - self._ded_dep_c * max(int(dependentes), 0), 0)
+        for ate, aliq, ded in self._brackets_u:
+            if base_calc <= ate: return max(base_calc * aliq - ded, 0)
+        return 0
+
+    def units_vec(self, base, state_rate, dependentes, regions):
+        base_calc = np.maximum(base - self._ded_dep_c * np.maximum(np.asarray(dependentes, dtype=np.int64), 0), 0)
+        idx = np.searchsorted(self._ates_c, base_calc, side="left")
+        return np.maximum(base_calc * self._aliqs_u[idx] - self._deds_u[idx], 0)
+
+    def explain(self, base, state_code, state_rate, dependentes):
+        base_calc = max(base - self.ded_dep * max(int(dependentes), 0), 0.0)
+        bracket = int(np.searchsorted(self._ates, base_calc, side="left"))
+        return {"base": base_calc, "gross_base": base, "dependents": max(int(dependentes), 0), "bracket": bracket,
+                "rate": float(self._aliqs[bracket]), "deduction": float(self._deds[bracket])}
+
+class StateRate:
+    """Imposto estadual (EUA) com alíquota informada na chamada; só aparece com estado e alíquota > 0.
+
+    O rótulo pode conter "{state_code}", preenchido com a sigla do estado no demonstrativo.
+    """
+    __slots__ = ("code", "label", "base")
+    def __init__(self, label, base): self.label = label; self.base = base
+    def line_label(self, state_code): return self.label.format(state_code=state_code)
+    def amount(self, base, state_code, state_rate, dependentes):
+        if not state_code: return None
+        sr = state_rate if state_rate is not None else 0.0
+        return base * sr if sr > 0 else None
+    def amount_vec(self, base, state_rate, dependentes, regions):
+        if state_rate is None: return None
+        return base * np.maximum(np.asarray(state_rate, dtype=np.float64), 0.0)
+    def units(self, base, state_code, state_rate, dependentes):
+        if not state_code: return None
+        sr = rate_units(state_rate) if state_rate is not None else 0
+        return base * sr if sr > 0 else None
+    def units_vec(self, base, state_rate, dependentes, regions):
+        if state_rate is None: return None
+        return base * np.maximum(rate_units_vec(state_rate), 0)
+    def explain(self, base, state_code, state_rate, dependentes): return {"base": base, "rate": state_rate or 0.0, "state": state_code}
+
+class BracketTax:
+    """Imposto de renda pela tabela progressiva anual de uma jurisdição (tax_schedules.ScheduleSet).
+
+    A base mensal é anualizada por `periods` e o imposto anual volta dividido por `periods`.
+    `jurisdiction` pode conter "{state_code}" ("US-{state_code}", "CA-{state_code}"): sem estado/
+    província a linha não aparece. Com `flat_fallback`, jurisdições sem tabela usam a alíquota
+    fixa informada na chamada, como StateRate (estados dos EUA com imposto proporcional).
+    """
+    __slots__ = ("code", "label", "base", "schedules", "jurisdiction", "periods", "flat_fallback", "_regional")
+    def __init__(self, label, base, schedules, jurisdiction, periods, flat_fallback):
+        self.label = label; self.base = base; self.schedules = schedules; self.jurisdiction = jurisdiction
+        self.periods = periods; self.flat_fallback = flat_fallback; self._regional = "{state_code}" in jurisdiction
+    def line_label(self, state_code): return self.label.format(state_code=state_code)
+
+    def _rows(self, regions):
+        schedules = self.schedules
+        if not self._regional: return schedules.index.get(self.jurisdiction, schedules.missing)
+        if regions is None: return schedules.missing
+        # Uma consulta por categoria distinta; o índice -1/fora da faixa cai na linha "sem tabela"
+        cats, idx = regions
+        per_cat = schedules.rows([self.jurisdiction.format(state_code=c) if c else None for c in cats] + [None])
+        return per_cat[np.where((idx < 0) | (idx >= len(cats)), len(cats), idx)]
+
+    def amount(self, base, state_code, state_rate, dependentes):
+        if self._regional:
+            if not state_code: return None
+            code = self.jurisdiction.format(state_code=state_code)
+        else: code = self.jurisdiction
+        if code in self.schedules: return self.schedules.tax(code, base * self.periods) / self.periods
+        if not self.flat_fallback: return None
+        sr = state_rate if state_rate is not None else 0.0
+        return base * sr if sr > 0 else None
+
+    def amount_vec(self, base, state_rate, dependentes, regions):
+        schedules = self.schedules; rows = self._rows(regions)
+        tax = schedules.tax_vec(rows, base * self.periods) / self.periods
+        if self.flat_fallback and state_rate is not None:
+            flat = base * np.maximum(np.asarray(state_rate, dtype=np.float64), 0.0)
+            tax = np.where(rows != schedules.missing, tax, flat)
+        return tax
+
+    # No exato o valor devolvido é o anual (não dividido por `periods`): a divisão entra no arredondamento da linha
+    def units(self, base, state_code, state_rate, dependentes):
+        if self._regional:
+            if not state_code: return None
+            code = self.jurisdiction.format(state_code=state_code)
+        else: code = self.jurisdiction
+        periods = int(self.periods)
+        if code in self.schedules: return self.schedules.tax_units(code, base * periods)
+        if not self.flat_fallback: return None
+        sr = rate_units(state_rate) if state_rate is not None else 0
+        return base * sr * periods if sr > 0 else None
+
+    def units_vec(self, base, state_rate, dependentes, regions):
+        schedules = self.schedules; rows = self._rows(regions); periods = int(self.periods)
+        tax = schedules.tax_units_vec(rows, base * periods)
+        if self.flat_fallback and state_rate is not None:
+            flat = base * np.maximum(rate_units_vec(state_rate), 0) * periods
+            tax = np.where(rows != schedules.missing, tax, flat)
+        return tax
+
+    def explain(self, base, state_code, state_rate, dependentes):
+        code = self.jurisdiction.format(state_code=state_code) if self._regional else self.jurisdiction
+        if code not in self.schedules: return {"base": base, "jurisdiction": code, "rate": state_rate or 0.0, "flat_fallback": True}
+        bracket, rate = self.schedules.bracket(code, base * self.periods)
+        return {"base": base, "jurisdiction": code, "annual_base": base * self.periods, "bracket": bracket, "rate": rate}
+
+
+# ======================== CALCULADORA E REGISTRO =========================
+
+class PayrollResult:
+    """Demonstrativo mensal compacto: códigos e valores das linhas, totais e o rastreio opcional.
+
+    `codes[0]` é sempre "base" (o provento); as demais linhas são descontos, na ordem do
+    demonstrativo, terminando em "other" quando há outras deduções. Os rótulos ficam na
+    calculadora e só são montados em `lines`, que aceita traduções por código.
+    Ainda aceita o acesso por chave do antigo dicionário (`res["net"]`, `res["lines"]`).
+    Com `cents`, os valores são centavos inteiros (cálculo exato) e `lines` os devolve na moeda.
+    """
+    __slots__ = ("calculator", "codes", "amounts", "total_earn", "total_ded", "net", "fgts", "state_code", "trace", "cents")
+
+    def __init__(self, calculator, codes, amounts, total_earn, total_ded, net, fgts, state_code, trace, cents=False):
+        self.calculator = calculator; self.codes = codes; self.amounts = amounts
+        self.total_earn = total_earn; self.total_ded = total_ded; self.net = net; self.fgts = fgts
+        self.state_code = state_code; self.trace = trace; self.cents = cents
+
+    def label(self, code: str, labels: Optional[Mapping[str, str]] = None) -> str:
+        """Rótulo de exibição de um código; `labels` (ex.: textos do idioma) tem prioridade sobre o da especificação."""
+        text = (labels or {}).get(code) or self.calculator.labels.get(code, code)
+        return text.format(state_code=self.state_code) if "{" in text else text
+
+    def lines(self, labels: Optional[Mapping[str, str]] = None) -> List[Tuple[str, float, float]]:
+        """Linhas (rótulo, provento, desconto) para a tabela do demonstrativo."""
+        amounts = [v / 100 for v in self.amounts] if self.cents else self.amounts
+        out = [(self.label(self.codes[0], labels), amounts[0], 0.0)]
+        out += [(self.label(code, labels), 0.0, v) for code, v in zip(self.codes[1:], amounts[1:])]
+        return out
+
+    def __getitem__(self, key: str):
+        return self.lines() if key == "lines" else getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, PayrollResult): return NotImplemented
+        return (self.calculator is other.calculator and self.codes == other.codes and self.amounts == other.amounts
+                and self.total_ded == other.total_ded and self.fgts == other.fgts and self.state_code == other.state_code and self.trace == other.trace and self.cents == other.cents)
+
+    __hash__ = None
+
+
+class CountryCalculator:
+    """Calculadora compilada de um país: base, componentes na ordem do demonstrativo e depósito do empregador."""
+    __slots__ = ("country_code", "components", "deposit_rate", "rounding", "labels", "record_dtype", "cents_dtype", "_steps", "_unit_steps", "_track")
+
+    def __init__(self, country_code: str, base_label: str, other_label: str, components: List[Any], deposit_rate: float, rounding: Rounding = None):
+        self.country_code = country_code
+        self.components = tuple(components); self.deposit_rate = deposit_rate; self.rounding = rounding or Rounding()
+        self.labels = {"base": base_label, **{c.code: c.label for c in self.components}, "other": other_label}
+        if len(self.labels) != len(self.components) + 2: raise ValueError(f"Códigos de componente repetidos na calculadora de '{country_code}'")
+        # Lotes: uma coluna float64 por código, mais os totais
+        self.record_dtype = np.dtype([(code, np.float64) for code in self.labels] + [(k, np.float64) for k in ("total_ded", "net", "fgts")])
+        self.cents_dtype = np.dtype([(name, np.int64) for name in self.record_dtype.names])
+        # Passos pré-resolvidos (método ligado, rótulo, código, base, explicação) para a chamada escalar
+        self._steps = tuple((c.amount, c.label, c.code, c.base, c.explain) for c in self.components)
+        # No exato, o imposto anual por tabela (BracketTax) é dividido pelos períodos no arredondamento da linha
+        self._unit_steps = tuple((c.units, c.label, c.code, c.base, int(c.periods) if c.__class__ is BracketTax else 1) for c in self.components)
+        self._track = any(c.base is not None for c in self.components) # Só guarda valores se alguma base depende deles
+
+    @property
+    def base_label(self) -> str: return self.labels["base"]
+
+    @property
+    def other_label(self) -> str: return self.labels["other"]
+
+    @property
+    def reads_state(self) -> bool:
+        """Se o estado/província muda o cálculo (alíquota estadual ou tabela por jurisdição)."""
+        return any(c.__class__ is StateRate or (c.__class__ is BracketTax and (c._regional or c.flat_fallback)) for c in self.components)
+
+    @property
+    def reads_dependents(self) -> bool:
+        """Se o número de dependentes muda o cálculo (dedução por dependente do IRRF)."""
+        return any(c.__class__ is BracketDeduction for c in self.components)
+
+    def __call__(self, salary: float, other_deductions: float, state_code=None, state_rate=None, dependentes=0, trace: bool = False) -> PayrollResult:
+        """Demonstrativo de um empregado; com `trace`, cada componente explica a própria conta em `result.trace`."""
+        codes = ["base"]; amounts = [salary]; total_ded = 0.0; values = {}; track = self._track
+        steps = [] if trace else None
+        for amount, label, code, base_spec, explain in self._steps:
+            if base_spec is None: base = salary; v = amount(salary, state_code, state_rate, dependentes)
+            else:
+                base = salary
+                for lbl in base_spec[0]: base = base - values.get(lbl, 0.0)
+                if base_spec[1]: base = max(base, 0.0)
+                v = amount(base, state_code, state_rate, dependentes)
+            if v is None: continue
+            if track: values[label] = v
+            total_ded += v
+            codes.append(code); amounts.append(v)
+            if steps is not None: steps.append({"code": code, "amount": v, **explain(base, state_code, state_rate, dependentes)})
+        if other_deductions > 0: codes.append("other"); amounts.append(other_deductions)
+        total_ded += other_deductions
+        fgts = salary * self.deposit_rate if self.deposit_rate else 0.0
+        return PayrollResult(self, codes, amounts, salary, total_ded, salary - total_ded, fgts, state_code, steps)
+
+    def cents(self, salary: int, other_deductions: int = 0, state_code=None, state_rate=None, dependentes=0) -> PayrollResult:
+        """Demonstrativo exato em centavos inteiros; cada linha é arredondada pela regra do país (`rounding`).
+
+        As bases derivadas (ex.: IRRF sobre salário - INSS) usam os valores já arredondados, como no holerite.
+        """
+        rounding = self.rounding
+        codes = ["base"]; amounts = [salary]; total_ded = 0; values = {}; track = self._track
+        for units, label, code, base_spec, periods in self._unit_steps:
+            base = salary
+            if base_spec is not None:
+                for lbl in base_spec[0]: base = base - values.get(lbl, 0)
+                if base_spec[1]: base = max(base, 0)
+            u = units(base, state_code, state_rate, dependentes)
+            if u is None: continue
+            v = rounding.apply(u, periods)
+            if track: values[label] = v
+            total_ded += v
+            codes.append(code); amounts.append(v)
+        if other_deductions > 0: codes.append("other"); amounts.append(other_deductions)
+        total_ded += other_deductions
+        fgts = rounding.apply(salary * rate_units(self.deposit_rate)) if self.deposit_rate else 0
+        return PayrollResult(self, codes, amounts, salary, total_ded, salary - total_ded, fgts, state_code, None, cents=True)
+
+    def evaluate_cents(self, salary: np.ndarray, other_deductions=0, state_rate=None, dependentes=0, state_code=None) -> np.ndarray:
+        """Lote exato: salários em centavos (int64) -> array estruturado int64 (`cents_dtype`), igual a `cents` linha a linha."""
+        salary = np.asarray(salary, dtype=np.int64)
+        if salary.size and int(np.abs(salary).max()) > MAX_SAFE_CENTS: raise ValueError("Salário grande demais para o cálculo exato em int64")
+        rounding = self.rounding; regions = as_categories(state_code)
+        out = np.zeros(salary.shape, dtype=self.cents_dtype); out["base"] = salary
+        total_ded = np.zeros_like(salary); values = {}
+        for comp, (_, label, code, base_spec, periods) in zip(self.components, self._unit_steps):
+            base = salary
+            if base_spec is not None:
+                for lbl in base_spec[0]: base = base - values.get(lbl, 0)
+                if base_spec[1]: base = np.maximum(base, 0)
+            u = comp.units_vec(base, state_rate, dependentes, regions)
+            if u is None: continue
+            v = rounding.apply_vec(u, periods)
+            values[label] = v; out[code] = v; total_ded = total_ded + v
+        other = np.asarray(other_deductions, dtype=np.int64)
+        out["other"] = other; total_ded = total_ded + other
+        out["total_ded"] = total_ded; out["net"] = salary - total_ded
+        if self.deposit_rate: out["fgts"] = rounding.apply_vec(salary * rate_units(self.deposit_rate))
+        return out
+
+    def _components_vec(self, salary: np.ndarray, state_rate, dependentes, regions) -> List[Tuple[str, np.ndarray]]:
+        """(código, valor) de cada componente que se aplica ao lote, na ordem do demonstrativo."""
+        out = []; values = {}
+        for comp in self.components:
+            base = salary
+            if comp.base is not None:
+                for lbl in comp.base[0]: base = base - values.get(lbl, 0.0)
+                if comp.base[1]: base = np.maximum(base, 0.0)
+            v = comp.amount_vec(base, state_rate, dependentes, regions)
+            if v is None: continue
+            values[comp.label] = v; out.append((comp.code, v))
+        return out
+
+    def evaluate_vec(self, salary: np.ndarray, other_deductions=0.0, state_rate=None, dependentes=0, state_code=None) -> Dict[str, np.ndarray]:
+        salary = np.asarray(salary, dtype=np.float64)
+        total_ded = np.zeros_like(salary)
+        for _, v in self._components_vec(salary, state_rate, dependentes, as_categories(state_code)): total_ded = total_ded + v
+        total_ded = total_ded + np.asarray(other_deductions, dtype=np.float64)
+        fgts = salary * self.deposit_rate if self.deposit_rate else np.zeros_like(salary)
+        return {"total_earn": salary, "total_ded": total_ded, "net": salary - total_ded, "fgts": fgts}
+
+    def evaluate_records(self, salary: np.ndarray, other_deductions=0.0, state_rate=None, dependentes=0, state_code=None) -> np.ndarray:
+        """Lote como array estruturado (`record_dtype`): uma coluna por código de componente e os totais.
+
+        Componentes que não se aplicam ficam com zero; os totais coincidem com `evaluate_vec`.
+        """
+        salary = np.asarray(salary, dtype=np.float64)
+        out = np.zeros(salary.shape, dtype=self.record_dtype); out["base"] = salary
+        total_ded = np.zeros_like(salary)
+        for code, v in self._components_vec(salary, state_rate, dependentes, as_categories(state_code)):
+            out[code] = v; total_ded = total_ded + v
+        other = np.asarray(other_deductions, dtype=np.float64)
+        out["other"] = other; total_ded = total_ded + other
+        out["total_ded"] = total_ded; out["net"] = salary - total_ded
+        if self.deposit_rate: out["fgts"] = salary * self.deposit_rate
+        return out
+
+
+def _slug(label: str) -> str:
+    """Código derivado do rótulo, sem acentos: "Pensão" -> "pensao", "FICA (Social Security)" -> "fica_social_security"."""
+    ascii_label = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^0-9a-z]+", "_", ascii_label.lower()).strip("_")
+
+class CalculatorRegistry:
+    """Compila calculadoras a partir das especificações, sob demanda, e as mantém em cache por país.
+
+    `params` resolve referências "$NOME" (tetos/alíquotas do motor), `rule_tables` as tabelas
+    nomeadas ("br_inss", "br_irrf", "tax_brackets") e `tables_ext["TABLES"]` as alíquotas por país.
+    """
+
+    def __init__(self, specs: Dict[str, Any], params: Dict[str, float], tables_ext: Optional[Dict[str, Any]],
+                 tables_default: Dict[str, Any], rule_tables: Dict[str, Any]):
+        self.specs = specs; self.params = params; self.tables_ext = tables_ext
+        self.tables_default = tables_default; self.rule_tables = rule_tables
+        self._calculators: Dict[str, CountryCalculator] = {}
+
+    def get(self, country_code: str) -> CountryCalculator:
+        calc = self._calculators.get(country_code)
+        if calc is None: calc = self._calculators[country_code] = self._compile(country_code)
+        return calc
+
+    def _country_rates(self, country_code: str) -> Dict[str, float]:
+        rates = (self.tables_ext or {}).get("TABLES", {}).get(country_code, {}).get("rates", {})
+        return rates or self.tables_default.get(country_code, {}).get("rates", {})
+
+    def _value(self, value: Any, rates: Dict[str, float]) -> float:
+        if isinstance(value, str) and value.startswith("$"): return float(self.params[value[1:]])
+        if isinstance(value, dict) and "table_rate" in value:
+            keys = value["table_rate"]; keys = [keys] if isinstance(keys, str) else keys
+            default = value.get("default", 0.0)
+            rate = rates.get(keys[0], default)
+            for key in keys[1:]: rate = rate or rates.get(key, default)
+            return float(rate)
+        return float(value)
+
+    def _compile(self, country_code: str) -> CountryCalculator:
+        spec = self.specs.get(country_code) or self.specs.get("default", {})
+        rates = self._country_rates(country_code)
+        components = []
+        for c in spec.get("components", []):
+            kind = c.get("type"); label = c.get("label", kind); start = len(components)
+            base = c.get("base")
+            base = (tuple(base.get("minus", [])), bool(base.get("floor", False))) if base else None
+            if kind == "table_rates":
+                # Com "cap", todas as alíquotas da tabela incidem até o mesmo teto mensal (ex.: tope imponible do Chile)
+                cap = self._value(c["cap"], rates) if c.get("cap") is not None else None
+                components += [FlatRate(k, base, float(aliq)) if cap is None else CappedRate(k, base, float(aliq), cap) for k, aliq in rates.items()]
+            elif kind == "flat_rate": components.append(FlatRate(label, base, self._value(c["rate"], rates)))
+            elif kind == "capped_rate": components.append(CappedRate(label, base, self._value(c["rate"], rates), self._value(c["cap"], rates)))
+            elif kind == "band_rate": components.append(BandRate(label, base, self._value(c["rate"], rates), self._value(c["lower"], rates), self._value(c["upper"], rates)))
+            elif kind == "progressive": components.append(Progressive(label, base, self.rule_tables.get(c["table"])))
+            elif kind == "bracket_deduction": components.append(BracketDeduction(label, base, self.rule_tables.get(c["table"])))
+            elif kind == "state_rate": components.append(StateRate(label, base))
+            elif kind == "bracket_tax":
+                components.append(BracketTax(label, base, self.rule_tables.get(c.get("schedules", "tax_brackets")), c["jurisdiction"],
+                                             float(c.get("periods", 12)), bool(c.get("flat_fallback", False))))
+            else: raise ValueError(f"Componente desconhecido '{kind}' na calculadora de '{country_code}'")
+            # Código estável da linha: o da especificação ou, na falta dele, derivado do rótulo
+            for comp in components[start:]: comp.code = c.get("code") if kind != "table_rates" and c.get("code") else _slug(comp.label)
+        deposit = spec.get("employer_deposit")
+        deposit_rate = self._value(deposit["rate"], rates) if deposit else 0.0
+        return CountryCalculator(country_code, spec.get("base_label", "Base"), spec.get("other_label", "Outras Deduções"), components, deposit_rate,
+                                 Rounding.from_spec(spec.get("rounding")))
@@ -0,0 +1,74 @@
+# -------------------------------------------------------------
+# 🪙 Aritmética em Centavos Inteiros (ponto fixo)
+# Valores monetários em centavos (int do Python no escalar, int64 nos lotes) e
+# alíquotas em milionésimos (RATE_SCALE): o produto base x alíquota é exato e
+# só é arredondado nos pontos legais (o valor de cada linha do demonstrativo),
+# com a regra de arredondamento de cada país (passo e modo).
+# -------------------------------------------------------------
+
+from typing import Any, Dict
+
+import numpy as np
+
+CENTS = 100 # Centavos por unidade da moeda
+RATE_SCALE = 10 ** 6 # Alíquotas em milionésimos (0,1115 -> 111500)
+ROUNDING_MODES = ("half_up", "half_even", "down", "up")
+# Maior base (em centavos, já anualizada) cujo produto pela alíquota ainda cabe em int64
+MAX_SAFE_CENTS = np.iinfo(np.int64).max // (RATE_SCALE * 16)
+
+
+def to_cents(value: float) -> int:
+    """Float em unidades da moeda para centavos (exato para valores com até 2 casas)."""
+    return int(round(value * CENTS))
+
+def to_cents_vec(values: Any) -> np.ndarray:
+    """Versão vetorizada de `to_cents` (int64)."""
+    return np.rint(np.asarray(values, dtype=np.float64) * CENTS).astype(np.int64)
+
+def rate_units(rate: float) -> int:
+    """Alíquota em milionésimos."""
+    return int(round(rate * RATE_SCALE))
+
+def rate_units_vec(rates: Any) -> np.ndarray:
+    return np.rint(np.asarray(rates, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+
+
+def round_div(num: int, den: int, mode: str = "half_up") -> int:
+    """num / den arredondado para inteiro; "half_up" arredonda o meio para longe de zero."""
+    q, r = divmod(abs(num), den)
+    if r:
+        if mode == "up" or (mode == "half_up" and 2 * r >= den) or (mode == "half_even" and (2 * r > den or (2 * r == den and q % 2))): q += 1
+    return -q if num < 0 else q
+
+def round_div_vec(num: np.ndarray, den: int, mode: str = "half_up") -> np.ndarray:
+    """Versão int64 de `round_div` (divisor escalar positivo)."""
+    num = np.asarray(num, dtype=np.int64)
+    q, r = np.divmod(np.abs(num), den)
+    if mode == "up": q += r > 0
+    elif mode == "half_up": q += 2 * r >= den
+    elif mode == "half_even": q += (2 * r > den) | ((2 * r == den) & (q % 2 == 1))
+    return np.where(num < 0, -q, q)
+
+
+class Rounding:
+    """Regra de arredondamento legal de um país: passo (em centavos) e modo.
+
+    Ex.: centavos com meio para cima (padrão) ou pesos inteiros no Chile (`step` 1.0 na moeda).
+    """
+    __slots__ = ("step", "mode")
+
+    def __init__(self, step: float = 0.01, mode: str = "half_up"):
+        if mode not in ROUNDING_MODES: raise ValueError(f"Modo de arredondamento desconhecido: '{mode}'")
+        self.step = max(to_cents(step), 1); self.mode = mode
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any] = None) -> "Rounding":
+        spec = spec or {}
+        return cls(float(spec.get("step", 0.01)), spec.get("mode", "half_up"))
+
+    def apply(self, units: int, periods: int = 1) -> int:
+        """Valor exato em centavos x RATE_SCALE (dividido por `periods`) arredondado em centavos."""
+        return round_div(units, RATE_SCALE * periods * self.step, self.mode) * self.step
+
+    def apply_vec(self, units: np.ndarray, periods: int = 1) -> np.ndarray:
+        return round_div_vec(units, RATE_SCALE * periods * self.step, self.mode) * self.step
@@ -0,0 +1,156 @@
+# -------------------------------------------------------------
+# 🧭 Otimizador de Contratação com Orçamento (custo do empregador + STI)
+# Dado um país, um orçamento anual e um mix de cargos por nível STI, responde:
+#   - "salary": com as quantidades fixas, qual o maior salário que cabe
+#     (salários proporcionais a um peso por cargo);
+#   - "headcount": com os salários fixos, quantas pessoas cabem respeitando
+#     a proporção de cada cargo.
+# O custo por pessoa vem das tabelas lineares por partes de piecewise.py
+# (encargos + bônus alvo da faixa STI) e é crescente no salário e na
+# quantidade, então a busca é uma bisseção em vez de uma grade de tentativas.
+#
+# Uso:
+#   python hiring_optimizer.py salary --country Brasil --budget 2000000 --role "Non Sales:Senior Manager:3:1.5" --role "Non Sales:Others:10"
+#   python hiring_optimizer.py headcount --country México --budget 5e6 --role "Sales:Others:0.7:30000" --role "Sales:Manager / Selected Sales Manager:0.3:60000"
+# -------------------------------------------------------------
+
+from typing import Any, Dict, List, Sequence
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from payroll_engine import load_tables_data
+from monte_carlo import sti_bonus_bounds
+from piecewise import PiecewiseLinear, compile_employer_cost, employer_cost_table
+
+STI_TARGETS = ("min", "mid", "max") # Ponto da faixa STI usado como bônus alvo
+SALARY_TOL = 0.005 # Precisão da bisseção do salário (meio centavo)
+MAX_ITER = 200
+
+
+def sti_target_pct(area: str, level: str, target: str = "mid") -> float:
+    """Bônus alvo como fração do salário anual (mínimo, meio ou máximo da faixa STI do nível)."""
+    if target not in STI_TARGETS: raise ValueError(f"Alvo de STI desconhecido: '{target}'")
+    lo, hi = sti_bonus_bounds(area, level)
+    return lo if target == "min" else hi if target == "max" else (lo + hi) / 2.0
+
+def role_cost_tables(country: str, roles: pd.DataFrame, target: str, tables_ext: Dict[str, Any] = None) -> List[PiecewiseLinear]:
+    """Salário mensal -> custo anual por pessoa de cada cargo, com o bônus alvo do nível incluído.
+
+    O bônus STI incide sobre o salário anual com extras (salário x REMUN_MONTHS), como no simulador.
+    """
+    default_tables = load_tables_data()[1]
+    tables_ext = default_tables if tables_ext is None else tables_ext
+    months = tables_ext.get("REMUN_MONTHS", {}).get(country, 12.0)
+    tables = []
+    for area, level in zip(roles["area"], roles["level"]):
+        share = sti_target_pct(area, level, target) * months / 12.0
+        tables.append(employer_cost_table(country, 0.0, share) if tables_ext is default_tables else compile_employer_cost(country, 0.0, share, tables_ext))
+    return tables
+
+
+def _plan_frame(roles: pd.DataFrame, counts: np.ndarray, salaries: np.ndarray, tables: Sequence[PiecewiseLinear], country: str, target: str,
+                tables_ext: Dict[str, Any]) -> pd.DataFrame:
+    months = (tables_ext or load_tables_data()[1]).get("REMUN_MONTHS", {}).get(country, 12.0)
+    per_head = np.array([t(s) for t, s in zip(tables, salaries)])
+    bonus = np.array([sti_target_pct(a, l, target) for a, l in zip(roles["area"], roles["level"])]) * salaries * months
+    return pd.DataFrame({"area": roles["area"].to_numpy(), "level": roles["level"].to_numpy(), "count": counts.astype(np.int64),
+                         "salary": salaries, "bonus": bonus, "cost_per_head": per_head, "cost": counts * per_head})
+
+def _result(mode: str, budget: float, plan: pd.DataFrame, iterations: int, t0: float, **extra) -> Dict[str, Any]:
+    total = float(plan["cost"].sum())
+    return {"mode": mode, "budget": budget, "feasible": total <= budget, "total_cost": total, "slack": budget - total,
+            "headcount": int(plan["count"].sum()), "plan": plan, "iterations": iterations, "elapsed_ms": (time.perf_counter() - t0) * 1000.0, **extra}
+
+
+def max_salary_plan(country: str, budget: float, roles: pd.DataFrame, target: str = "mid", tables_ext: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Maior salário que cabe no orçamento com as quantidades de `roles` (colunas area, level, count e, opcional, weight).
+
+    O salário do cargo i é `base x weight_i`; a bisseção procura `base` e os salários finais são truncados no centavo.
+    """
+    t0 = time.perf_counter()
+    counts = roles["count"].to_numpy(dtype=np.float64)
+    weights = roles["weight"].to_numpy(dtype=np.float64) if "weight" in roles else np.ones(len(roles))
+    if (counts < 0).any() or (weights <= 0).any(): raise ValueError("Quantidades devem ser >= 0 e pesos > 0")
+    tables = role_cost_tables(country, roles, target, tables_ext)
+    total = lambda base: sum(c * t(base * w) for c, w, t in zip(counts, weights, tables) if c)
+
+    lo, hi, iterations = 0.0, 1.0, 0
+    if total(0.0) > budget or not counts.any():
+        plan = _plan_frame(roles, counts, np.zeros(len(roles)), tables, country, target, tables_ext)
+        return _result("salary", budget, plan, iterations, t0, base_salary=0.0)
+    while total(hi) <= budget and iterations < MAX_ITER: lo, hi, iterations = hi, hi * 2.0, iterations + 1
+    # Custo crescente no salário: mantém total(lo) <= orçamento < total(hi)
+    while hi - lo > SALARY_TOL and iterations < MAX_ITER:
+        mid = (lo + hi) / 2.0; iterations += 1
+        if total(mid) <= budget: lo = mid
+        else: hi = mid
+    salaries = np.floor(lo * weights * 100.0) / 100.0
+    plan = _plan_frame(roles, counts, salaries, tables, country, target, tables_ext)
+    return _result("salary", budget, plan, iterations, t0, base_salary=lo)
+
+
+def max_headcount_plan(country: str, budget: float, roles: pd.DataFrame, target: str = "mid", tables_ext: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Maior quadro que cabe no orçamento com salários fixos e a proporção de `roles` (colunas area, level, share, salary).
+
+    A bisseção procura o total N com `floor(N x share_i)` pessoas por cargo (crescente em N); o que sobra do
+    orçamento é preenchido uma pessoa por vez, no cargo mais abaixo da proporção que ainda couber.
+    """
+    t0 = time.perf_counter()
+    shares = roles["share"].to_numpy(dtype=np.float64); salaries = roles["salary"].to_numpy(dtype=np.float64)
+    if (shares < 0).any() or shares.sum() <= 0 or (salaries < 0).any(): raise ValueError("Proporções devem ser >= 0 (com soma positiva) e salários >= 0")
+    shares = shares / shares.sum()
+    tables = role_cost_tables(country, roles, target, tables_ext)
+    per_head = np.array([t(s) for t, s in zip(tables, salaries)])
+    counts_for = lambda n: np.floor(n * shares + 1e-9)
+    cost_for = lambda n: float(counts_for(n) @ per_head)
+
+    positive = per_head[shares > 0]
+    if (positive <= 0).any(): raise ValueError("Cargo com custo zero: o quadro não tem limite")
+    lo, hi, iterations = 0, max(int(budget // positive.min()) + 1, 1), 0
+    while hi - lo > 1 and iterations < MAX_ITER:
+        mid = (lo + hi) // 2; iterations += 1
+        if cost_for(mid) <= budget: lo = mid
+        else: hi = mid
+    counts = counts_for(lo); left = budget - float(counts @ per_head)
+    while True:
+        # Completa o quadro pelo cargo com maior déficit em relação à proporção alvo
+        deficit = (counts.sum() + 1) * shares - counts
+        fits = (per_head <= left) & (shares > 0)
+        if not fits.any(): break
+        i = int(np.argmax(np.where(fits, deficit, -np.inf)))
+        counts[i] += 1; left -= per_head[i]
+    plan = _plan_frame(roles, counts, salaries, tables, country, target, tables_ext)
+    return _result("headcount", budget, plan, iterations, t0)
+
+
+def _parse_roles(specs: List[str], mode: str) -> pd.DataFrame:
+    rows = []
+    for spec in specs:
+        parts = spec.split(":")
+        if len(parts) < 3: raise ValueError(f"Cargo inválido '{spec}': use área:nível:quantidade[:peso] ou área:nível:proporção:salário")
+        if mode == "salary": rows.append({"area": parts[0], "level": parts[1], "count": float(parts[2]), "weight": float(parts[3]) if len(parts) > 3 else 1.0})
+        else: rows.append({"area": parts[0], "level": parts[1], "share": float(parts[2]), "salary": float(parts[3])})
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plano de contratação que cabe num orçamento anual (custo do empregador + bônus STI alvo).")
+    parser.add_argument("mode", choices=("salary", "headcount"))
+    parser.add_argument("--country", required=True)
+    parser.add_argument("--budget", type=float, required=True, help="Orçamento anual na moeda local")
+    parser.add_argument("--role", action="append", required=True, help="salary: área:nível:quantidade[:peso] | headcount: área:nível:proporção:salário")
+    parser.add_argument("--target", choices=STI_TARGETS, default="mid")
+    args = parser.parse_args(argv)
+
+    roles = _parse_roles(args.role, args.mode)
+    optimize = max_salary_plan if args.mode == "salary" else max_headcount_plan
+    result = optimize(args.country, args.budget, roles, args.target)
+    print(result["plan"].to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    print(f"Custo total {result['total_cost']:,.2f} de {result['budget']:,.2f} (sobra {result['slack']:,.2f}) | "
+          f"{result['headcount']} pessoas | {result['iterations']} iterações em {result['elapsed_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
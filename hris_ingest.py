@@ -0,0 +1,179 @@
+# -------------------------------------------------------------
+# 🔌 Ingestão Assíncrona do HRIS (API REST paginada)
+# Busca as páginas de empregados com conexões reaproveitadas (pool), concorrência
+# limitada e retry com backoff; as páginas passam por uma fila limitada até o
+# motor de cálculo, de modo que busca e cálculo acontecem em paralelo.
+#
+# Contrato esperado da API:
+#   GET {base_url}/employees?page=N&page_size=M
+#   -> {"data": [{"id", "country", "salary", "bonus", "dependents", "other_deductions", "state"}, ...],
+#       "page": N, "total_pages": K}
+#
+# Uso:
+#   python hris_ingest.py fetch https://hris.exemplo.com/api --token XYZ --out resultado.parquet
+# Os testes (tests/test_hris_ingest.py) rodam contra um servidor HRIS simulado local (tests/mock_hris.py).
+# -------------------------------------------------------------
+
+from typing import Dict, Any, List, Callable, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import argparse
+import asyncio
+import random
+import time
+
+import pyarrow as pa
+import requests
+from requests.adapters import HTTPAdapter
+
+from payroll_engine import load_tables_data
+from batch_io import BatchWriter, compute_batch, skipped_rows
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+MAX_RETRY_DELAY = 60.0 # Teto da espera entre tentativas, inclusive a pedida pelo servidor em Retry-After
+DATA_KEY = "data"
+TOTAL_PAGES_KEY = "total_pages"
+
+
+def retry_after_seconds(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Espera pedida num cabeçalho Retry-After (segundos ou data HTTP, RFC 9110); None se ausente ou inválido."""
+    if not value: return None
+    value = value.strip()
+    if value.isdigit(): return float(value)
+    try: when = parsedate_to_datetime(value)
+    except (TypeError, ValueError): return None
+    if when.tzinfo is None: when = when.replace(tzinfo=timezone.utc)
+    return max((when - (now or datetime.now(timezone.utc))).total_seconds(), 0.0)
+
+
+class HRISClient:
+    """Cliente HTTP do HRIS: sessão `requests` com pool de conexões, usada a partir do asyncio."""
+
+    def __init__(self, base_url: str, token: str = None, page_size: int = 500, max_concurrency: int = 4,
+                 max_retries: int = 5, backoff: float = 0.5, timeout: float = 30.0, max_retry_delay: float = MAX_RETRY_DELAY):
+        self.base_url = base_url.rstrip("/"); self.page_size = page_size
+        self.max_concurrency = max_concurrency; self.max_retries = max_retries
+        self.backoff = backoff; self.timeout = timeout; self.max_retry_delay = max_retry_delay; self.retries = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        if token: self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, page: int) -> requests.Response:
+        return self.session.get(f"{self.base_url}/employees", params={"page": page, "page_size": self.page_size}, timeout=self.timeout)
+
+    async def fetch_page(self, page: int) -> Dict[str, Any]:
+        """Busca uma página; erros transitórios (rede, 429, 5xx) são repetidos com backoff exponencial.
+
+        Um Retry-After do servidor substitui o backoff; as duas esperas são limitadas a `max_retry_delay`.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                # `requests` é bloqueante: roda em thread para não travar o loop de eventos
+                resp = await asyncio.to_thread(self._get, page)
+                if resp.status_code not in RETRY_STATUS:
+                    resp.raise_for_status()
+                    return resp.json()
+                retry_after = resp.headers.get("Retry-After")
+                if attempt == self.max_retries: resp.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries: raise
+            self.retries += 1
+            delay = retry_after_seconds(retry_after)
+            if delay is None: delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            await asyncio.sleep(min(delay, self.max_retry_delay))
+
+
+def records_to_batch(records: List[Dict[str, Any]]) -> pa.RecordBatch:
+    """Converte uma página de registros do HRIS num RecordBatch com tipos fixos (mesmo schema em todas as páginas)."""
+    return pa.RecordBatch.from_arrays([
+        pa.array([str(r.get("id", "")) for r in records], pa.string()),
+        pa.array([r.get("country") for r in records], pa.string()),
+        pa.array([r.get("salary") for r in records], pa.float64()),
+        pa.array([r.get("bonus") for r in records], pa.float64()),
+        pa.array([r.get("dependents") for r in records], pa.int64()),
+        pa.array([r.get("other_deductions") for r in records], pa.float64()),
+        pa.array([r.get("state") for r in records], pa.string()),
+    ], names=["employee_id", "country", "salary", "bonus", "dependents", "other_deductions", "state"])
+
+async def ingest(client: HRISClient, on_result: Callable[[pa.RecordBatch], None], queue_size: int = 8) -> Dict[str, float]:
+    """Busca todas as páginas e calcula cada uma assim que chega.
+
+    A fila tem no máximo `queue_size` páginas: se o cálculo atrasar, os downloads esperam (backpressure).
+    """
+    _, tables_ext, br_inss_tbl, br_irrf_tbl = load_tables_data()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    t0 = time.perf_counter()
+    first = await client.fetch_page(1)
+    total_pages = int(first.get(TOTAL_PAGES_KEY, 1) or 1)
+
+    async def producer():
+        try:
+            await queue.put(first.get(DATA_KEY, []))
+            pages = iter(range(2, total_pages + 1))
+            async def worker():
+                # Iterador compartilhado: no máximo `max_concurrency` páginas em voo
+                for page in pages:
+                    body = await client.fetch_page(page)
+                    await queue.put(body.get(DATA_KEY, []))
+            workers = [asyncio.create_task(worker()) for _ in range(client.max_concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # A primeira página que falha encerra a ingestão: cancela os outros workers em vez de deixá-los baixando
+                for task in workers: task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+        finally:
+            await queue.put(None)
+
+    producer_task = asyncio.create_task(producer())
+    records_total = skipped = 0
+    try:
+        while (records := await queue.get()) is not None:
+            if not records: continue
+            batch = records_to_batch(records)
+            result = await asyncio.to_thread(compute_batch, batch, tables_ext, br_inss_tbl, br_irrf_tbl)
+            on_result(result); records_total += result.num_rows; skipped += skipped_rows(result)
+        await producer_task # Propaga erro de download, se houver
+    finally:
+        if not producer_task.done(): producer_task.cancel()
+    elapsed = time.perf_counter() - t0
+    return {"pages": total_pages, "records": records_total, "seconds": elapsed, "records_per_s": records_total / elapsed if elapsed else 0.0,
+            "skipped": skipped, "retries": client.retries}
+
+def run_ingestion(base_url: str, output_path: str = None, token: str = None, **client_kwargs) -> Dict[str, float]:
+    client = HRISClient(base_url, token=token, **client_kwargs)
+    writer: Optional[BatchWriter] = None
+    def on_result(batch: pa.RecordBatch):
+        nonlocal writer
+        if output_path is None: return
+        if writer is None: writer = BatchWriter(output_path, batch.schema)
+        writer.write(batch)
+    try:
+        return asyncio.run(ingest(client, on_result))
+    finally:
+        if writer is not None: writer.close()
+        client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestão do HRIS com cálculo de líquido e custo do empregador.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    fetch = sub.add_parser("fetch", help="Busca na API do HRIS e calcula")
+    fetch.add_argument("base_url"); fetch.add_argument("--token"); fetch.add_argument("--out")
+    fetch.add_argument("--page-size", type=int, default=500)
+    fetch.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    stats = run_ingestion(args.base_url, args.out, token=args.token, page_size=args.page_size, max_concurrency=args.concurrency)
+    print(f"{stats['records']:,} registros em {stats['pages']} páginas, {stats['seconds']:.2f}s ({stats['records_per_s']:,.0f}/s), {stats['retries']} retries")
+    if stats["skipped"]: print(f"{stats['skipped']:,} registros com país vazio ou não suportado ficaram sem resultado")
+
+
+if __name__ == "__main__":
+    main()
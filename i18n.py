@@ -0,0 +1,344 @@
+# -------------------------------------------------------------
+# 🌐 Pacotes de Idioma (i18n) sob demanda
+# Os textos vêm de i18n.json, lido uma única vez por processo (não a cada rerun
+# do app); o pacote de cada idioma só é montado quando esse idioma é pedido e
+# fica em cache. O fallback é usado quando o arquivo não existe ou está inválido.
+# -------------------------------------------------------------
+
+from functools import lru_cache
+from typing import Dict, List
+import os
+
+from payroll_engine import CONFIG_DIR, load_json
+
+I18N_FILE = os.path.join(CONFIG_DIR, "i18n.json")
+DEFAULT_LANGUAGE = "Português"
+
+# --- Fallbacks Mínimos (COM TEXTOS ANUAIS AJUSTADOS) ---
+# ALTERAÇÃO: sidebar_title ajustado com quebra de linha e subtítulo
+I18N_FALLBACK = { 
+    "Português": { 
+        "sidebar_title": "Simulador de Remuneração<br><span style='font-size: 14px; font-weight: 400;'>Região das Américas</span>", 
+        "app_title": "Simulador de Salário Líquido e Custo do Empregador", 
+        "menu_calc": "Simulador de Remuneração", 
+        "menu_rules": "Regras de Contribuições", 
+        "menu_rules_sti": "Regras de Cálculo do STI", 
+        "menu_cost": "Custo do Empregador", 
+        "title_calc": "Simulador de Remuneração", 
+        "title_rules": "Regras de Contribuições", 
+        "title_rules_sti": "Regras de Cálculo do STI", 
+        "title_cost": "Custo do Empregador", 
+        "menu_hiring": "Orçamento de Contratação", 
+        "title_hiring": "Orçamento de Contratação", 
+        "menu_upload": "Processar Planilha", 
+        "title_upload": "Processamento de Planilha de Empregados", 
+        "country": "País", 
+        "salary": "Salário Bruto", 
+        "state": "Estado (EUA)",
+        "province": "Província (Canadá)", 
+        "state_rate": "State Tax (%)", 
+        "dependents": "Dependentes (IR)", 
+        "bonus": "Bônus", # CORREÇÃO
+        "other_deductions": "Outras Deduções Mensais", 
+        "earnings": "Proventos", 
+        "deductions": "Descontos", 
+        "scenarios_title": "💾 Cenários salvos", 
+        "scenario_name": "Nome do cenário", 
+        "scenario_save": "Salvar cenário", 
+        "scenario_saved": "Cenário salvo.", 
+        "scenario_load": "Carregar cenário", 
+        "scenario_load_btn": "Carregar", 
+        "scenario_none": "Nenhum cenário salvo para este país.", 
+        "scenario_stale": "As tabelas de regras mudaram desde que este cenário foi salvo; os valores acima foram recalculados.", 
+        "hiring_budget": "Orçamento anual", 
+        "hiring_mode": "Otimizar", 
+        "hiring_mode_salary": "Maior salário (quadro fixo)", 
+        "hiring_mode_headcount": "Maior quadro (salários fixos)", 
+        "hiring_target": "Bônus alvo (faixa STI)", 
+        "hiring_target_min": "Mínimo", 
+        "hiring_target_mid": "Médio", 
+        "hiring_target_max": "Máximo", 
+        "hiring_role": "Cargo (área — nível)", 
+        "hiring_count": "Quantidade", 
+        "hiring_weight": "Peso do salário", 
+        "hiring_share": "Proporção", 
+        "hiring_salary": "Salário mensal", 
+        "hiring_base_salary": "Salário base (peso 1)", 
+        "hiring_headcount": "Quadro", 
+        "hiring_total_cost": "Custo total", 
+        "hiring_slack": "Sobra do orçamento", 
+        "hiring_cost_per_head": "Custo por pessoa", 
+        "hiring_empty": "Adicione ao menos um cargo.", 
+        "hiring_infeasible": "Nenhum plano cabe no orçamento.", 
+        "hiring_solved": "Resolvido em {ms:.1f} ms ({n} iterações).", 
+        "payslip_title": "Demonstrativo de Pagamento", 
+        "payslip_employee": "Empregado", 
+        "payslip_period": "Competência", 
+        "payslip_description": "Descrição", 
+        "upload_file": "Planilha de empregados (CSV ou XLSX)", 
+        "upload_help": "Colunas: country, salary (mensal) e, opcionais, bonus (anual), dependents, other_deductions, state, sti_area e sti_level.", 
+        "upload_start": "Processar", 
+        "upload_cancel": "Cancelar", 
+        "upload_queued": "Aguardando vaga para processar...", 
+        "upload_progress": "{done:,} de {total} linhas • {rate:,.0f} linhas/s", 
+        "upload_done": "{rows:,} linhas processadas em {secs:.1f} s ({rate:,.0f} linhas/s).", 
+        "upload_skipped": "{rows:,} linhas com país vazio ou não suportado ficaram sem resultado.", 
+        "upload_cancelled": "Processamento cancelado ({rows:,} linhas processadas).", 
+        "upload_error": "Erro ao processar o arquivo: {error}", 
+        "upload_summary": "Resumo por país", 
+        "upload_rows": "Linhas", 
+        "upload_net_total": "Líquido mensal (soma)", 
+        "upload_sti_out": "Fora da faixa STI", 
+        "upload_preview": "Primeiras linhas", 
+        "upload_download": "Baixar resultados (CSV)", 
+        "comp_base": "Salário Base", 
+        "comp_other": "Outras Deduções", 
+        "net": "Salário Líquido", 
+        "fgts_deposit": "Depósito FGTS", 
+        "tot_earnings": "Total de Proventos", 
+        "tot_deductions": "Total de Descontos", 
+        "valid_from": "Vigência", 
+        "rules_emp": "Contribuições do Empregado", 
+        "rules_er": "Contribuições do Empregador", 
+        "rules_table_desc": "Descrição", 
+        "rules_table_rate": "Alíquota (%)", 
+        "rules_table_base": "Base de Cálculo", 
+        "rules_table_obs": "Observações / Teto", 
+        "official_source": "Fonte Oficial", 
+        "employer_cost_total": "Custo Total do Empregador", 
+        "annual_comp_title": "Composição da Remuneração Total Bruta", # CORREÇÃO
+        "calc_params_title": "Parâmetros de Cálculo da Remuneração", 
+        "monthly_comp_title": "Remuneração Mensal Bruta e Líquida", 
+        "annual_salary": "Salário Anual", 
+        "annual_bonus": "Bônus", 
+        "annual_total": "Remuneração Total", 
+        "months_factor": "Meses considerados", "pie_title": "Distribuição Anual: Salário vs Bônus", "pie_chart_title_dist": "Distribuição da Remuneração Total", "reload": "Recarregar tabelas", "source_remote": "Tabelas remotas", "source_local": "Fallback local", "choose_country": "Selecione o país", "menu_title": "Menu", "language_title": "🌐 Idioma / Language / Idioma", "area": "Área (STI)", "level": "Career Level (STI)", "rules_expanded": "Detalhes das Contribuições Obrigatórias", "salary_tooltip": "Seu salário mensal antes de impostos e deduções.", "dependents_tooltip": "Número de dependentes para dedução no Imposto de Renda (aplicável apenas no Brasil).", 
+        "bonus_tooltip": "Valor total do bônus esperado no ano (pago de uma vez ou parcelado).", 
+        "other_deductions_tooltip": "Soma de outras deduções mensais recorrentes (ex: plano de saúde, vale-refeição, contribuição sindical).", "sti_area_tooltip": "Selecione sua área de atuação (Vendas ou Não Vendas) para verificar a faixa de bônus (STI).", "sti_level_tooltip": "Selecione seu nível de carreira para verificar a faixa de bônus (STI). 'Others' inclui níveis não listados.", "sti_area_non_sales": "Não Vendas", "sti_area_sales": "Vendas", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Membros do GEB", "sti_level_executive_manager": "Gerente Executivo", "sti_level_senior_group_manager": "Gerente de Grupo Sênior", "sti_level_group_manager": "Gerente de Grupo", "sti_level_lead_expert_program_manager": "Especialista Líder / Gerente de Programa", "sti_level_senior_manager": "Gerente Sênior", "sti_level_senior_expert_senior_project_manager": "Especialista Sênior / Gerente de Projeto Sênior", "sti_level_manager_selected_expert_project_manager": "Gerente / Especialista Selecionado / Gerente de Projeto", "sti_level_others": "Outros", "sti_level_executive_manager_senior_group_manager": "Gerente Executivo / Gerente de Grupo Sênior", "sti_level_group_manager_lead_sales_manager": "Gerente de Grupo / Gerente de Vendas Líder", "sti_level_senior_manager_senior_sales_manager": "Gerente Sênior / Gerente de Vendas Sênior", "sti_level_manager_selected_sales_manager": "Gerente / Gerente de Vendas Selecionado", "sti_in_range": "Dentro do range", "sti_out_range": "Fora do range", "cost_header_charge": "Encargo", "cost_header_percent": "Percentual (%)", "cost_header_base": "Base", "cost_header_obs": "Observação", "cost_header_bonus": "Incide Bônus", "cost_header_vacation": "Incide Férias", "cost_header_13th": "Incide 13º", "sti_table_header_level": "Nível de Carreira", "sti_table_header_pct": "STI %" 
+    }, 
+    "English": { 
+        "sidebar_title": "Compensation Simulator<br><span style='font-size: 14px; font-weight: 400;'>Americas Region</span>", 
+        "other_deductions": "Other Monthly Deductions", 
+        "salary_tooltip": "Your monthly salary before taxes and deductions.", 
+        "dependents_tooltip": "Number of dependents for Income Tax deduction (applicable only in Brazil).", 
+        "bonus_tooltip": "Total expected bonus amount for the year (paid lump sum or installments).", 
+        "other_deductions_tooltip": "Sum of other recurring monthly deductions (e.g., health plan, meal voucher, union dues).", 
+        "sti_area_tooltip": "Select your area (Sales or Non Sales) to check the bonus (STI) range.", 
+        "sti_level_tooltip": "Select your career level to check the bonus (STI) range. 'Others' includes unlisted levels.", 
+        "app_title": "Net Salary & Employer Cost Simulator", 
+        "menu_calc": "Compensation Simulator", 
+        "menu_rules": "Contribution Rules", 
+        "menu_rules_sti": "STI Calculation Rules", 
+        "menu_cost": "Employer Cost", 
+        "title_calc": "Compensation Simulator", 
+        "title_rules": "Contribution Rules", 
+        "title_rules_sti": "STI Calculation Rules", 
+        "title_cost": "Employer Cost", 
+        "menu_hiring": "Hiring Budget", 
+        "title_hiring": "Hiring Budget", 
+        "menu_upload": "Process Spreadsheet", 
+        "title_upload": "Employee Spreadsheet Processing", 
+        "country": "Country", 
+        "salary": "Gross Salary", 
+        "state": "State (USA)",
+        "province": "Province (Canada)", 
+        "state_rate": "State Tax (%)", 
+        "dependents": "Dependents (Tax)", 
+        "bonus": "Bonus", # CORREÇÃO
+        "earnings": "Earnings", 
+        "deductions": "Deductions", 
+        "scenarios_title": "💾 Saved scenarios", 
+        "scenario_name": "Scenario name", 
+        "scenario_save": "Save scenario", 
+        "scenario_saved": "Scenario saved.", 
+        "scenario_load": "Load scenario", 
+        "scenario_load_btn": "Load", 
+        "scenario_none": "No saved scenarios for this country.", 
+        "scenario_stale": "The rule tables changed since this scenario was saved; the values above were recalculated.", 
+        "hiring_budget": "Annual budget", 
+        "hiring_mode": "Optimize", 
+        "hiring_mode_salary": "Max salary (fixed headcount)", 
+        "hiring_mode_headcount": "Max headcount (fixed salaries)", 
+        "hiring_target": "Target bonus (STI range)", 
+        "hiring_target_min": "Minimum", 
+        "hiring_target_mid": "Midpoint", 
+        "hiring_target_max": "Maximum", 
+        "hiring_role": "Role (area — level)", 
+        "hiring_count": "Count", 
+        "hiring_weight": "Salary weight", 
+        "hiring_share": "Share", 
+        "hiring_salary": "Monthly salary", 
+        "hiring_base_salary": "Base salary (weight 1)", 
+        "hiring_headcount": "Headcount", 
+        "hiring_total_cost": "Total cost", 
+        "hiring_slack": "Budget left", 
+        "hiring_cost_per_head": "Cost per head", 
+        "hiring_empty": "Add at least one role.", 
+        "hiring_infeasible": "No plan fits the budget.", 
+        "hiring_solved": "Solved in {ms:.1f} ms ({n} iterations).", 
+        "payslip_title": "Payslip", 
+        "payslip_employee": "Employee", 
+        "payslip_period": "Pay Period", 
+        "payslip_description": "Description", 
+        "upload_file": "Employee spreadsheet (CSV or XLSX)", 
+        "upload_help": "Columns: country, salary (monthly) and, optionally, bonus (annual), dependents, other_deductions, state, sti_area and sti_level.", 
+        "upload_start": "Process", 
+        "upload_cancel": "Cancel", 
+        "upload_queued": "Waiting for a processing slot...", 
+        "upload_progress": "{done:,} of {total} rows • {rate:,.0f} rows/s", 
+        "upload_done": "{rows:,} rows processed in {secs:.1f} s ({rate:,.0f} rows/s).", 
+        "upload_skipped": "{rows:,} rows with an empty or unsupported country have no result.", 
+        "upload_cancelled": "Processing cancelled ({rows:,} rows processed).", 
+        "upload_error": "Error processing the file: {error}", 
+        "upload_summary": "Summary by country", 
+        "upload_rows": "Rows", 
+        "upload_net_total": "Monthly net (sum)", 
+        "upload_sti_out": "Outside STI range", 
+        "upload_preview": "First rows", 
+        "upload_download": "Download results (CSV)", 
+        "comp_base": "Base Pay", 
+        "comp_other": "Other Deductions", 
+        "net": "Net Salary", 
+        "fgts_deposit": "FGTS Deposit", 
+        "tot_earnings": "Total Earnings", 
+        "tot_deductions": "Total Deductions", 
+        "valid_from": "Effective Date", 
+        "rules_emp": "Employee Contributions", 
+        "rules_er": "Employer Contributions", 
+        "rules_table_desc": "Description", 
+        "rules_table_rate": "Rate (%)", 
+        "rules_table_base": "Calculation Base", 
+        "rules_table_obs": "Notes / Cap", 
+        "official_source": "Official Source", 
+        "employer_cost_total": "Total Employer Cost", 
+        "annual_comp_title": "Total Gross Compensation", # CORREÇÃO
+        "annual_salary": "Annual Salary", 
+        "annual_bonus": "Bonus", 
+        "annual_total": "Total Compensation", 
+        "months_factor": "Months considered", "pie_title": "Annual Split: Salary vs Bonus", "pie_chart_title_dist": "Total Compensation Distribution", "reload": "Reload tables", "source_remote": "Remote tables", "source_local": "Local fallback", "choose_country": "Select a country", "menu_title": "Menu", "language_title": "🌐 Idioma / Language / Idioma", "area": "Area (STI)", "level": "Career Level (STI)", "rules_expanded": "Details of Mandatory Contributions", "sti_area_non_sales": "Non Sales", "sti_area_sales": "Sales", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Members of the GEB", "sti_level_executive_manager": "Executive Manager", "sti_level_senior_group_manager": "Senior Group Manager", "sti_level_group_manager": "Group Manager", "sti_level_lead_expert_program_manager": "Lead Expert / Program Manager", "sti_level_senior_manager": "Senior Manager", "sti_level_senior_expert_senior_project_manager": "Senior Expert / Senior Project Manager", "sti_level_manager_selected_expert_project_manager": "Manager / Selected Expert / Project Manager", "sti_level_others": "Others", "sti_level_executive_manager_senior_group_manager": "Executive Manager / Senior Group Manager", "sti_level_group_manager_lead_sales_manager": "Group Manager / Lead Sales Manager", "sti_level_senior_manager_senior_sales_manager": "Senior Manager / Senior Sales Manager", "sti_level_manager_selected_sales_manager": "Manager / Selected Sales Manager", "sti_in_range": "Within range", "sti_out_range": "Outside range", "cost_header_charge": "Charge", "cost_header_percent": "Percent (%)", "cost_header_base": "Base", "cost_header_obs": "Observation", "cost_header_bonus": "Applies to Bonus", "cost_header_vacation": "Applies to Vacation", "cost_header_13th": "Applies to 13th", "sti_table_header_level": "Career Level", "sti_table_header_pct": "STI %" 
+    }, 
+    "Español": { 
+        "sidebar_title": "Simulador de Remuneración<br><span style='font-size: 14px; font-weight: 400;'>Región Américas</span>", 
+        "other_deductions": "Otras Deducciones Mensuales", 
+        "salary_tooltip": "Su salario mensual antes de impuestos y deducciones.", 
+        "dependents_tooltip": "Número de dependientes para deducción en el Impuesto de Renta (solo aplicable en Brasil).", 
+        "bonus_tooltip": "Monto total del bono esperado en el año (pago único o en cuotas).", 
+        "other_deductions_tooltip": "Suma de otras deducciones mensuales recurrentes (ej: plan de salud, ticket de comida, cuota sindical).", 
+        "sti_area_tooltip": "Seleccione su área (Ventas o No Ventas) para verificar el rango del bono (STI).", 
+        "sti_level_tooltip": "Seleccione su nivel de carrera para verificar el rango del bono (STI). 'Otros' incluye niveles no listados.", 
+        "app_title": "Simulador de Salario Neto y Costo del Empleador", 
+        "menu_calc": "Simulador de Remuneração", 
+        "menu_rules": "Regras de Contribuições", 
+        "menu_rules_sti": "Regras de Cálculo del STI", 
+        "menu_cost": "Costo del Empleador", 
+        "title_calc": "Simulador de Remuneração", 
+        "title_rules": "Regras de Contribuições", 
+        "title_rules_sti": "Reglas de Cálculo del STI", 
+        "title_cost": "Costo del Empleador", 
+        "menu_hiring": "Presupuesto de Contratación", 
+        "title_hiring": "Presupuesto de Contratación", 
+        "menu_upload": "Procesar Planilla", 
+        "title_upload": "Procesamiento de Planilla de Empleados", 
+        "country": "País", 
+        "salary": "Salario Bruto", 
+        "state": "Estado (EE. UU.)",
+        "province": "Provincia (Canadá)", 
+        "state_rate": "Impuesto Estatal (%)", 
+        "dependents": "Dependientes (Impuesto)", 
+        "bonus": "Bono", # CORREÇÃO
+        "earnings": "Ingresos", 
+        "deductions": "Descuentos", 
+        "scenarios_title": "💾 Escenarios guardados", 
+        "scenario_name": "Nombre del escenario", 
+        "scenario_save": "Guardar escenario", 
+        "scenario_saved": "Escenario guardado.", 
+        "scenario_load": "Cargar escenario", 
+        "scenario_load_btn": "Cargar", 
+        "scenario_none": "No hay escenarios guardados para este país.", 
+        "scenario_stale": "Las tablas de reglas cambiaron desde que se guardó este escenario; los valores de arriba fueron recalculados.", 
+        "hiring_budget": "Presupuesto anual", 
+        "hiring_mode": "Optimizar", 
+        "hiring_mode_salary": "Mayor salario (plantilla fija)", 
+        "hiring_mode_headcount": "Mayor plantilla (salarios fijos)", 
+        "hiring_target": "Bono objetivo (rango STI)", 
+        "hiring_target_min": "Mínimo", 
+        "hiring_target_mid": "Medio", 
+        "hiring_target_max": "Máximo", 
+        "hiring_role": "Cargo (área — nivel)", 
+        "hiring_count": "Cantidad", 
+        "hiring_weight": "Peso del salario", 
+        "hiring_share": "Proporción", 
+        "hiring_salary": "Salario mensual", 
+        "hiring_base_salary": "Salario base (peso 1)", 
+        "hiring_headcount": "Plantilla", 
+        "hiring_total_cost": "Costo total", 
+        "hiring_slack": "Presupuesto restante", 
+        "hiring_cost_per_head": "Costo por persona", 
+        "hiring_empty": "Agregue al menos un cargo.", 
+        "hiring_infeasible": "Ningún plan cabe en el presupuesto.", 
+        "hiring_solved": "Resuelto en {ms:.1f} ms ({n} iteraciones).", 
+        "payslip_title": "Recibo de Nómina", 
+        "payslip_employee": "Empleado", 
+        "payslip_period": "Período", 
+        "payslip_description": "Descripción", 
+        "upload_file": "Planilla de empleados (CSV o XLSX)", 
+        "upload_help": "Columnas: country, salary (mensual) y, opcionales, bonus (anual), dependents, other_deductions, state, sti_area y sti_level.", 
+        "upload_start": "Procesar", 
+        "upload_cancel": "Cancelar", 
+        "upload_queued": "Esperando un espacio para procesar...", 
+        "upload_progress": "{done:,} de {total} filas • {rate:,.0f} filas/s", 
+        "upload_done": "{rows:,} filas procesadas en {secs:.1f} s ({rate:,.0f} filas/s).", 
+        "upload_skipped": "{rows:,} filas con país vacío o no soportado quedaron sin resultado.", 
+        "upload_cancelled": "Procesamiento cancelado ({rows:,} filas procesadas).", 
+        "upload_error": "Error al procesar el archivo: {error}", 
+        "upload_summary": "Resumen por país", 
+        "upload_rows": "Filas", 
+        "upload_net_total": "Neto mensual (suma)", 
+        "upload_sti_out": "Fuera del rango STI", 
+        "upload_preview": "Primeras filas", 
+        "upload_download": "Descargar resultados (CSV)", 
+        "comp_base": "Salario Base", 
+        "comp_other": "Otras Deducciones", 
+        "net": "Salario Neto", 
+        "fgts_deposit": "Depósito de FGTS", 
+        "tot_earnings": "Total Ingresos", 
+        "tot_deductions": "Total Descuentos", 
+        "valid_from": "Vigencia", 
+        "rules_emp": "Contribuições del Empleado", 
+        "rules_er": "Contribuições del Empleador", 
+        "rules_table_desc": "Descripción", 
+        "rules_table_rate": "Tasa (%)", 
+        "rules_table_base": "Base de Cálculo", 
+        "rules_table_obs": "Notas / Tope", 
+        "official_source": "Fuente Oficial", 
+        "employer_cost_total": "Costo Total del Empleador", 
+        "annual_comp_title": "Composição de la Remuneração Total Bruta", # CORREÇÃO
+        "annual_salary": "Salario Anual", 
+        "annual_bonus": "Bono", 
+        "annual_total": "Remuneração Total", 
+        "months_factor": "Meses considerados", "pie_title": "Distribuição Anual: Salario vs Bono", "pie_chart_title_dist": "Distribución de la Remuneração Total", "reload": "Recarregar tablas", "source_remote": "Tablas remotas", "source_local": "Copia local", "choose_country": "Seleccione un país", "menu_title": "Menú", "language_title": "🌐 Idioma / Language / Idioma", "area": "Área (STI)", "level": "Career Level (STI)", "rules_expanded": "Detalles de las Contribuições Obligatorias", "sti_area_non_sales": "No Ventas", "sti_area_sales": "Ventas", "sti_level_ceo": "CEO", "sti_level_members_of_the_geb": "Miembros del GEB", "sti_level_executive_manager": "Gerente Ejecutivo", "sti_level_senior_group_manager": "Gerente de Grupo Sénior", "sti_level_group_manager": "Gerente de Grupo", "sti_level_lead_expert_program_manager": "Experto Líder / Gerente de Programa", "sti_level_senior_manager": "Gerente Sénior", "sti_level_senior_expert_senior_project_manager": "Experto Sénior / Gerente de Proyecto Sénior", "sti_level_manager_selected_expert_project_manager": "Gerente / Experto Seleccionado / Gerente de Proyecto", "sti_level_others": "Otros", "sti_level_executive_manager_senior_group_manager": "Gerente Ejecutivo / Gerente de Grupo Sénior", "sti_level_group_manager_lead_sales_manager": "Gerente de Grupo / Gerente de Ventas Líder", "sti_level_senior_manager_senior_sales_manager": "Gerente Sénior / Gerente de Ventas Sénior", "sti_level_manager_selected_sales_manager": "Gerente / Gerente de Ventas Seleccionado", "sti_in_range": "Dentro del rango", "sti_out_range": "Fuera del rango", "cost_header_charge": "Encargo", "cost_header_percent": "Percentual (%)", "cost_header_base": "Base", "cost_header_obs": "Observação", "cost_header_bonus": "Incide Bono", "cost_header_vacation": "Incide Vacaciones", "cost_header_13th": "Incide 13º", "sti_table_header_level": "Nivel de Carrera", "sti_table_header_pct": "STI %" 
+    } 
+}
+
+
+@lru_cache(maxsize=1)
+def _load_i18n() -> Dict[str, Dict[str, str]]:
+    return load_json(I18N_FILE, I18N_FALLBACK)
+
+def available_languages() -> List[str]:
+    """Idiomas disponíveis, na ordem do arquivo (opções do seletor de idioma)."""
+    return list(_load_i18n().keys())
+
+@lru_cache(maxsize=None)
+def get_bundle(language: str) -> Dict[str, str]:
+    """Textos de um idioma; idioma desconhecido cai no pacote padrão do fallback."""
+    return _load_i18n().get(language, I18N_FALLBACK[DEFAULT_LANGUAGE])
+
+@lru_cache(maxsize=None)
+def component_labels(language: str) -> Dict[str, str]:
+    """Rótulos das linhas do demonstrativo por código de componente (chaves "comp_<código>" do idioma)."""
+    return {k[5:]: v for k, v in get_bundle(language).items() if k.startswith("comp_")}
+
+def clear_cache():
+    """Descarta os pacotes carregados (ex.: depois de editar i18n.json)."""
+    _load_i18n.cache_clear(); get_bundle.cache_clear(); component_labels.cache_clear()
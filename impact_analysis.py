@@ -0,0 +1,373 @@
+# -------------------------------------------------------------
+# 📊 Análise de Impacto de Mudança de Regras (INSS, IRRF, encargos)
+# Compara as tabelas de regras antigas com as novas, descobre as faixas de
+# salário em que o líquido ou o custo do empregador muda e recalcula só os
+# empregados dentro delas. As faixas do líquido saem das tabelas lineares por
+# partes (piecewise.py) das duas versões: entre dois pontos de quebra a
+# diferença é linear, então basta conferir as pontas de cada trecho. As do
+# custo vêm da comparação item a item de EMPLOYER_COST (alíquota -> país
+# inteiro; só o teto -> salários acima do menor dos dois tetos). Os
+# empregados de cada faixa vêm de um índice de salários ordenados por país
+# (busca binária), sem varrer a população.
+#
+# Uso:
+#   python impact_analysis.py run --scenario 3 --new ./regras_2026        (população salva em scenario_store)
+#   python impact_analysis.py run --population entrada.parquet --new ./regras_2026 --out impacto.csv
+#   python impact_analysis.py bench --rows 500000
+#
+# --old/--new são pastas com br_inss.json, br_irrf.json e/ou country_tables.json;
+# arquivos ausentes (ou --old omitido) usam as tabelas carregadas pelo motor.
+# -------------------------------------------------------------
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from payroll_engine import (COUNTRY_CALCULATORS, COUNTRY_TABLES_DICT, BASE_12_MONTHS_COUNTRIES, US_STATE_RATES, TABLES_DEFAULT,
+                            load_json, load_tables_data, get_calculator_registry, resolve_tables)
+from piecewise import UPPER_DEFAULT, PiecewiseLinear, compile_net_many
+from batch_io import compute_batch, read_batches, synthetic_table, BatchWriter
+
+INPUT_COLUMNS = ("country", "state", "salary", "bonus", "dependents", "other_deductions")
+TOL = 1e-6 # Diferença (na moeda) a partir da qual o resultado é considerado alterado
+_EDGE = 1e-7 # Fração do trecho usada para conferir a diferença logo depois do início e antes do fim
+Range = Tuple[float, float] # [de, até) em salário mensal
+
+
+class RuleSet:
+    """Uma versão das regras: tabelas por país (TABLES/EMPLOYER_COST/REMUN_MONTHS) e tabelas do INSS/IRRF.
+
+    As tabelas não devem ser alteradas depois de criada: as tabelas do líquido compiladas ficam em cache no objeto.
+    """
+    __slots__ = ("name", "tables_ext", "br_inss", "br_irrf", "_nets")
+
+    def __init__(self, name: str, tables_ext: Dict[str, Any], br_inss: Dict[str, Any], br_irrf: Dict[str, Any]):
+        self.name = name; self.tables_ext = tables_ext; self.br_inss = br_inss; self.br_irrf = br_irrf
+        self._nets: Dict[Tuple[Any, ...], PiecewiseLinear] = {}
+
+    def compiled_nets(self, country: str, inputs: Sequence[Tuple[int, Optional[str], Optional[float]]], upper: float) -> List[PiecewiseLinear]:
+        """Tabelas do líquido de cada (dependentes, estado, alíquota) do país; só as que faltam no cache são compiladas, juntas."""
+        keys = [(country, upper, dependentes, state_code) for dependentes, state_code, _ in inputs]
+        missing = [i for i, key in enumerate(keys) if key not in self._nets]
+        if missing:
+            tables = compile_net_many(country, [inputs[i] for i in missing], 0.0, self.tables_ext, self.br_inss, self.br_irrf, upper)
+            self._nets.update(zip((keys[i] for i in missing), tables))
+        return [self._nets[key] for key in keys]
+
+    def net_inputs(self, country: str) -> Tuple[Any, ...]:
+        """Tudo o que a calculadora do país lê destas regras (alíquotas da tabela e tabelas nomeadas dos componentes)."""
+        spec = COUNTRY_CALCULATORS.get(country) or COUNTRY_CALCULATORS.get("default", {})
+        rates = self.tables_ext.get("TABLES", {}).get(country, {}).get("rates", {}) or TABLES_DEFAULT.get(country, {}).get("rates", {})
+        named = {"br_inss": self.br_inss, "br_irrf": self.br_irrf}
+        return rates, [named.get(c.get("table")) for c in spec.get("components", []) if c.get("table")]
+
+
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    """Regras de uma pasta (arquivos ausentes herdam as carregadas pelo motor); sem pasta, as do motor."""
+    _, tables_ext, br_inss, br_irrf = load_tables_data()
+    if path is None: return RuleSet("atual", tables_ext, br_inss, br_irrf)
+    if not os.path.isdir(path): raise ValueError(f"Pasta de regras não encontrada: '{path}'")
+    data = load_json(os.path.join(path, "country_tables.json"), {})
+    tables = {key: data.get(key, value) for key, value in COUNTRY_TABLES_DICT.items()}
+    return RuleSet(os.path.basename(os.path.normpath(path)), tables, load_json(os.path.join(path, "br_inss.json"), br_inss),
+                   load_json(os.path.join(path, "br_irrf.json"), br_irrf))
+
+
+class SalaryIndex:
+    """Salários da população ordenados por país: cada consulta por faixa é uma busca binária que devolve as linhas."""
+    __slots__ = ("countries", "salary", "_sorted")
+
+    def __init__(self, countries: pa.ChunkedArray, salary: np.ndarray):
+        encoded = pc.dictionary_encode(countries).combine_chunks()
+        codes = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False)
+        self.countries = encoded.dictionary.to_pylist(); self.salary = salary
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for code, country in enumerate(self.countries):
+            rows = np.flatnonzero(codes == code)
+            order = rows[np.argsort(salary[rows])] # Empates em qualquer ordem: as consultas são por faixa de salário
+            self._sorted[country] = (salary[order], order)
+
+    def rows(self, country: str, lo: float, hi: float = np.inf) -> np.ndarray:
+        """Linhas do país com `lo <= salário < hi`, em ordem de salário."""
+        entry = self._sorted.get(country)
+        if entry is None: return np.empty(0, dtype=np.int64)
+        values, order = entry
+        return order[np.searchsorted(values, lo, side="left"):np.searchsorted(values, hi, side="left")]
+
+    def size(self, country: str) -> int:
+        entry = self._sorted.get(country)
+        return 0 if entry is None else entry[1].size
+
+
+def _merge(ranges: Sequence[Range]) -> List[Range]:
+    out: List[List[float]] = []
+    for lo, hi in sorted(ranges):
+        if out and lo <= out[-1][1]: out[-1][1] = max(out[-1][1], hi)
+        else: out.append([lo, hi])
+    return [(lo, hi) for lo, hi in out]
+
+
+def net_ranges(country: str, old: RuleSet, new: RuleSet, dependentes: int = 0, state_code=None, upper: float = UPPER_DEFAULT) -> Tuple[List[Range], np.ndarray]:
+    """Faixas de salário em que o líquido muda (para um nº de dependentes e estado) e os pontos de quebra das duas versões.
+
+    `upper` limita a compilação ao maior salário que interessa (o último trecho segue além dele).
+    """
+    return net_ranges_many(country, old, new, [(dependentes, state_code)], upper)[0]
+
+def net_ranges_many(country: str, old: RuleSet, new: RuleSet, groups: Sequence[Tuple[int, Optional[str]]],
+                    upper: float = UPPER_DEFAULT) -> List[Tuple[List[Range], np.ndarray]]:
+    """`net_ranges` de vários (dependentes, estado) do país: as tabelas de cada versão são compiladas juntas (ou vêm do cache)."""
+    inputs = [(d, code, float(US_STATE_RATES.get(code, 0.0)) if code else None) for d, code in groups]
+    tables = [r.compiled_nets(country, inputs, upper) for r in (old, new)]
+    calculators = [get_calculator_registry(r.tables_ext, r.br_inss, r.br_irrf).get(country) for r in (old, new)]
+    out = []
+    for i, (dependentes, state_code, state_rate) in enumerate(inputs):
+        knots = np.union1d(np.union1d(tables[0][i].xs, tables[1][i].xs), [0.0])
+        ends = np.append(knots[1:], 2.0 * knots[-1] + 1.0) # O último trecho é linear além do último ponto de quebra
+        width = ends - knots
+        points = np.concatenate([knots, knots + width * _EDGE, ends - width * _EDGE])
+        # As outras deduções só somam no fim, então não mudam as faixas afetadas
+        values = [c.evaluate_vec(points, 0.0, state_rate, dependentes, state_code)["net"] for c in calculators]
+        changed = (np.abs(values[1] - values[0]) > TOL).reshape(3, knots.size).any(axis=0)
+        ranges = [(float(a), float(b) if i < knots.size - 1 else np.inf) for i, (a, b) in enumerate(zip(knots, ends)) if changed[i]]
+        out.append((_merge(ranges), knots[1:]))
+    return out
+
+
+def cost_changes(country: str, old: RuleSet, new: RuleSet) -> Tuple[float, Optional[List[Tuple[float, bool]]]]:
+    """Multiplicador da base anual e, para cada encargo cujo só o teto mudou, (menor dos dois tetos, incide sobre bônus).
+
+    `None` na lista quando o custo do país inteiro muda (alíquota, incidência, itens ou meses diferentes).
+    Abaixo do menor teto a base limitada é a mesma nas duas versões, então só quem passa dele pode mudar.
+    """
+    t_old = resolve_tables(old.tables_ext); t_new = resolve_tables(new.tables_ext)
+    months = [t.get("REMUN_MONTHS", {}).get(country, 12.0) for t in (t_old, t_new)]
+    items = [t.get("EMPLOYER_COST", {}).get(country, []) for t in (t_old, t_new)]
+    mult = 12.0 if country in BASE_12_MONTHS_COUNTRIES else months[1]
+    if months[0] != months[1] or [i.get("nome") for i in items[0]] != [i.get("nome") for i in items[1]]: return mult, None
+    changes = []
+    for a, b in zip(*items):
+        if a == b: continue
+        if {k: v for k, v in a.items() if k not in ("teto", "obs")} != {k: v for k, v in b.items() if k not in ("teto", "obs")}: return mult, None
+        caps = [t for t in (a.get("teto"), b.get("teto")) if isinstance(t, (int, float))]
+        if caps: changes.append((float(min(caps)), bool(b.get("bonus", False))))
+    return mult, changes
+
+
+def _group_codes(population: pa.Table) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Código do grupo (dependentes, estado) de cada linha: `dependentes * (nº de estados + 1) + índice do estado + 1`."""
+    n = population.num_rows
+    deps = pc.fill_null(population["dependents"], 0).to_numpy(zero_copy_only=False).astype(np.int64) if "dependents" in population.column_names else np.zeros(n, dtype=np.int64)
+    if "state" not in population.column_names: return deps, [None]
+    states = pc.dictionary_encode(population["state"]).combine_chunks()
+    codes = [None] + states.dictionary.to_pylist()
+    return deps * len(codes) + pc.fill_null(states.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64) + 1, codes
+
+
+def affected_rows(population: pa.Table, index: SalaryIndex, old: RuleSet, new: RuleSet) -> Tuple[np.ndarray, Dict[str, Dict[str, Any]]]:
+    """Linhas a recalcular e, por país, as faixas alteradas e os limites de faixa usados no relatório."""
+    group, state_codes = _group_codes(population)
+    salary = index.salary
+    bonus = pc.fill_null(population["bonus"], 0.0).to_numpy(zero_copy_only=False) if "bonus" in population.column_names else np.zeros(population.num_rows)
+    picked: List[np.ndarray] = []; info: Dict[str, Dict[str, Any]] = {}
+    for country in index.countries:
+        if country is None: continue
+        country_rows = index.rows(country, -np.inf); edges = set(); ranges_net: List[Range] = []; ranges_cost: List[Range] = []
+        # Líquido: só se o que a calculadora do país lê mudou; uma comparação por (dependentes, estado) presente no país,
+        # ignorando o que a calculadora não lê (ex.: estado fora de EUA/Canadá), todas compiladas de uma vez
+        if old.net_inputs(country) != new.net_inputs(country):
+            upper = float(salary[country_rows].max()) * 2.0 + 1.0 if country_rows.size else UPPER_DEFAULT
+            calculator = get_calculator_registry(new.tables_ext, new.br_inss, new.br_irrf).get(country)
+            n_codes = len(state_codes)
+            deps = group // n_codes if calculator.reads_dependents else np.zeros_like(group)
+            country_group = deps * n_codes + (group % n_codes if calculator.reads_state else 0)
+            present = np.unique(country_group[country_rows]).tolist()
+            # Grupo 0 = sem dependentes e sem estado: dá os limites de faixa do relatório, mesmo que não exista no país
+            groups = present if present and present[0] == 0 else [0] + present
+            results = net_ranges_many(country, old, new, [(g // n_codes, state_codes[g % n_codes]) for g in groups], upper)
+            for g, (ranges, _) in zip(groups, results):
+                if g not in present: continue
+                for lo, hi in ranges:
+                    rows = index.rows(country, lo, hi)
+                    picked.append(rows[country_group[rows] == g])
+                ranges_net += ranges
+            edges.update(results[0][1].tolist())
+        mult, changes = cost_changes(country, old, new)
+        if changes is None:
+            picked.append(country_rows); ranges_cost.append((0.0, np.inf))
+        for cap, with_bonus in changes or []:
+            # Busca pelo índice com o maior bônus do país e confirma a base anual exata só nessas linhas
+            lo = max((cap - (float(bonus[country_rows].max()) if with_bonus and country_rows.size else 0.0)) / mult, 0.0)
+            rows = index.rows(country, lo)
+            if with_bonus: rows = rows[salary[rows] * mult + bonus[rows] >= cap]
+            picked.append(rows); ranges_cost.append((cap / mult, np.inf)); edges.add(cap / mult)
+        info[country] = {"net_ranges": _merge(ranges_net), "cost_ranges": _merge(ranges_cost),
+                         "edges": np.array(sorted(e for e in edges if np.isfinite(e) and e > 0), dtype=np.float64)}
+    rows = np.unique(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+    return rows, info
+
+
+def _delta(before: pa.RecordBatch, after: pa.RecordBatch, name: str) -> np.ndarray:
+    """Diferença nova - antiga de uma coluna de `compute_batch`; sem resultado nas duas (país não suportado) conta como zero."""
+    return pc.fill_null(pc.subtract(after[name], before[name]), 0.0).to_numpy(zero_copy_only=False)
+
+def _bracket_label(edges: np.ndarray, i: int) -> str:
+    lo = edges[i - 1] if i > 0 else 0.0
+    return f"{lo:,.2f} +" if i >= edges.size else f"{lo:,.2f} – {edges[i]:,.2f}"
+
+def analyze(population: pa.Table, old: RuleSet, new: RuleSet, index: SalaryIndex = None) -> Dict[str, Any]:
+    """Impacto de trocar `old` por `new` na população: deltas por empregado afetado, por país e por faixa de salário.
+
+    As faixas do relatório vão de um ponto de quebra ao seguinte (limites do líquido sem dependentes nas duas versões
+    e início das faixas de custo alteradas). Só os empregados nas faixas alteradas são recalculados.
+    """
+    t0 = time.perf_counter()
+    salary = pc.fill_null(population["salary"], 0.0).to_numpy(zero_copy_only=False).astype(np.float64)
+    index = index or SalaryIndex(population["country"], salary)
+    t1 = time.perf_counter()
+    rows, info = affected_rows(population, index, old, new)
+    t2 = time.perf_counter()
+    inputs = population.select([c for c in INPUT_COLUMNS if c in population.column_names]).take(pa.array(rows)).combine_chunks()
+    key = population["employee_key" if "employee_key" in population.column_names else "employee_id"].take(pa.array(rows)) \
+        if {"employee_key", "employee_id"} & set(population.column_names) else pa.array(rows.astype(str))
+    n = rows.size; net_delta = np.zeros(n); cost_delta = np.zeros(n); before = after = None
+    if n:
+        batch = inputs.to_batches()[0]
+        before = compute_batch(batch, old.tables_ext, old.br_inss, old.br_irrf); after = compute_batch(batch, new.tables_ext, new.br_inss, new.br_irrf)
+        net_delta = _delta(before, after, "net"); cost_delta = _delta(before, after, "employer_cost")
+    t3 = time.perf_counter()
+    changed = (np.abs(net_delta) > TOL) | (np.abs(cost_delta) > TOL)
+    sal = salary[rows]
+
+    by_country, by_bracket = [], []
+    for country, meta in info.items():
+        sel = pc.fill_null(pc.equal(inputs["country"], country), False).to_numpy(zero_copy_only=False)
+        by_country.append({"country": country, "employees": index.size(country), "recomputed": int(sel.sum()), "changed": int((sel & changed).sum()),
+                           "net_delta": float(net_delta[sel].sum()), "employer_cost_delta": float(cost_delta[sel].sum()),
+                           "net_ranges": meta["net_ranges"], "cost_ranges": meta["cost_ranges"]})
+        edges = meta["edges"]; bracket = np.searchsorted(edges, sal[sel], side="right")
+        for b in np.unique(bracket[changed[sel]]).tolist():
+            m = (bracket == b) & changed[sel]
+            by_bracket.append({"country": country, "bracket": _bracket_label(edges, b), "from": float(edges[b - 1]) if b > 0 else 0.0, "changed": int(m.sum()),
+                               "net_delta": float(net_delta[sel][m].sum()), "employer_cost_delta": float(cost_delta[sel][m].sum()),
+                               "net_delta_mean": float(net_delta[sel][m].mean()), "employer_cost_delta_mean": float(cost_delta[sel][m].mean())})
+    table = pa.table({"employee_key": pc.cast(key, pa.string()), **{c: inputs[c] for c in inputs.column_names},
+                      "net_old": before["net"] if n else pa.array([], pa.float64()), "net_new": after["net"] if n else pa.array([], pa.float64()), "net_delta": net_delta,
+                      "employer_cost_old": before["employer_cost"] if n else pa.array([], pa.float64()),
+                      "employer_cost_new": after["employer_cost"] if n else pa.array([], pa.float64()), "employer_cost_delta": cost_delta})
+    return {"rows": population.num_rows, "recomputed": n, "changed": int(changed.sum()), "employees": table.filter(pa.array(changed)),
+            "countries": by_country, "brackets": by_bracket,
+            "index_s": t1 - t0, "ranges_s": t2 - t1, "compute_s": t3 - t2, "total_s": time.perf_counter() - t0}
+
+
+def load_population(scenario: Optional[int] = None, path: Optional[str] = None, db: Optional[str] = None) -> pa.Table:
+    """População de um cenário salvo (scenario_store) ou de um arquivo de entrada do batch_io."""
+    if scenario is not None:
+        from scenario_store import ScenarioStore, SCENARIO_DB
+        store = ScenarioStore(db or SCENARIO_DB)
+        try: table = store.load_rows(scenario)
+        finally: store.close()
+        if table.num_rows == 0: raise ValueError(f"Cenário {scenario} sem linhas de empregados")
+    elif path is not None: table = pa.Table.from_batches(list(read_batches(path)))
+    else: raise ValueError("Informe --scenario ou --population")
+    keep = [c for c in ("employee_key", "employee_id", *INPUT_COLUMNS) if c in table.column_names]
+    return table.select(keep)
+
+
+# ======================== BENCHMARK E CLI =========================
+
+def _bench_rules(inss_cap: float = 1.05, ss_cap: float = 1.03) -> RuleSet:
+    """Regras atuais com só o topo mudando: teto do INSS e teto do Social Security (EUA) multiplicados pelos fatores."""
+    current = load_rules()
+    inss = copy.deepcopy(current.br_inss)
+    inss["faixas"][-1]["ate"] = round(inss["faixas"][-1]["ate"] * inss_cap, 2); inss["teto_base"] = inss["faixas"][-1]["ate"]
+    tables = {**current.tables_ext, "EMPLOYER_COST": copy.deepcopy(current.tables_ext["EMPLOYER_COST"])}
+    for item in tables["EMPLOYER_COST"].get("Estados Unidos", []):
+        if isinstance(item.get("teto"), (int, float)) and item.get("nome", "").startswith("Social Security"): item["teto"] = round(item["teto"] * ss_cap, 2)
+    return RuleSet("bench", tables, inss, current.br_irrf)
+
+def benchmark(n_rows: int = 500_000) -> Dict[str, Any]:
+    """Impacto incremental vs recálculo completo; confere que os deltas coincidem.
+
+    Duas propostas contra as mesmas regras atuais: a primeira paga o índice e a compilação das duas versões; a segunda
+    reaproveita o índice e as tabelas já compiladas das regras atuais, e o recálculo completo reaproveita o resultado antigo.
+    """
+    population = synthetic_table(n_rows); old = load_rules(); proposals = [_bench_rules(), _bench_rules(1.10, 1.06)]
+    # Folha com cauda longa (mediana ~4.500) em vez da uniforme do batch_io: o topo das faixas é uma minoria, como numa folha real
+    salary = np.random.default_rng(7).lognormal(np.log(4500.0), 0.7, n_rows).round(2)
+    population = population.set_column(population.schema.get_field_index("salary"), "salary", pa.array(salary))
+    result = analyze(population, old, proposals[0])
+    t0 = time.perf_counter()
+    full_old = [compute_batch(b, old.tables_ext, old.br_inss, old.br_irrf) for b in population.to_batches()]
+    full_new = [compute_batch(b, proposals[0].tables_ext, proposals[0].br_inss, proposals[0].br_irrf) for b in population.to_batches()]
+    full_s = time.perf_counter() - t0
+    index = SalaryIndex(population["country"], salary)
+    repeat = analyze(population, old, proposals[1], index)
+    t2 = time.perf_counter()
+    full_repeat = [compute_batch(b, proposals[1].tables_ext, proposals[1].br_inss, proposals[1].br_irrf) for b in population.to_batches()]
+    repeat_full_s = time.perf_counter() - t2
+    delta = lambda new, f: np.concatenate([_delta(o, n, f) for o, n in zip(full_old, new)])
+    checks = []
+    for r, new in ((result, full_new), (repeat, full_repeat)):
+        net_full, cost_full = delta(new, "net"), delta(new, "employer_cost")
+        checks.append((int(((np.abs(net_full) > TOL) | (np.abs(cost_full) > TOL)).sum()),
+                       max(abs(float(net_full.sum()) - sum(c["net_delta"] for c in r["countries"])),
+                           abs(float(cost_full.sum()) - sum(c["employer_cost_delta"] for c in r["countries"])))))
+    return {**result, "full_s": full_s, "full_changed": checks[0][0], "mismatch": max(checks[0][1], checks[1][1]),
+            "repeat_s": repeat["total_s"], "repeat_full_s": repeat_full_s, "repeat_changed": repeat["changed"], "repeat_full_changed": checks[1][0]}
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"{result['rows']:,} empregados | {result['recomputed']:,} recalculados | {result['changed']:,} com mudança | "
+          f"{result['total_s'] * 1000:.0f} ms (índice {result['index_s'] * 1000:.0f}, faixas {result['ranges_s'] * 1000:.0f}, recálculo {result['compute_s'] * 1000:.0f})")
+    fmt_ranges = lambda rs: ", ".join(f"{lo:,.2f}–{hi:,.2f}" if np.isfinite(hi) else f"≥ {lo:,.2f}" for lo, hi in rs) or "—"
+    for c in result["countries"]:
+        if not (c["net_ranges"] or c["cost_ranges"]): continue
+        print(f"\n{c['country']}: {c['changed']:,} de {c['employees']:,} empregados | líquido {c['net_delta']:+,.2f}/mês | custo {c['employer_cost_delta']:+,.2f}/ano")
+        print(f"  faixas do líquido: {fmt_ranges(c['net_ranges'])}")
+        print(f"  faixas do custo:   {fmt_ranges(c['cost_ranges'])}")
+        for b in (b for b in result["brackets"] if b["country"] == c["country"]):
+            print(f"  {b['bracket']:>28}  {b['changed']:>8,}  líquido {b['net_delta']:+16,.2f} (média {b['net_delta_mean']:+,.2f})  "
+                  f"custo {b['employer_cost_delta']:+18,.2f} (média {b['employer_cost_delta_mean']:+,.2f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Impacto de novas tabelas de regras (INSS/IRRF/encargos) na população.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="Compara as regras atuais (ou --old) com --new")
+    src = run.add_mutually_exclusive_group(required=True)
+    src.add_argument("--scenario", type=int, help="Id de um lote salvo em scenario_store"); src.add_argument("--population", help="Arquivo .parquet/.arrow/.csv")
+    run.add_argument("--db", default=None); run.add_argument("--old", default=None); run.add_argument("--new", required=True)
+    run.add_argument("--out", default=None, help="Grava os empregados com mudança (.parquet, .arrow ou .csv)")
+    bench = sub.add_parser("bench", help="Incremental vs recálculo completo numa população sintética")
+    bench.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench":
+        r = benchmark(args.rows)
+        print_report(r)
+        print(f"\nPrimeira proposta: recálculo completo (duas versões) {r['full_s'] * 1000:.0f} ms | incremental (com índice e compilação) "
+              f"{r['total_s'] * 1000:.0f} ms ({r['full_s'] / r['total_s']:.1f}x) | com mudança: {r['full_changed']:,} (completo) vs {r['changed']:,}")
+        print(f"Segunda proposta: recálculo completo (só a nova versão) {r['repeat_full_s'] * 1000:.0f} ms | incremental (índice e regras atuais "
+              f"reaproveitados) {r['repeat_s'] * 1000:.0f} ms ({r['repeat_full_s'] / r['repeat_s']:.1f}x) | com mudança: "
+              f"{r['repeat_full_changed']:,} (completo) vs {r['repeat_changed']:,}")
+        print(f"Diferença dos totais: {r['mismatch']:.2e}")
+        return
+    result = analyze(load_population(args.scenario, args.population, args.db), load_rules(args.old), load_rules(args.new))
+    print_report(result)
+    if args.out:
+        writer = BatchWriter(args.out, result["employees"].schema)
+        try:
+            for batch in result["employees"].to_batches(): writer.write(batch)
+        finally: writer.close()
+        print(f"\n{result['employees'].num_rows:,} empregados -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -------------------------------------------------------------
+# 📏 Valores em Unidades Indexadas (UF no Chile, UMA no México, ...)
+# Tetos legais definidos em unidades indexadas são declarados como
+# {"amount": 84.3, "unit": "UF", "per": "month"} e convertidos para a moeda
+# local pela série datada de index_series.json. A conversão é feita uma vez
+# por período de pagamento ("AAAA-MM"): as calculadoras e as tabelas de
+# encargos recebem o teto já em moeda e o cálculo por linha não muda.
+# Cada série é um índice de intervalos: o valor de uma data vale até a
+# data seguinte (busca binária nos inícios, com cache por período).
+# -------------------------------------------------------------
+
+from datetime import date
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+DAYS_PER_MONTH = 30.4 # Convenção do IMSS para tetos diários (UMA) em base mensal
+PER_MONTHS = {"day": 1.0 / DAYS_PER_MONTH, "month": 1.0, "year": 12.0} # Duração de cada periodicidade em meses
+
+
+def current_period(today: Optional[date] = None) -> str:
+    """Período de pagamento corrente ("AAAA-MM")."""
+    return (today or date.today()).strftime("%Y-%m")
+
+def is_indexed(value: Any) -> bool:
+    return isinstance(value, dict) and "amount" in value
+
+
+class IndexSeries:
+    """Série datada de um índice: `starts[i]` inicia o intervalo em que vale `values[i]`."""
+    __slots__ = ("name", "currency", "starts", "values", "_cache")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        rows = sorted((np.datetime64(d, "D"), float(v)) for d, v in spec.get("values", []))
+        if not rows: raise ValueError(f"Série '{name}' sem valores")
+        self.name = name; self.currency = spec.get("currency", "")
+        self.starts = np.array([r[0] for r in rows], dtype="datetime64[D]"); self.values = np.array([r[1] for r in rows])
+        self._cache: Dict[str, float] = {}
+
+    def value(self, period: str) -> float:
+        """Valor vigente no primeiro dia do período (antes do primeiro registro, vale o primeiro)."""
+        v = self._cache.get(period)
+        if v is None:
+            i = int(np.searchsorted(self.starts, np.datetime64(f"{period}-01", "D"), side="right")) - 1
+            v = self._cache[period] = float(self.values[max(i, 0)])
+        return v
+
+
+class IndexSeriesSet:
+    """Séries por nome de unidade ("UF", "UMA"); converte valores indexados para moeda num período."""
+
+    def __init__(self, data: Dict[str, Dict[str, Any]]):
+        self.data = data
+        self.series = {name: IndexSeries(name, spec) for name, spec in data.items()}
+
+    def value(self, unit: str, period: str) -> float:
+        series = self.series.get(unit)
+        if series is None: raise KeyError(f"Unidade indexada sem série: '{unit}'")
+        return series.value(period)
+
+    def resolve(self, value: Any, period: str, per: str = "month") -> Any:
+        """Valor em moeda na periodicidade `per`; números e valores sem unidade passam como estão.
+
+        Ex.: {"amount": 25, "unit": "UMA", "per": "day"} com per="month" -> 25 x UMA x 30,4.
+        """
+        if not is_indexed(value): return value
+        amount = float(value["amount"])
+        unit = value.get("unit")
+        if unit: amount *= self.value(unit, period)
+        return amount * PER_MONTHS[per] / PER_MONTHS[value.get("per", per)]
+
+
+def format_indexed(value: Dict[str, Any]) -> str:
+    """Texto de exibição de um valor indexado (ex.: "84.3 UF")."""
+    return f"{float(value['amount']):.1f} {value.get('unit', '')}".strip()
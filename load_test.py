@@ -0,0 +1,189 @@
+# -------------------------------------------------------------
+# 📈 Teste de Carga do App (sessões simultâneas via streamlit.testing)
+# Simula N sessões executando roteiros de uso reais (troca de idioma/país,
+# edição de salário, bônus e dependentes, abertura do "Custo do Empregador")
+# e mede a latência de cada rerun (p50/p95/p99), a vazão e a memória por sessão.
+#
+# Cada processo de trabalho representa um servidor Streamlit: as sessões dele
+# disputam um único executor (como os reruns disputam o GIL no servidor real),
+# então a latência inclui a espera na fila atrás dos reruns de outros usuários.
+# O AppTest não é seguro para threads, por isso as sessões são intercaladas
+# no mesmo processo em vez de rodar em threads.
+#
+# Uso:
+#   python load_test.py --sessions 20 --think 1.0
+#   python load_test.py --sessions 40 --workers 2 --json depois.json --compare antes.json
+# -------------------------------------------------------------
+
+from typing import Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_salario_liquido.py")
+# O app importa os módulos do motor a partir da própria pasta
+if os.path.dirname(APP_FILE) not in sys.path: sys.path.insert(0, os.path.dirname(APP_FILE))
+PERCENTILES = (50, 95, 99)
+RUN_TIMEOUT = 60.0
+
+# Passos: ("select", chave, opção) | ("number", chave, valor) | ("menu", índice da opção do menu lateral)
+# Os índices do menu seguem a ordem do app: 0 Simulador, 1 Regras, 2 Regras STI, 3 Custo do Empregador
+SCRIPTS: Dict[str, List[Tuple]] = {
+    "simulador_br": [("number", "salary_input", 12000.0), ("number", "bonus_input", 30000.0), ("number", "dep_input", 2), ("number", "other_ded_input", 150.0)],
+    "troca_pais": [("select", "country_select", "Estados Unidos"), ("number", "salary_input", 9000.0), ("select", "state_select_main", "NY"),
+                   ("select", "country_select", "Canadá"), ("number", "bonus_input", 20000.0), ("select", "country_select", "México")],
+    "idioma_custo": [("select", "lang_select", "English"), ("menu", 3), ("number", "salary_cost", 15000.0), ("number", "bonus_cost_input", 40000.0),
+                     ("select", "country_select", "Chile"), ("menu", 0)],
+}
+
+
+class Session:
+    """Uma sessão de usuário: um AppTest próprio percorrendo um roteiro, passo a passo."""
+
+    def __init__(self, script: str, rng: random.Random):
+        from streamlit.testing.v1 import AppTest
+        self.script = script; self.steps = list(SCRIPTS[script]); self.rng = rng
+        self.at = AppTest.from_file(APP_FILE, default_timeout=RUN_TIMEOUT)
+        self.pos = -1 # -1 = primeira carga da página
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self.steps)
+
+    def step(self) -> str:
+        """Executa o próximo passo (um rerun) e devolve o nome da ação."""
+        at = self.at
+        if self.pos < 0: at.run(); action = "load"
+        else:
+            kind, *args = self.steps[self.pos]
+            if kind == "select": at.selectbox(key=args[0]).select(args[1]).run()
+            elif kind == "number":
+                # Valores variam por sessão para não repetir exatamente as mesmas entradas
+                value = args[1] if isinstance(args[1], int) else round(args[1] * self.rng.uniform(0.8, 1.2), 2)
+                at.number_input(key=args[0]).set_value(value).run()
+            elif kind == "menu":
+                radio = at.sidebar.radio[0]; radio.set_value(radio.options[args[0]]).run()
+            action = f"{kind}:{args[0]}"
+        if at.exception: raise RuntimeError(f"Exceção no app ({self.script}, passo {self.pos}): {at.exception[0].value}")
+        self.pos += 1
+        return action
+
+
+def _rss_mb() -> float:
+    """Memória residente atual do processo (Linux); cai para o pico quando /proc não existe e para NaN sem `resource` (Windows)."""
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        from batch_io import peak_rss_mb
+        peak = peak_rss_mb()
+        return float("nan") if peak is None else peak
+
+def run_server(n_sessions: int, think: float = 0.5, seed: int = 42, scripts: List[str] = None, trace_memory: bool = False) -> Dict[str, Any]:
+    """Simula `n_sessions` usuários num único servidor e devolve as amostras brutas.
+
+    Cada sessão espera `think` segundos (exponencial, média `think`) entre um passo e o próximo.
+    A latência de um rerun vai do momento em que o usuário interage até a resposta terminar.
+    """
+    rng = random.Random(seed); scripts = scripts or list(SCRIPTS)
+    Session(scripts[0], rng).step() # Aquecimento: importações e caches do primeiro rerun não entram na medição
+
+    rss0 = _rss_mb()
+    if trace_memory: tracemalloc.start()
+    sessions = [Session(scripts[i % len(scripts)], random.Random(seed + i)) for i in range(n_sessions)]
+    t0 = time.perf_counter()
+    # Chegadas escalonadas ao longo de um tempo de pensamento
+    ready = [(t0 + rng.uniform(0.0, think), i) for i in range(n_sessions)]; heapq.heapify(ready)
+    latencies, services, actions = [], [], []
+    while ready:
+        when, i = heapq.heappop(ready)
+        now = time.perf_counter()
+        if when > now: time.sleep(when - now)
+        start = time.perf_counter(); action = sessions[i].step(); end = time.perf_counter()
+        latencies.append(end - when); services.append(end - start); actions.append(action)
+        if not sessions[i].done: heapq.heappush(ready, (end + rng.expovariate(1.0 / think) if think > 0 else end, i))
+    elapsed = time.perf_counter() - t0
+
+    mem = {"rss_mb_per_session": max(_rss_mb() - rss0, 0.0) / max(n_sessions, 1)}
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory(); tracemalloc.stop()
+        mem.update({"traced_mb_per_session": current / 2**20 / max(n_sessions, 1), "traced_peak_mb": peak / 2**20})
+    return {"latency": latencies, "service": services, "actions": actions, "seconds": elapsed, "memory": mem}
+
+
+def _pcts(values: List[float]) -> Dict[str, float]:
+    if not values: return {f"p{p}": 0.0 for p in PERCENTILES}
+    arr = np.asarray(values) * 1000.0
+    return {**{f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES))}, "mean": float(arr.mean()), "max": float(arr.max())}
+
+def summarize(samples: List[Dict[str, Any]], n_sessions: int, think: float) -> Dict[str, Any]:
+    """Junta as amostras dos servidores num relatório (latências em milissegundos)."""
+    latency = [v for s in samples for v in s["latency"]]; service = [v for s in samples for v in s["service"]]
+    actions = [a for s in samples for a in s["actions"]]
+    by_action: Dict[str, List[float]] = {}
+    for a, v in zip(actions, latency): by_action.setdefault(a, []).append(v)
+    seconds = max(s["seconds"] for s in samples)
+    memory = {k: float(np.mean([s["memory"][k] for s in samples])) for k in samples[0]["memory"]}
+    return {"sessions": n_sessions, "workers": len(samples), "think_s": think, "reruns": len(latency), "seconds": seconds,
+            "reruns_per_s": len(latency) / seconds if seconds else 0.0,
+            "latency_ms": _pcts(latency), "service_ms": _pcts(service),
+            "per_action_ms": {a: _pcts(v) for a, v in sorted(by_action.items())}, "memory": memory}
+
+def run_load_test(n_sessions: int, workers: int = 1, think: float = 0.5, seed: int = 42, trace_memory: bool = False) -> Dict[str, Any]:
+    """Distribui as sessões entre `workers` servidores (processos) e resume o resultado."""
+    shares = [n_sessions // workers + (1 if w < n_sessions % workers else 0) for w in range(workers)]
+    shares = [n for n in shares if n > 0]
+    if len(shares) == 1: samples = [run_server(shares[0], think, seed, trace_memory=trace_memory)]
+    else:
+        with ProcessPoolExecutor(len(shares)) as ex:
+            samples = list(ex.map(run_server, shares, [think] * len(shares), [seed + 1000 * w for w in range(len(shares))], [None] * len(shares), [trace_memory] * len(shares)))
+    return summarize(samples, n_sessions, think)
+
+
+def print_report(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    def delta(path):
+        if baseline is None: return ""
+        old = baseline
+        for k in path: old = old.get(k, {}) if isinstance(old, dict) else {}
+        new = report
+        for k in path: new = new[k]
+        return f"  ({(new / old - 1) * 100:+.1f}%)" if isinstance(old, (int, float)) and old else ""
+    lat = report["latency_ms"]; svc = report["service_ms"]
+    print(f"{report['sessions']} sessões em {report['workers']} servidor(es), think {report['think_s']}s: {report['reruns']} reruns em {report['seconds']:.1f}s")
+    print(f"vazão     {report['reruns_per_s']:8.2f} reruns/s{delta(['reruns_per_s'])}")
+    for p in PERCENTILES: print(f"latência  p{p:<3} {lat[f'p{p}']:8.1f} ms{delta(['latency_ms', f'p{p}'])}")
+    print(f"serviço   p50  {svc['p50']:8.1f} ms   p95 {svc['p95']:8.1f} ms")
+    for k, v in report["memory"].items(): print(f"memória   {k:<24} {v:8.2f} MB{delta(['memory', k])}")
+    print("\npor ação (latência, ms):")
+    for action, p in report["per_action_ms"].items(): print(f"  {action:<28} p50 {p['p50']:8.1f}  p95 {p['p95']:8.1f}  p99 {p['p99']:8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do app Streamlit com sessões simuladas.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="Servidores (processos) entre os quais as sessões são divididas")
+    parser.add_argument("--think", type=float, default=0.5, help="Tempo médio (s) entre interações de um mesmo usuário")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trace-memory", action="store_true", help="Mede memória retida por sessão com tracemalloc (deixa os reruns mais lentos)")
+    parser.add_argument("--json", help="Grava o relatório em JSON")
+    parser.add_argument("--compare", help="Relatório JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.sessions, args.workers, args.think, args.seed, args.trace_memory)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -------------------------------------------------------------
+# 💱 Formatação de Moeda e Percentual (escalar e por coluna)
+# `fmt_money`, `money_or_blank` e `fmt_percent` são os formatadores de sempre.
+# As versões de coluna montam todos os textos de uma vez numa matriz de bytes
+# (centavos inteiros -> dígitos -> separadores) e produzem exatamente a mesma
+# saída, prontas para tabelas do app (lista de str) ou exportações (Arrow).
+# -------------------------------------------------------------
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from indexed_units import is_indexed, format_indexed
+
+# Separadores (milhar, decimal) por locale; o app usa o padrão brasileiro para todas as moedas
+LOCALES: Dict[str, Tuple[str, str]] = {"pt_BR": (".", ","), "es": (".", ","), "en_US": (",", ".")}
+DEFAULT_LOCALE = "pt_BR"
+MAX_CENTS = 10.0 ** 17 # Acima disso (ou NaN/inf) a linha é formatada pelo caminho escalar
+SMALL_COLUMN = 256 # Abaixo disso o laço escalar é mais rápido que montar a matriz
+
+
+def fmt_money(v: float, sym: str) -> str:
+    """Formata um float como moeda no padrão brasileiro (1.000,00) a partir do padrão en_US."""
+    # Formato padrão americano com separador de milhar (, ) e decimal ( . ), depois inverte para o BR/EUR
+    return f"{sym} {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def money_or_blank(v: float, sym: str) -> str:
+    """Retorna a string formatada ou vazia se o valor for zero."""
+    return "" if abs(v) < 1e-9 else fmt_money(v, sym)
+
+def fmt_percent(v: float) -> str:
+    """Formata um float como porcentagem."""
+    if v is None: return ""
+    return f"{v:.2f}%"
+
+def _fmt_money_locale(v: float, sym: str, locale: str) -> str:
+    thousands, decimal = LOCALES[locale]
+    return f"{sym} {v:,.2f}".replace(",", "\0").replace(".", decimal).replace("\0", thousands)
+
+
+# ======================== FORMATAÇÃO POR COLUNA =========================
+
+def _fixed2(x: np.ndarray, prefix: str, suffix: str, thousands: str, decimal: str, blank: np.ndarray, scalar) -> pa.StringArray:
+    """Formata `x` com 2 casas como `prefix + [-]1.234,56 + suffix` e devolve um StringArray do Arrow.
+
+    Cada linha vira uma fileira de uma matriz de bytes alinhada à direita; bytes zero são
+    descartados na compactação, então o texto final sai sem laços por célula. Valores cujo
+    arredondamento fica ambíguo em ponto flutuante (meio centavo exato), não finitos ou
+    enormes usam `scalar(v)`, a função de referência, para garantir saída idêntica.
+    """
+    n = x.size
+    neg = np.signbit(x)
+    with np.errstate(invalid="ignore", over="ignore"):
+        y = np.abs(x) * 100.0
+        # Longe de meio centavo o arredondamento de y coincide com o da formatação do Python
+        odd = ~(y < MAX_CENTS) | (np.abs(y - np.floor(y) - 0.5) <= 4 * np.spacing(y))
+    odd &= ~blank
+    cents = np.where(odd | blank, 0.0, np.rint(y)).astype(np.int64)
+    ip = cents // 100; fp = cents % 100
+
+    digits = 1; top = int(ip.max()) if n else 0
+    while top >= 10 ** digits: digits += 1
+    ndig = np.ones(n, dtype=np.int64)
+    for k in range(1, digits): ndig += ip >= 10 ** k
+
+    pre = np.frombuffer(prefix.encode("utf-8"), dtype=np.uint8); suf = np.frombuffer(suffix.encode("utf-8"), dtype=np.uint8)
+    seps = (digits - 1) // 3 if thousands else 0
+    int_w = 1 + digits + seps # sinal + dígitos + separadores de milhar
+    width = len(pre) + int_w + 1 + 2 + len(suf)
+    M = np.zeros((n, width), dtype=np.uint8)
+    M[:, :len(pre)] = pre
+    base = len(pre)
+    # Dígito k (0 = unidade) fica na coluna pos(k), da direita para a esquerda, pulando os separadores
+    pos = lambda k: base + int_w - 1 - k - (k // 3 if thousands else 0)
+    rem = ip
+    for k in range(digits):
+        present = k < ndig
+        M[:, pos(k)] = np.where(present, 48 + rem % 10, 0); rem = rem // 10
+        if thousands and k and k % 3 == 0: M[:, pos(k) + 1] = np.where(present, ord(thousands), 0)
+    rows = np.flatnonzero(neg & ~blank & ~odd)
+    if rows.size: M[rows, base + int_w - 1 - (ndig[rows] - 1) - ((ndig[rows] - 1) // 3 if thousands else 0) - 1] = ord("-")
+    M[:, base + int_w] = ord(decimal); M[:, base + int_w + 1] = 48 + fp // 10; M[:, base + int_w + 2] = 48 + fp % 10
+    M[:, base + int_w + 3:] = suf
+    M[blank] = 0
+
+    odd_rows = np.flatnonzero(odd)
+    if odd_rows.size:
+        texts = [scalar(v).encode("utf-8") for v in x[odd_rows].tolist()]
+        extra = max(len(t) for t in texts) - width
+        if extra > 0: M = np.concatenate([M, np.zeros((n, extra), dtype=np.uint8)], axis=1)
+        M[odd_rows] = 0
+        for r, t in zip(odd_rows.tolist(), texts): M[r, :len(t)] = np.frombuffer(t, dtype=np.uint8)
+
+    keep = M != 0
+    offsets = np.zeros(n + 1, dtype=np.int32); np.cumsum(keep.sum(axis=1), out=offsets[1:])
+    return pa.StringArray.from_buffers(n, pa.py_buffer(offsets), pa.py_buffer(M[keep].tobytes()))
+
+def _as_float(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Converte para float64; None (colunas object) vira NaN e é marcado na máscara devolvida."""
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        missing = np.array([v is None for v in arr.ravel().tolist()], dtype=bool)
+        arr = np.where(missing, np.nan, arr.ravel()).astype(np.float64)
+        return arr, missing
+    arr = arr.astype(np.float64, copy=False).ravel()
+    return arr, np.zeros(arr.size, dtype=bool)
+
+def format_money_arrow(values: Any, sym: str, locale: str = DEFAULT_LOCALE, blank_zero: bool = False) -> pa.StringArray:
+    """Coluna inteira formatada como `fmt_money` (ou `money_or_blank` com `blank_zero`), em Arrow, para exportações."""
+    x, _ = _as_float(values)
+    thousands, decimal = LOCALES[locale]
+    scalar = (lambda v: fmt_money(v, sym)) if locale == DEFAULT_LOCALE else (lambda v: _fmt_money_locale(v, sym, locale))
+    if x.size < SMALL_COLUMN:
+        return pa.array(["" if blank_zero and abs(v) < 1e-9 else scalar(v) for v in x.tolist()], type=pa.string())
+    blank = np.abs(x) < 1e-9 if blank_zero else np.zeros(x.size, dtype=bool)
+    return _fixed2(x, f"{sym} ", "", thousands, decimal, blank, scalar)
+
+def format_money(values: Any, sym: str, locale: str = DEFAULT_LOCALE, blank_zero: bool = False) -> List[str]:
+    """Lista de textos idêntica a `[fmt_money(v, sym) for v in values]` (ou `money_or_blank`)."""
+    x, _ = _as_float(values)
+    if x.size < SMALL_COLUMN and locale == DEFAULT_LOCALE:
+        return [money_or_blank(v, sym) for v in x.tolist()] if blank_zero else [fmt_money(v, sym) for v in x.tolist()]
+    return format_money_arrow(x, sym, locale, blank_zero).to_numpy(zero_copy_only=False).tolist()
+
+def format_percent(values: Any) -> List[str]:
+    """Lista de textos idêntica a `[fmt_percent(v) for v in values]`; valores já em pontos percentuais."""
+    x, missing = _as_float(values)
+    if x.size < SMALL_COLUMN: return ["" if m else fmt_percent(v) for v, m in zip(x.tolist(), missing.tolist())]
+    return _fixed2(x, "", "%", "", ".", missing, fmt_percent).to_numpy(zero_copy_only=False).tolist()
+
+def format_cap(values: Sequence[Any], sym: str = None, country_code: str = None) -> List[str]:
+    """Textos dos tetos do país `country_code`: "—" sem teto, tetos em UF no Chile, valores indexados e moeda."""
+    values = list(values)
+    out = [None] * len(values); numeric = []
+    for i, v in enumerate(values):
+        if v is None: out[i] = "—"
+        elif isinstance(v, str): out[i] = v
+        elif isinstance(v, (int, float)):
+            if country_code == "Chile" and v < 200: out[i] = f"~{v:.1f} UF"
+            else: numeric.append(i)
+        elif is_indexed(v): out[i] = format_indexed(v)
+        else: out[i] = str(v)
+    if numeric:
+        for i, text in zip(numeric, format_money([values[i] for i in numeric], sym if sym else "")): out[i] = text
+    return out
@@ -0,0 +1,124 @@
+# -------------------------------------------------------------
+# 🎲 Simulação Monte Carlo do Custo do Empregador (orçamento)
+# Amostra câmbio, % de bônus dentro da faixa STI e variações de alíquotas
+# (ex.: RAT/FAP de 1% a 3%) e devolve P5/P50/P95 do custo anual por país.
+#
+# Uso: python monte_carlo.py workforce.csv --scenarios 10000 --seed 42 [--fx fx.json]
+# O CSV precisa das colunas: country, salary (mensal, moeda local), area, level.
+# -------------------------------------------------------------
+
+from typing import Dict, Any, Tuple
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from payroll_engine import load_tables_data, get_sti_range, employer_cost_vec
+
+# Faixas (em %) amostradas uniformemente por cenário, por nome de encargo do EMPLOYER_COST
+RATE_SHOCKS_DEFAULT = {"Brasil": {"RAT": (1.0, 3.0)}}
+FX_VOL_DEFAULT = 0.10 # Volatilidade anual (lognormal) do câmbio moeda local -> moeda de reporte
+MAX_CELLS_DEFAULT = 2_000_000 # Cenários x empregados avaliados por bloco (~16 MB por matriz float64)
+# Ladrilho de sorteio dos bônus: cada (bloco de cenários, bloco de empregados) tem o próprio gerador,
+# então o tamanho dos blocos de avaliação (max_cells) não muda os números sorteados
+SCEN_TILE = 256
+EMP_TILE = 1024
+PERCENTILES = (5, 50, 95)
+
+
+def sti_bonus_bounds(area: str, level: str) -> Tuple[float, float]:
+    """Faixa de bônus (fração do salário anual) usada na amostragem; 'Others' vai de 0 até o máximo."""
+    min_pct, max_pct = get_sti_range(area, level)
+    if level == "Others": return 0.0, float(max_pct or 0.0)
+    return float(min_pct or 0.0), float(max_pct if max_pct is not None else min_pct or 0.0)
+
+def _tile_seed(seed_seq: np.random.SeedSequence, *key: int) -> np.random.SeedSequence:
+    """Sub-sequência determinística de `seed_seq` identificada por `key` (equivale a um filho de spawn)."""
+    return np.random.SeedSequence(seed_seq.entropy, spawn_key=seed_seq.spawn_key + key)
+
+def _bonus_draws(seed_seq: np.random.SeedSequence, country_idx: int, s0: int, s1: int, e0: int, e1: int, n_scenarios: int, n_emp: int) -> np.ndarray:
+    """Uniformes [0, 1) do bloco [s0, s1) x [e0, e1), montados a partir dos ladrilhos SCEN_TILE x EMP_TILE que o cobrem."""
+    draws = np.empty((s1 - s0, e1 - e0))
+    for ts in range(s0 // SCEN_TILE * SCEN_TILE, s1, SCEN_TILE):
+        for te in range(e0 // EMP_TILE * EMP_TILE, e1, EMP_TILE):
+            rng = np.random.Generator(np.random.PCG64(_tile_seed(seed_seq, country_idx, 1 + ts // SCEN_TILE, te // EMP_TILE)))
+            tile = rng.random((min(SCEN_TILE, n_scenarios - ts), min(EMP_TILE, n_emp - te)))
+            rs0, rs1 = max(s0, ts), min(s1, ts + SCEN_TILE); re0, re1 = max(e0, te), min(e1, te + EMP_TILE)
+            draws[rs0 - s0:rs1 - s0, re0 - e0:re1 - e0] = tile[rs0 - ts:rs1 - ts, re0 - te:re1 - te]
+    return draws
+
+def simulate_employer_cost(workforce: pd.DataFrame, n_scenarios: int = 10000, seed: int = 42,
+                           fx_spot: Dict[str, float] = None, fx_vol: float = FX_VOL_DEFAULT,
+                           rate_shocks: Dict[str, Dict[str, Tuple[float, float]]] = None,
+                           tables_ext: Dict[str, Any] = None, max_cells: int = MAX_CELLS_DEFAULT) -> pd.DataFrame:
+    """Custo anual total do empregador por país em `n_scenarios` cenários, resumido em percentis.
+
+    Sem `fx_spot` os valores ficam na moeda local de cada país e o câmbio não é amostrado.
+    Com `fx_spot` ({país: taxa local -> reporte}) tudo é convertido e a linha "Total" soma os países.
+    A avaliação é feita em blocos de no máximo `max_cells` células para manter a memória limitada;
+    o bloco só afeta memória e tempo: a mesma `seed` dá os mesmos percentis com qualquer `max_cells`.
+    """
+    if tables_ext is None: _, tables_ext, _, _ = load_tables_data()
+    rate_shocks = RATE_SHOCKS_DEFAULT if rate_shocks is None else rate_shocks
+    seed_seq = np.random.SeedSequence(seed)
+
+    groups = {}
+    for country, grp in workforce.groupby("country", sort=True):
+        bounds = np.array([sti_bonus_bounds(a, l) for a, l in zip(grp["area"], grp["level"])], dtype=np.float64).reshape(-1, 2)
+        months = tables_ext.get("REMUN_MONTHS", {}).get(country, 12.0)
+        groups[country] = (grp["salary"].to_numpy(dtype=np.float64), bounds[:, 0], bounds[:, 1] - bounds[:, 0], months)
+
+    totals = {country: np.zeros(n_scenarios) for country in groups}
+    for country_idx, (country, (salary, bonus_lo, bonus_span, months)) in enumerate(groups.items()):
+        n_emp = len(salary)
+        if n_emp == 0: continue
+        # Choques e câmbio sorteados uma vez, para todos os cenários (mesma alíquota para toda a população do país)
+        scenario_rng = np.random.Generator(np.random.PCG64(_tile_seed(seed_seq, country_idx)))
+        shocks = {nome: scenario_rng.uniform(lo, hi, size=(n_scenarios, 1)) for nome, (lo, hi) in rate_shocks.get(country, {}).items()}
+        fx_z = scenario_rng.standard_normal(n_scenarios)
+        # Blocos de avaliação com ladrilhos inteiros (no mínimo um ladrilho)
+        emp_block = n_emp if n_emp * SCEN_TILE <= max_cells else max(EMP_TILE, max_cells // SCEN_TILE // EMP_TILE * EMP_TILE)
+        scen_chunk = max(SCEN_TILE, max_cells // emp_block // SCEN_TILE * SCEN_TILE)
+        for s0 in range(0, n_scenarios, scen_chunk):
+            s1 = min(s0 + scen_chunk, n_scenarios)
+            overrides = {nome: values[s0:s1] for nome, values in shocks.items()}
+            for e0 in range(0, n_emp, emp_block):
+                e1 = min(e0 + emp_block, n_emp)
+                sal = salary[e0:e1]
+                draws = _bonus_draws(seed_seq, country_idx, s0, s1, e0, e1, n_scenarios, n_emp)
+                bonus = (bonus_lo[e0:e1] + bonus_span[e0:e1] * draws) * (sal * months)
+                cost = employer_cost_vec(country, sal, bonus, tables_ext, overrides)
+                # Soma por ladrilho de empregados, sempre na mesma ordem: o total não depende do bloco
+                for t0 in range(0, e1 - e0, EMP_TILE): totals[country][s0:s1] += cost[:, t0:t0 + EMP_TILE].sum(axis=1)
+        if fx_spot is not None:
+            totals[country] *= float(fx_spot.get(country, 1.0)) * np.exp(fx_vol * fx_z - 0.5 * fx_vol ** 2)
+
+    if fx_spot is not None and totals: totals["Total"] = np.sum(list(totals.values()), axis=0)
+    rows = {}
+    for country, values in totals.items():
+        pcts = np.percentile(values, PERCENTILES)
+        rows[country] = {**{f"P{p}": v for p, v in zip(PERCENTILES, pcts)}, "Média": values.mean()}
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo do custo anual do empregador por país.")
+    parser.add_argument("workforce", help="CSV com as colunas country, salary, area, level")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fx", help="JSON {país: taxa moeda local -> moeda de reporte}")
+    parser.add_argument("--fx-vol", type=float, default=FX_VOL_DEFAULT)
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS_DEFAULT)
+    args = parser.parse_args(argv)
+
+    workforce = pd.read_csv(args.workforce)
+    fx_spot = None
+    if args.fx:
+        with open(args.fx, "r", encoding="utf-8") as f: fx_spot = json.load(f)
+    result = simulate_employer_cost(workforce, args.scenarios, args.seed, fx_spot=fx_spot, fx_vol=args.fx_vol, max_cells=args.max_cells)
+    print(result.to_string(float_format=lambda v: f"{v:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
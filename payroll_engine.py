@@ -0,0 +1,253 @@
+# -------------------------------------------------------------
+# 🧮 Motor de Cálculo (sem dependência do Streamlit)
+# Constantes, carregamento dos JSONs locais e funções puras de cálculo,
+# compartilhados entre o app e as rotinas em lote (Monte Carlo, exportações).
+# -------------------------------------------------------------
+
+from typing import Dict, Any, Tuple, List
+import json
+import os
+
+import numpy as np
+
+from country_registry import CalculatorRegistry, PayrollResult
+from indexed_units import IndexSeriesSet, current_period, is_indexed
+from tax_schedules import ScheduleSet
+
+# ======================== CONSTANTES e TETOS GLOBAIS =========================
+ANNUAL_CAPS = { "US_FICA": 168600.0, "US_SUTA_BASE": 7000.0, "CA_CPP_YMPEx1": 68500.0, "CA_CPP_YMPEx2": 73200.0, "CA_CPP_EXEMPT": 3500.0, "CA_EI_MIE": 63200.0, "CL_TETO_UF": 84.3, "CL_TETO_CESANTIA_UF": 126.6, }
+# Tetos em unidades indexadas (UF/UMA): convertidos para moeda uma vez por período de pagamento (ver calc_params)
+INDEXED_CAPS = { "MX_IMSS_CAP_MONTHLY": {"amount": 25, "unit": "UMA", "per": "day"}, "CL_TETO_MONTHLY": {"amount": ANNUAL_CAPS["CL_TETO_UF"], "unit": "UF", "per": "month"} }
+
+# ======================== CARREGAMENTO DE CONFIGS JSON LOCAIS =========================
+try:
+    CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    CONFIG_DIR = "." 
+
+COUNTRIES_FILE = os.path.join(CONFIG_DIR, "countries.json")
+STI_CONFIG_FILE = os.path.join(CONFIG_DIR, "sti_config.json")
+US_STATES_FILE = os.path.join(CONFIG_DIR, "us_state_tax_rates.json")
+COUNTRY_TABLES_FILE = os.path.join(CONFIG_DIR, "country_tables.json")
+BR_INSS_FILE = os.path.join(CONFIG_DIR, "br_inss.json")
+BR_IRRF_FILE = os.path.join(CONFIG_DIR, "br_irrf.json")
+COUNTRY_CALCULATORS_FILE = os.path.join(CONFIG_DIR, "country_calculators.json")
+TAX_BRACKETS_FILE = os.path.join(CONFIG_DIR, "tax_brackets.json")
+INDEX_SERIES_FILE = os.path.join(CONFIG_DIR, "index_series.json")
+
+
+def load_json(filepath, default_value={}):
+    if not os.path.exists(filepath):
+        return default_value
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        return default_value
+
+# --- Fallbacks Mínimos ---
+COUNTRIES_FALLBACK = {"Brasil": {"symbol": "R$", "flag": "🇧🇷", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "México": {"symbol": "MX$", "flag": "🇲🇽", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Chile": {"symbol": "CLP$", "flag": "🇨🇱", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": False}}, "Argentina": {"symbol": "ARS$", "flag": "🇦🇷", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Colômbia": {"symbol": "COP$", "flag": "🇨🇴", "valid_from": "2025-01-01", "benefits": {"ferias": True, "decimo": True}}, "Estados Unidos": {"symbol": "US$", "flag": "🇺🇸", "valid_from": "2025-01-01", "benefits": {"ferias": False, "decimo": False}}, "Canadá": {"symbol": "CAD$", "flag": "🇨🇦", "valid_from": "2025-01-01", "benefits": {"ferias": False, "decimo": False}}}
+STI_CONFIG_FALLBACK = {"STI_RANGES": { "Non Sales": { "CEO": [1.00, 1.00], "Members of the GEB": [0.50, 0.80], "Executive Manager": [0.45, 0.70], "Senior Group Manager": [0.40, 0.60], "Group Manager": [0.30, 0.50], "Lead Expert / Program Manager": [0.25, 0.40], "Senior Manager": [0.20, 0.40], "Senior Expert / Senior Project Manager": [0.15, 0.35], "Manager / Selected Expert / Project Manager": [0.10, 0.30], "Others": [0.0, 0.10] }, "Sales": { "Executive Manager / Senior Group Manager": [0.45, 0.70], "Group Manager / Lead Sales Manager": [0.35, 0.50], "Senior Manager / Senior Sales Manager": [0.25, 0.45], "Manager / Selected Sales Manager": [0.20, 0.35], "Others": [0.0, 0.15] } }, "STI_LEVEL_OPTIONS": { "Non Sales": [ "CEO", "Members of the GEB", "Executive Manager", "Senior Group Manager", "Group Manager", "Lead Expert / Program Manager", "Senior Manager", "Senior Expert / Senior Project Manager", "Manager / Selected Expert / Project Manager", "Others" ], "Sales": [ "Executive Manager / Senior Group Manager", "Group Manager / Lead Sales Manager", "Senior Manager / Senior Sales Manager", "Manager / Selected Sales Manager", "Others" ]}}
+BR_INSS_FALLBACK = { "vigencia": "2025-01-01", "teto_contribuicao": 1146.68, "teto_base": 8157.41, "faixas": [ {"ate": 1412.00, "aliquota": 0.075}, {"ate": 2666.68, "aliquota": 0.09}, {"ate": 4000.03, "aliquota": 0.12}, {"ate": 8157.41, "aliquota": 0.14} ] }
+COUNTRY_CALCULATORS_FALLBACK = { "Brasil": {"base_label": "Salário Base", "other_label": "Outras Deduções", "rounding": {"step": 0.01, "mode": "half_up"}, "components": [ {"type": "progressive", "code": "br_inss", "label": "INSS", "table": "br_inss"}, {"type": "bracket_deduction", "code": "br_irrf", "label": "IRRF", "table": "br_irrf", "base": {"minus": ["INSS"], "floor": True}} ], "employer_deposit": {"label": "FGTS", "rate": 0.08}}, "Estados Unidos": {"base_label": "Base Pay", "other_label": "Other Deductions", "rounding": {"step": 0.01, "mode": "half_up"}, "components": [ {"type": "capped_rate", "code": "us_fica", "label": "FICA (Social Security)", "rate": 0.062, "cap": "$US_FICA_MONTHLY"}, {"type": "flat_rate", "code": "us_medicare", "label": "Medicare", "rate": 0.0145}, {"type": "bracket_tax", "code": "us_federal_tax", "label": "Federal Income Tax", "jurisdiction": "US"}, {"type": "bracket_tax", "code": "us_state_tax", "label": "State Tax ({state_code})", "jurisdiction": "US-{state_code}", "flat_fallback": True} ]}, "Canadá": {"base_label": "Base Pay", "other_label": "Other Deductions", "rounding": {"step": 0.01, "mode": "half_up"}, "components": [ {"type": "band_rate", "code": "ca_cpp", "label": "CPP", "rate": "$CA_CPP_RATE", "lower": "$CA_CPP_EXEMPT_MONTHLY", "upper": "$CA_CPP_CAP_MONTHLY"}, {"type": "band_rate", "code": "ca_cpp2", "label": "CPP2", "rate": "$CA_CPP2_RATE", "lower": "$CA_CPP_CAP_MONTHLY", "upper": "$CA_CPP2_CAP_MONTHLY"}, {"type": "capped_rate", "code": "ca_ei", "label": "EI", "rate": "$CA_EI_RATE", "cap": "$CA_EI_CAP_MONTHLY"}, {"type": "bracket_tax", "code": "ca_federal_tax", "label": "Federal Income Tax", "jurisdiction": "CA"}, {"type": "bracket_tax", "code": "ca_provincial_tax", "label": "Provincial Tax ({state_code})", "jurisdiction": "CA-{state_code}"} ]}, "México": {"base_label": "Base", "other_label": "Otras Deducciones", "rounding": {"step": 0.01, "mode": "half_up"}, "components": [ {"type": "capped_rate", "code": "mx_imss", "label": "IMSS (Est.)", "rate": {"table_rate": ["IMSS_Simplificado", "IMSS"], "default": 0.05}, "cap": "$MX_IMSS_CAP_MONTHLY"}, {"type": "flat_rate", "code": "mx_isr", "label": "ISR (Est.)", "rate": {"table_rate": ["ISR_Simplificado", "ISR"], "default": 0.15}, "base": {"minus": ["IMSS (Est.)"]}} ]}, "Chile": {"base_label": "Base", "other_label": "Outras Deduções", "rounding": {"step": 1, "mode": "half_up"}, "components": [ {"type": "table_rates", "cap": "$CL_TETO_MONTHLY"} ]}, "Colômbia": {"base_label": "Base", "other_label": "Outras Deduções", "rounding": {"step": 1, "mode": "half_up"}, "components": [ {"type": "table_rates"} ]}, "default": {"base_label": "Base", "other_label": "Outras Deduções", "components": [ {"type": "table_rates"} ]} }
+TAX_BRACKETS_FALLBACK = { "vigencia": "2025-01-01", "schedules": { "US": {"deduction": 15750, "brackets": [[0, 0.10], [11925, 0.12], [48475, 0.22], [103350, 0.24], [197300, 0.32], [250525, 0.35], [626350, 0.37]]}, "CA": {"credit_amount": 16129, "brackets": [[0, 0.15], [57375, 0.205], [114750, 0.26], [177882, 0.29], [253414, 0.33]]} } }
+INDEX_SERIES_FALLBACK = { "UF": {"currency": "CLP", "values": [["2025-01-01", 38419.17]]}, "UMA": {"currency": "MXN", "values": [["2024-02-01", 108.57], ["2025-02-01", 113.14]]} }
+BR_IRRF_FALLBACK = { "vigencia": "2025-01-01", "deducao_dependente": 189.59, "faixas": [ {"ate": 2259.20, "aliquota": 0.00, "deducao": 0.00}, {"ate": 2826.65, "aliquota": 0.075, "deducao": 169.44}, {"ate": 3751.05, "aliquota": 0.15, "deducao": 381.44}, {"ate": 4664.68, "aliquota": 0.225, "deducao": 662.77}, {"ate": 999999999.0, "aliquota": 0.275, "deducao": 896.00} ] }
+
+
+# --- Carrega Configurações ---
+COUNTRIES_DATA = load_json(COUNTRIES_FILE, COUNTRIES_FALLBACK)
+STI_CONFIG_DATA = load_json(STI_CONFIG_FILE, STI_CONFIG_FALLBACK)
+US_STATE_RATES = load_json(US_STATES_FILE, {}) 
+BR_INSS_TBL = load_json(BR_INSS_FILE, BR_INSS_FALLBACK)
+BR_IRRF_TBL = load_json(BR_IRRF_FILE, BR_IRRF_FALLBACK)
+COUNTRY_TABLES_DATA = load_json(COUNTRY_TABLES_FILE, {})
+COUNTRY_CALCULATORS = load_json(COUNTRY_CALCULATORS_FILE, COUNTRY_CALCULATORS_FALLBACK)
+TAX_BRACKETS_DATA = load_json(TAX_BRACKETS_FILE, TAX_BRACKETS_FALLBACK)
+INDEX_SERIES_DATA = load_json(INDEX_SERIES_FILE, INDEX_SERIES_FALLBACK) or INDEX_SERIES_FALLBACK
+
+# --- Extrai Dados Carregados ---
+COUNTRIES = COUNTRIES_DATA if COUNTRIES_DATA else COUNTRIES_FALLBACK 
+if not COUNTRIES: COUNTRIES = COUNTRIES_FALLBACK 
+
+if not STI_CONFIG_DATA or "STI_RANGES" not in STI_CONFIG_DATA:
+    STI_RANGES = STI_CONFIG_FALLBACK.get("STI_RANGES", {})
+    STI_LEVEL_OPTIONS = STI_CONFIG_FALLBACK.get("STI_LEVEL_OPTIONS", {})
+else:
+    STI_RANGES = STI_CONFIG_DATA.get("STI_RANGES", {})
+    STI_LEVEL_OPTIONS = STI_CONFIG_DATA.get("STI_LEVEL_OPTIONS", {})
+
+
+COUNTRY_BENEFITS = {k: v.get("benefits", {}) for k, v in COUNTRIES.items()}
+TABLES_DEFAULT = COUNTRY_TABLES_DATA.get("TABLES", {})
+EMPLOYER_COST_DEFAULT = COUNTRY_TABLES_DATA.get("EMPLOYER_COST", {})
+REMUN_MONTHS_DEFAULT = COUNTRY_TABLES_DATA.get("REMUN_MONTHS", {})
+PAYOUT_CALENDAR_DEFAULT = COUNTRY_TABLES_DATA.get("PAYOUT_CALENDAR", {})
+CA_CPP_EI_DEFAULT = { "cpp_rate": 0.0595, "cpp_exempt_monthly": ANNUAL_CAPS["CA_CPP_EXEMPT"] / 12.0, "cpp_cap_monthly": ANNUAL_CAPS["CA_CPP_YMPEx1"] / 12.0, "cpp2_rate": 0.04, "cpp2_cap_monthly": ANNUAL_CAPS["CA_CPP_YMPEx2"] / 12.0, "ei_rate": 0.0163, "ei_cap_monthly": ANNUAL_CAPS["CA_EI_MIE"] / 12.0 }
+
+# Tabelas progressivas federais/estaduais/provinciais, indexadas por código de jurisdição ("US-CA", "CA-ON")
+TAX_SCHEDULES = ScheduleSet(TAX_BRACKETS_DATA.get("schedules", {}) or TAX_BRACKETS_FALLBACK["schedules"])
+CA_PROVINCES = [code.split("-", 1)[1] for code in TAX_SCHEDULES.codes if code.startswith("CA-")]
+
+# Séries datadas de UF/UMA; os valores abaixo são os do período corrente (exibição e compatibilidade)
+INDEX_SERIES = IndexSeriesSet(INDEX_SERIES_DATA)
+UMA_DIARIA_MX = INDEX_SERIES.value("UMA", current_period())
+MX_IMSS_CAP_MONTHLY = INDEX_SERIES.resolve(INDEXED_CAPS["MX_IMSS_CAP_MONTHLY"], current_period())
+
+# Referências "$NOME" usadas em country_calculators.json
+CALC_PARAMS = { "US_FICA_MONTHLY": ANNUAL_CAPS["US_FICA"] / 12.0, "MX_IMSS_CAP_MONTHLY": MX_IMSS_CAP_MONTHLY, **{f"CA_{k.upper()}": v for k, v in CA_CPP_EI_DEFAULT.items()} }
+
+# Montado uma vez: o mesmo objeto a cada rerun mantém válido o cache do registro de calculadoras
+COUNTRY_TABLES_DICT = {
+    "TABLES": COUNTRY_TABLES_DATA.get("TABLES", TABLES_DEFAULT),
+    "EMPLOYER_COST": COUNTRY_TABLES_DATA.get("EMPLOYER_COST", EMPLOYER_COST_DEFAULT),
+    "REMUN_MONTHS": COUNTRY_TABLES_DATA.get("REMUN_MONTHS", REMUN_MONTHS_DEFAULT),
+    "PAYOUT_CALENDAR": COUNTRY_TABLES_DATA.get("PAYOUT_CALENDAR", PAYOUT_CALENDAR_DEFAULT)
+}
+_REGISTRIES: Dict[Tuple[int, int, int, str], CalculatorRegistry] = {}
+_PERIOD_PARAMS: Dict[str, Dict[str, float]] = {}
+_RESOLVED_TABLES: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+
+def load_tables_data(): 
+    return US_STATE_RATES, COUNTRY_TABLES_DICT, BR_INSS_TBL, BR_IRRF_TBL
+
+# ======================== FUNÇÕES DE CÁLCULO E AUXÍLIO =========================
+
+def get_sti_range(area: str, level: str) -> Tuple[float, float]:
+    area_tbl = STI_RANGES.get(area, {}) 
+    rng = area_tbl.get(level)
+    return rng if rng else (0.0, None)
+
+def calc_params(period: str = None) -> Dict[str, float]:
+    """Referências "$NOME" de um período ("AAAA-MM"): CALC_PARAMS com os tetos indexados já em moeda."""
+    period = period or current_period()
+    params = _PERIOD_PARAMS.get(period)
+    if params is None:
+        params = _PERIOD_PARAMS[period] = {**CALC_PARAMS, **{k: INDEX_SERIES.resolve(v, period) for k, v in INDEXED_CAPS.items()}}
+    return params
+
+def resolve_tables(tables_ext, period: str = None):
+    """`tables_ext` com os tetos de EMPLOYER_COST em UF/UMA convertidos para valor anual em moeda no período.
+
+    Sem tetos indexados devolve o próprio objeto; o resultado é reaproveitado enquanto as tabelas forem as mesmas.
+    """
+    if not tables_ext: return tables_ext
+    period = period or current_period()
+    hit = _RESOLVED_TABLES.get((id(tables_ext), period))
+    if hit is not None and hit[0] is tables_ext: return hit[1]
+    employer = tables_ext.get("EMPLOYER_COST", {})
+    resolved = tables_ext
+    if any(is_indexed(item.get("teto")) for items in employer.values() for item in items):
+        resolved = {**tables_ext, "EMPLOYER_COST": {c: [{**item, "teto": INDEX_SERIES.resolve(item["teto"], period, per="year")} if is_indexed(item.get("teto")) else item
+                                                       for item in items] for c, items in employer.items()}}
+    if len(_RESOLVED_TABLES) >= 16: _RESOLVED_TABLES.clear()
+    _RESOLVED_TABLES[(id(tables_ext), period)] = (tables_ext, resolved)
+    return resolved
+
+def get_calculator_registry(tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, period: str = None) -> CalculatorRegistry:
+    """Registro de calculadoras para um conjunto de tabelas e um período; reaproveitado enquanto ambos forem os mesmos."""
+    period = period or current_period()
+    key = (id(tables_ext), id(br_inss_tbl), id(br_irrf_tbl), period)
+    registry = _REGISTRIES.get(key)
+    # O registro guarda referências às tabelas, então o id não pode ser reciclado enquanto estiver no cache
+    if registry is None:
+        if len(_REGISTRIES) >= 8: _REGISTRIES.clear()
+        registry = _REGISTRIES[key] = CalculatorRegistry(COUNTRY_CALCULATORS, calc_params(period), tables_ext, TABLES_DEFAULT, {"br_inss": br_inss_tbl, "br_irrf": br_irrf_tbl, "tax_brackets": TAX_SCHEDULES})
+    return registry
+
+def calc_country_net(country_code: str, salary: float, other_deductions: float, state_code=None, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, trace=False, period=None) -> PayrollResult:
+    """Demonstrativo mensal; `state_code` é a sigla do estado (EUA) ou da província (Canadá).
+
+    Com `trace`, `result.trace` lista a conta de cada componente (base usada, faixa, teto aplicado).
+    """
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return calculator(salary, other_deductions, state_code, state_rate, dependentes, trace)
+
+# ======================== CUSTO DO EMPREGADOR =========================
+# Países cujos encargos incidem sobre 12 salários (sem 13º/férias na base)
+BASE_12_MONTHS_COUNTRIES = ["Estados Unidos", "Canadá"]
+
+def calc_employer_charges(country_code: str, salary: float, bonus: float, tables_ext=None, period=None):
+    """Custo anual do empregador (salário + bônus + encargos) sem montar a tabela de exibição."""
+    tables_ext = resolve_tables(tables_ext, period)
+    months = (tables_ext or {}).get("REMUN_MONTHS", {}).get(country_code, 12.0)
+    enc_list = (tables_ext or {}).get("EMPLOYER_COST", {}).get(country_code, [])
+
+    salario_anual_base = salary * 12.0; salario_anual_beneficios = salary * months; total_cost_items = []
+
+    for item in enc_list:
+        perc = item.get("percentual", 0.0) / 100.0; teto = item.get("teto"); incide_bonus = item.get("bonus", False)
+        base_calc_anual = salario_anual_base if country_code in BASE_12_MONTHS_COUNTRIES else salario_anual_beneficios
+        if incide_bonus: base_calc_anual += bonus
+
+        if teto is not None and isinstance(teto, (int, float)):
+            if country_code == "Canadá":
+                 if item.get("nome") == "CPP2 (ER)": base_calc_anual = max(0, min(base_calc_anual, ANNUAL_CAPS["CA_CPP_YMPEx2"]) - ANNUAL_CAPS["CA_CPP_YMPEx1"])
+                 else: base_calc_anual = min(base_calc_anual, teto)
+            else:
+                base_calc_anual = min(base_calc_anual, teto)
+
+        custo_item = base_calc_anual * perc; total_cost_items.append(custo_item)
+
+    total_encargos = sum(total_cost_items); custo_total_anual = (salary * months) + bonus + total_encargos
+    mult = (custo_total_anual / salario_anual_base) if salario_anual_base > 0 else 0.0
+    return custo_total_anual, mult, months
+
+def employer_cost_vec(country_code: str, salary, bonus, tables_ext=None, rate_overrides: Dict[str, Any] = None, period=None) -> np.ndarray:
+    """Versão vetorizada de `calc_employer_charges` (apenas o custo total anual).
+
+    `salary` e `bonus` podem ser arrays de qualquer forma compatível com broadcast.
+    `rate_overrides` substitui o percentual de encargos pelo nome (ex.: {"RAT": array_de_percentuais}).
+    """
+    salary = np.asarray(salary, dtype=np.float64); bonus = np.asarray(bonus, dtype=np.float64)
+    tables_ext = resolve_tables(tables_ext, period)
+    months = (tables_ext or {}).get("REMUN_MONTHS", {}).get(country_code, 12.0)
+    enc_list = (tables_ext or {}).get("EMPLOYER_COST", {}).get(country_code, [])
+    overrides = rate_overrides or {}
+
+    base_sem_bonus = salary * (12.0 if country_code in BASE_12_MONTHS_COUNTRIES else months)
+    total_encargos = 0.0
+    for item in enc_list:
+        perc = np.asarray(overrides.get(item.get("nome"), item.get("percentual", 0.0)), dtype=np.float64) / 100.0
+        teto = item.get("teto")
+        base_calc_anual = base_sem_bonus + bonus if item.get("bonus", False) else base_sem_bonus
+        if teto is not None and isinstance(teto, (int, float)):
+            if country_code == "Canadá" and item.get("nome") == "CPP2 (ER)":
+                base_calc_anual = np.maximum(0.0, np.minimum(base_calc_anual, ANNUAL_CAPS["CA_CPP_YMPEx2"]) - ANNUAL_CAPS["CA_CPP_YMPEx1"])
+            else:
+                base_calc_anual = np.minimum(base_calc_anual, teto)
+        total_encargos = total_encargos + base_calc_anual * perc
+    return (salary * months) + bonus + total_encargos
+
+# ======================== CÁLCULO VETORIZADO (LOTES) =========================
+# Mesmas calculadoras do registro, aplicadas a arrays NumPy de um único país.
+# A ordem das somas é a mesma da versão escalar para que os resultados coincidam bit a bit.
+
+def calc_country_net_vec(country_code: str, salary, other_deductions=0.0, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, state_code=None, period=None) -> Dict[str, np.ndarray]:
+    """Versão vetorizada de `calc_country_net` (sem as linhas descritivas).
+
+    `state_rate` (EUA) é um array de alíquotas estaduais por empregado; zero equivale a sem imposto estadual.
+    `state_code` é o estado/província por empregado: array de siglas ou o par (categorias, índices)
+    de um dicionário já codificado; estados com tabela progressiva ignoram `state_rate`.
+    """
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return calculator.evaluate_vec(salary, other_deductions, state_rate, dependentes, state_code)
+
+def calc_country_net_records(country_code: str, salary, other_deductions=0.0, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, state_code=None, period=None) -> np.ndarray:
+    """Como `calc_country_net_vec`, mas devolve um array estruturado com uma coluna por código de componente."""
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return calculator.evaluate_records(salary, other_deductions, state_rate, dependentes, state_code)
+
+# ======================== CÁLCULO EXATO (CENTAVOS INTEIROS) =========================
+# Mesmas calculadoras em ponto fixo: entradas em centavos, cada linha arredondada pela
+# regra legal do país ("rounding" em country_calculators.json). Sem floats na conta.
+
+def calc_country_net_cents(country_code: str, salary_cents: int, other_deductions_cents: int = 0, state_code=None, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, period=None) -> PayrollResult:
+    """Demonstrativo exato; valores do resultado em centavos inteiros (`fixed_point.to_cents` converte floats)."""
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return calculator.cents(int(salary_cents), int(other_deductions_cents), state_code, state_rate, dependentes)
+
+def calc_country_net_cents_vec(country_code: str, salary_cents, other_deductions_cents=0, state_rate=None, dependentes=0, tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, state_code=None, period=None) -> np.ndarray:
+    """Lote exato: arrays int64 de centavos -> array estruturado int64 com uma coluna por código de componente."""
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return calculator.evaluate_cents(salary_cents, other_deductions_cents, state_rate, dependentes, state_code)
@@ -0,0 +1,269 @@
+# -------------------------------------------------------------
+# 🧾 Demonstrativos Mensais em PDF (geração em massa)
+# Um PDF por empregado com as mesmas linhas de `PayrollResult.lines`, no idioma
+# do empregado (i18n.json). O PDF é montado direto em bytes a partir de um
+# modelo pré-compilado por (país, idioma): cabeçalho, fontes, títulos e rótulos
+# fixos já prontos; por empregado só entram os valores, o fluxo de conteúdo
+# (comprimido) e a tabela xref. Os lotes são renderizados num pool de processos
+# e gravados em streaming num .zip ou em pastas por país, com poucos lotes em
+# voo por vez (nenhum arquivo fica inteiro na memória).
+#
+# Uso:
+#   python payslips.py run empregados.parquet demonstrativos.zip --period 2025-10
+#   python payslips.py run empregados.csv ./demonstrativos          (pastas por país)
+#   python payslips.py bench --employees 50000
+#
+# Colunas de entrada: as do batch_io (country, salary, dependents, other_deductions, state)
+# e, opcionais, employee_id, name e language ("Português", "English", "Español").
+# -------------------------------------------------------------
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import os
+import re
+import tempfile
+import time
+import zipfile
+import zlib
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from payroll_engine import COUNTRIES, US_STATE_RATES, load_tables_data, get_calculator_registry
+from money_format import fmt_money, money_or_blank
+from i18n import available_languages, get_bundle, component_labels
+from indexed_units import current_period
+from batch_io import peak_rss_mb, read_batches, synthetic_table
+
+CHUNK_DEFAULT = 2000 # Empregados por tarefa do pool
+IN_FLIGHT = 2 # Lotes em voo por processo (limita a memória do lado de quem grava)
+COUNTRY_LANGUAGE = {"Brasil": "Português", "Estados Unidos": "English", "Canadá": "English"} # Demais países: Español
+DEFAULT_LANGUAGE = "Español"
+
+# Página A4 em pontos; colunas de valores alinhadas à direita em Courier (largura fixa: 0,6 em por caractere)
+PAGE_W, PAGE_H, MARGIN = 595, 842, 50
+COL_EARN, COL_DED = 430, PAGE_W - MARGIN
+ROW_H, FONT_SIZE, MONO_W = 14, 10, 0.6
+
+# Objetos fixos do PDF: catálogo, páginas, página e fontes (WinAnsi cobre os acentos de pt/es); o 7 é o conteúdo
+_OBJECTS = [
+    b"<< /Type /Catalog /Pages 2 0 R >>",
+    b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+    b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 4 0 R /F2 5 0 R /F3 6 0 R >> >> /Contents 7 0 R >>" % (PAGE_W, PAGE_H),
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+]
+
+
+def _pdf_head() -> Tuple[bytes, List[int]]:
+    head = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"); offsets = []
+    for i, body in enumerate(_OBJECTS, start=1):
+        offsets.append(len(head)); head += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    return bytes(head), offsets
+
+_HEAD, _HEAD_OFFSETS = _pdf_head()
+_XREF_HEAD = b"xref\n0 8\n0000000000 65535 f \n" + b"".join(b"%010d 00000 n \n" % o for o in _HEAD_OFFSETS)
+
+
+def _pdf_text(text: str) -> bytes:
+    raw = str(text).encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _text(font: bytes, size: int, x: float, y: float, text: str) -> bytes:
+    return b"BT /%s %d Tf %.2f %.2f Td %s Tj ET\n" % (font, size, x, y, _pdf_text(text))
+
+def _right(x: float, y: float, text: str, font: bytes = b"F3") -> bytes:
+    if not text: return b""
+    return _text(font, FONT_SIZE, x - len(text) * MONO_W * FONT_SIZE, y, text)
+
+def _rule(y: float) -> bytes:
+    return b"0.5 w %d %.2f m %d %.2f l S\n" % (MARGIN, y, PAGE_W - MARGIN, y)
+
+
+class PayslipTemplate:
+    """Modelo pré-compilado de um (país, idioma): textos fixos já em bytes; `render` só acrescenta os valores."""
+    __slots__ = ("country", "language", "symbol", "labels", "prefix", "texts")
+
+    def __init__(self, country: str, language: str):
+        T = get_bundle(language)
+        self.country = country; self.language = language
+        self.symbol = COUNTRIES.get(country, {}).get("symbol", ""); self.labels = component_labels(language)
+        self.texts = {k: T.get(k, d) for k, d in (("tot_earnings", "Total Earnings"), ("tot_deductions", "Total Deductions"), ("net", "Net Salary"),
+                                                  ("fgts_deposit", "FGTS"))}
+        top = PAGE_H - MARGIN
+        self.prefix = b"".join((
+            _text(b"F2", 16, MARGIN, top - 10, T.get("payslip_title", "Payslip")),
+            _text(b"F1", FONT_SIZE, MARGIN, top - 40, T.get("payslip_employee", "Employee") + ":"),
+            _text(b"F1", FONT_SIZE, MARGIN, top - 55, T.get("country", "Country") + ":"),
+            _text(b"F1", FONT_SIZE, MARGIN, top - 70, T.get("payslip_period", "Pay Period") + ":"),
+            _rule(top - 80),
+            _text(b"F2", FONT_SIZE, MARGIN, top - 93, T.get("payslip_description", "Description")),
+            _text(b"F2", FONT_SIZE, COL_EARN - 90, top - 93, T.get("earnings", "Earnings")),
+            _text(b"F2", FONT_SIZE, COL_DED - 90, top - 93, T.get("deductions", "Deductions")),
+            _rule(top - 100),
+            _text(b"F1", FONT_SIZE, MARGIN + 100, top - 55, country),
+        ))
+
+    def content(self, employee: str, period: str, result) -> bytes:
+        """Fluxo de conteúdo da página: o prefixo fixo mais cabeçalho do empregado, linhas e totais."""
+        top = PAGE_H - MARGIN; sym = self.symbol
+        parts = [self.prefix, _text(b"F1", FONT_SIZE, MARGIN + 100, top - 40, employee), _text(b"F1", FONT_SIZE, MARGIN + 100, top - 70, period)]
+        y = top - 115
+        for label, earn, ded in result.lines(self.labels):
+            parts += [_text(b"F1", FONT_SIZE, MARGIN, y, label), _right(COL_EARN, y, money_or_blank(earn, sym)), _right(COL_DED, y, money_or_blank(ded, sym))]
+            y -= ROW_H
+        parts.append(_rule(y + ROW_H - 4)); y -= 4
+        parts += [_text(b"F1", FONT_SIZE, MARGIN, y, self.texts["tot_earnings"]), _right(COL_EARN, y, fmt_money(result.total_earn, sym)),
+                  _text(b"F1", FONT_SIZE, MARGIN, y - ROW_H, self.texts["tot_deductions"]), _right(COL_DED, y - ROW_H, fmt_money(result.total_ded, sym)),
+                  _text(b"F2", FONT_SIZE + 2, MARGIN, y - 2.5 * ROW_H, self.texts["net"]), _right(COL_DED, y - 2.5 * ROW_H, fmt_money(result.net, sym), b"F3")]
+        if result.fgts: parts.append(_text(b"F1", FONT_SIZE - 1, MARGIN, y - 4 * ROW_H, f"{self.texts['fgts_deposit']}: {fmt_money(result.fgts, sym)}"))
+        return b"".join(parts)
+
+    def render(self, employee: str, period: str, result, compress: bool = True) -> bytes:
+        """PDF completo de um empregado."""
+        content = self.content(employee, period, result)
+        if compress: content = zlib.compress(content, 6); filt = b" /Filter /FlateDecode"
+        else: filt = b""
+        body = b"7 0 obj\n<< /Length %d%s >>\nstream\n" % (len(content), filt) + content + b"\nendstream\nendobj\n"
+        return b"".join((_HEAD, body, _XREF_HEAD, b"%010d 00000 n \n" % len(_HEAD),
+                         b"trailer\n<< /Size 8 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(_HEAD) + len(body))))
+
+
+# ======================== RENDERIZAÇÃO (PROCESSOS DO POOL) =========================
+_TEMPLATES: Dict[Tuple[str, str], PayslipTemplate] = {} # Por processo: cada modelo é compilado uma vez
+_UNSAFE = re.compile(r"[^\w.-]") # Caracteres trocados por "_" no nome do arquivo
+
+def template(country: str, language: str) -> PayslipTemplate:
+    tpl = _TEMPLATES.get((country, language))
+    if tpl is None: tpl = _TEMPLATES[(country, language)] = PayslipTemplate(country, language)
+    return tpl
+
+def employee_language(country: str, language: Optional[str]) -> str:
+    """Idioma do empregado; vazio ou desconhecido usa o idioma do país."""
+    return language if language in available_languages() else COUNTRY_LANGUAGE.get(country, DEFAULT_LANGUAGE)
+
+def render_chunk(chunk: Dict[str, list], period: str, compress: bool = True) -> List[Tuple[str, bytes]]:
+    """Renderiza um lote (colunas como listas); devolve (caminho "País/id.pdf", bytes) de cada empregado."""
+    _, tables_ext, br_inss, br_irrf = load_tables_data()
+    registry = get_calculator_registry(tables_ext, br_inss, br_irrf, period)
+    out = []
+    for emp, name, country, salary, other, deps, state, language in zip(chunk["employee_id"], chunk["name"], chunk["country"], chunk["salary"],
+                                                                         chunk["other_deductions"], chunk["dependents"], chunk["state"], chunk["language"]):
+        if country not in COUNTRIES: continue
+        state_rate = float(US_STATE_RATES.get(state, 0.0)) if state else None
+        result = registry.get(country)(float(salary or 0.0), float(other or 0.0), state, state_rate, int(deps or 0))
+        label = f"{name} ({emp})" if name else str(emp); file_id = _UNSAFE.sub("_", str(emp))
+        out.append((f"{country}/{file_id}.pdf", template(country, employee_language(country, language)).render(label, period, result, compress)))
+    return out
+
+
+def _chunks(path: str, size: int) -> Iterator[Dict[str, list]]:
+    offset = 0
+    for batch in read_batches(path, size):
+        names = batch.schema.names; n = batch.num_rows
+        col = lambda name, default: batch.column(name).to_pylist() if name in names else [default] * n
+        chunk = {"employee_id": col("employee_id", None), "name": col("name", None), "country": col("country", None), "salary": col("salary", 0.0),
+                 "other_deductions": col("other_deductions", 0.0), "dependents": col("dependents", 0), "state": col("state", None), "language": col("language", None)}
+        if "employee_id" not in names: chunk["employee_id"] = list(range(offset, offset + n)) # Sem id: posição no arquivo
+        offset += n
+        yield chunk
+
+
+# ======================== GRAVAÇÃO EM STREAMING =========================
+class ZipSink:
+    """Um .zip com uma pasta por país; os PDFs já vêm comprimidos, então as entradas vão sem compressão."""
+    def __init__(self, path: str):
+        self.path = path; self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.stamp = time.localtime()[:6]
+
+    def write(self, name: str, data: bytes):
+        self.zip.writestr(zipfile.ZipInfo(name, self.stamp), data)
+
+    def close(self):
+        self.zip.close()
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+class FolderSink:
+    """Pastas por país dentro de `path`."""
+    def __init__(self, path: str):
+        self.path = path; self.dirs = set(); self.bytes = 0
+
+    def write(self, name: str, data: bytes):
+        folder = os.path.join(self.path, os.path.dirname(name))
+        if folder not in self.dirs: os.makedirs(folder, exist_ok=True); self.dirs.add(folder)
+        with open(os.path.join(self.path, name), "wb") as f: f.write(data)
+        self.bytes += len(data)
+
+    def close(self): pass
+
+    def size(self) -> int:
+        return self.bytes
+
+
+def generate(input_path: str, output: str, period: str = None, workers: int = None, chunk: int = CHUNK_DEFAULT, compress: bool = True) -> Dict[str, Any]:
+    """Gera os demonstrativos de `input_path` em `output` (.zip ou pasta); devolve vazão e pico de memória.
+
+    Os lotes são entregues ao pool na ordem do arquivo e gravados na mesma ordem; no máximo
+    `IN_FLIGHT` lotes por processo ficam pendentes, o que limita a memória do processo principal.
+    """
+    period = period or current_period(); workers = workers or os.cpu_count() or 1
+    sink = ZipSink(output) if output.lower().endswith(".zip") else FolderSink(output)
+    docs = rows = 0; t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            def drain():
+                nonlocal docs
+                for name, data in pending.popleft().result(): sink.write(name, data); docs += 1
+            for task in _chunks(input_path, chunk):
+                rows += len(task["country"])
+                pending.append(pool.submit(render_chunk, task, period, compress))
+                if len(pending) >= IN_FLIGHT * workers: drain()
+            while pending: drain()
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - t0
+    return {"rows": rows, "documents": docs, "skipped": rows - docs, "seconds": elapsed, "docs_per_s": docs / elapsed if elapsed else 0.0,
+            "output_mb": sink.size() / 2**20, "workers": workers, "peak_main_mb": peak_rss_mb(), "peak_worker_mb": peak_rss_mb(children=True)}
+
+
+def benchmark(n_employees: int = 50_000, workers: int = None, workdir: str = None) -> Dict[str, Any]:
+    """Gera `n_employees` demonstrativos sintéticos (idiomas sorteados) num .zip temporário."""
+    table = synthetic_table(n_employees)
+    languages = np.array(available_languages())[np.random.default_rng(3).integers(0, len(available_languages()), n_employees)]
+    table = table.append_column("language", pa.array(languages))
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        src = os.path.join(tmp, "empregados.parquet"); pq.write_table(table, src)
+        del table
+        return generate(src, os.path.join(tmp, "demonstrativos.zip"), workers=workers)
+
+
+def print_report(r: Dict[str, Any]):
+    mb = lambda v: "n/d" if v is None else f"{v:.0f} MB"
+    print(f"{r['documents']:,} demonstrativos ({r['skipped']:,} ignorados) em {r['seconds']:.2f}s com {r['workers']} processos: "
+          f"{r['docs_per_s']:,.0f} PDFs/s | saída {r['output_mb']:.1f} MB | pico de memória: principal {mb(r['peak_main_mb'])}, maior processo do pool {mb(r['peak_worker_mb'])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Demonstrativos mensais em PDF por empregado (em massa).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="Gera os PDFs de um arquivo de empregados (.parquet, .arrow ou .csv)")
+    run.add_argument("input"); run.add_argument("output", help="Arquivo .zip ou pasta (uma subpasta por país)")
+    run.add_argument("--period", default=None, help="Competência AAAA-MM (padrão: mês corrente)")
+    run.add_argument("--workers", type=int, default=None); run.add_argument("--chunk", type=int, default=CHUNK_DEFAULT)
+    run.add_argument("--no-compress", action="store_true", help="Fluxos de conteúdo sem FlateDecode (PDFs legíveis em texto)")
+    bench = sub.add_parser("bench", help="Gera demonstrativos sintéticos num .zip temporário")
+    bench.add_argument("--employees", type=int, default=50_000); bench.add_argument("--workers", type=int, default=None); bench.add_argument("--workdir", default=None)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench": print_report(benchmark(args.employees, args.workers, args.workdir))
+    else: print_report(generate(args.input, args.output, args.period, args.workers, args.chunk, not args.no_compress))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# -------------------------------------------------------------
+# 📈 Compilação Linear por Partes (salário -> líquido / custo do empregador)
+# Todas as regras do motor são lineares por partes no salário (faixas do INSS
+# e do IRRF, tetos de FICA/EI/IMSS, isenção e tetos do CPP, alíquotas fixas).
+# Para um conjunto fixo das demais entradas (estado, dependentes, deduções,
+# bônus), a função inteira vira uma tabela ordenada de pontos de quebra com a
+# reta de cada trecho: avaliar é uma busca binária e uma multiplicação-soma,
+# e a alíquota marginal exata e os limites de faixa saem da própria tabela.
+#
+# Os pontos de quebra são descobertos no avaliador vetorizado (sem repetir a
+# lógica de cada componente): cada intervalo não linear é dividido no cruzamento
+# das retas das pontas, que é exatamente o ponto de quebra quando há um só.
+#
+# Uso:
+#   python piecewise.py                       (todos os países, líquido e custo)
+#   python piecewise.py --country Brasil --dependents 2 --show
+# -------------------------------------------------------------
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import time
+
+import numpy as np
+
+from payroll_engine import COUNTRIES, load_tables_data, get_calculator_registry, calc_country_net, calc_employer_charges, employer_cost_vec, resolve_tables
+from indexed_units import current_period
+
+UPPER_DEFAULT = 1e8 # Maior salário mensal coberto pela tabela (acima dele vale a reta do último trecho)
+GRID_DEFAULT = 256 # Pontos da grade inicial (geométrica + linear) antes do refinamento
+RTOL = 1e-9 # Tolerância relativa para considerar três pontos colineares
+XTOL = 1e-6 # Largura mínima de intervalo (descontinuidades param aqui)
+_PROBES = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+_NEAR = 2.0 ** -np.arange(2, 50) # Distâncias (fração do intervalo) conferidas dos dois lados de um cruzamento
+
+
+class PiecewiseLinear:
+    """Função linear por partes: trecho i começa em `xs[i]`, vale `ys[i]` ali e tem inclinação `slopes[i]`.
+
+    O primeiro trecho também cobre valores abaixo de `xs[0]` e o último continua além de `upper`.
+    """
+    __slots__ = ("xs", "ys", "slopes", "upper")
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, slopes: np.ndarray, upper: float):
+        self.xs = np.asarray(xs, dtype=np.float64); self.ys = np.asarray(ys, dtype=np.float64)
+        self.slopes = np.asarray(slopes, dtype=np.float64); self.upper = float(upper)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def segment(self, x: Any) -> np.ndarray:
+        """Índice do trecho de cada salário (busca binária)."""
+        return np.maximum(np.searchsorted(self.xs, x, side="right") - 1, 0)
+
+    def __call__(self, x: Any) -> Any:
+        x = np.asarray(x, dtype=np.float64); i = self.segment(x)
+        y = self.ys[i] + (x - self.xs[i]) * self.slopes[i]
+        return float(y) if y.ndim == 0 else y
+
+    def marginal(self, x: Any) -> Any:
+        """Inclinação no salário (para o líquido, 1 - alíquota marginal total)."""
+        m = self.slopes[self.segment(np.asarray(x, dtype=np.float64))]
+        return float(m) if np.ndim(m) == 0 else m
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        """Salários em que a inclinação muda (limites de faixa e tetos vistos no salário bruto)."""
+        return self.xs[1:]
+
+    def rows(self) -> List[Dict[str, float]]:
+        """Uma linha por trecho (início, fim, valor no início, inclinação), para exibição ou exportação."""
+        ends = np.append(self.xs[1:], np.inf)
+        return [{"from": float(a), "to": float(b), "value": float(y), "slope": float(m)} for a, b, y, m in zip(self.xs, ends, self.ys, self.slopes)]
+
+
+def compile_piecewise(fn: Callable[[np.ndarray], np.ndarray], upper: float = UPPER_DEFAULT, lower: float = 0.0,
+                      grid: int = GRID_DEFAULT, rtol: float = RTOL, xtol: float = XTOL) -> PiecewiseLinear:
+    """Compila uma função vetorizada, linear por partes em [lower, upper], numa `PiecewiseLinear`.
+
+    Cada rodada avalia, numa única chamada de `fn`, cinco pontos de todos os intervalos pendentes:
+    intervalos colineares viram trechos; os demais são divididos no cruzamento da reta do primeiro
+    quarto com a do último (o ponto de quebra exato, se houver só um) ou, na falta dele, ao meio.
+    Intervalos menores que `xtol` param como estão (saltos da função).
+    """
+    return compile_piecewise_many(lambda x, k: fn(x), 1, upper, lower, grid, rtol, xtol)[0]
+
+def compile_piecewise_many(fn: Callable[[np.ndarray, np.ndarray], np.ndarray], count: int, upper: float = UPPER_DEFAULT, lower: float = 0.0,
+                           grid: int = GRID_DEFAULT, rtol: float = RTOL, xtol: float = XTOL) -> List[PiecewiseLinear]:
+    """`compile_piecewise` de `count` funções de uma vez: `fn(x, k)` avalia a função `k[i]` no ponto `x[i]`.
+
+    As funções andam juntas nas mesmas rodadas (uma chamada de `fn` por rodada para todas) e cada
+    intervalo é refinado só com os próprios pontos, então cada tabela sai igual à compilada sozinha.
+    """
+    knots = np.unique(np.concatenate([[lower, upper], np.geomspace(max(lower, 1.0), upper, grid), np.linspace(lower, upper, grid)]))
+    knots = knots[(knots >= lower) & (knots <= upper)]
+    a, b = np.tile(knots[:-1], count), np.tile(knots[1:], count); k = np.repeat(np.arange(count), knots.size - 1)
+    pieces = []
+    while a.size:
+        w = b - a
+        pts = a[:, None] + w[:, None] * _PROBES; pts[:, -1] = b
+        f = np.asarray(fn(pts.ravel(), np.repeat(k, _PROBES.size)), dtype=np.float64).reshape(pts.shape)
+        tol = rtol * (1.0 + np.abs(f).max(axis=1))
+        chord = f[:, :1] + (pts - a[:, None]) * ((f[:, 4] - f[:, 0]) / w)[:, None]
+        done = (np.abs(f - chord).max(axis=1) <= tol) | (w <= xtol)
+        pieces.append(np.column_stack([a[done], b[done], f[done, 0], f[done, 4], k[done]]))
+
+        a, b, w, k, pts, f, tol = a[~done], b[~done], w[~done], k[~done], pts[~done], f[~done], tol[~done]
+        sl = (f[:, 1] - f[:, 0]) / (pts[:, 1] - a); sr = (f[:, 4] - f[:, 3]) / (b - pts[:, 3])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross = (f[:, 3] - f[:, 0] + sl * a - sr * pts[:, 3]) / (sl - sr)
+        # O cruzamento só é confiável entre o primeiro e o último quarto (retas das pontas sem quebra) e se, dos
+        # dois lados dele e cada vez mais perto, a função seguir as retas das pontas: um salto entre a reta e o
+        # cruzamento deixaria uma faixa estreita que as cinco amostras dos intervalos seguintes não veriam
+        ok = np.isfinite(cross) & (cross >= pts[:, 1]) & (cross <= pts[:, 3])
+        c = np.where(ok, cross, pts[:, 2]); d = w[:, None] * _NEAR
+        around = np.asarray(fn(np.concatenate([c[:, None] - d, c[:, None] + d], axis=1).ravel(), np.repeat(k, 2 * _NEAR.size)),
+                            dtype=np.float64).reshape(len(c), 2 * len(_NEAR))
+        left = np.abs(around[:, :d.shape[1]] - (f[:, :1] + (c[:, None] - d - a[:, None]) * sl[:, None]))
+        right = np.abs(around[:, d.shape[1]:] - (f[:, 4:] + (c[:, None] + d - b[:, None]) * sr[:, None]))
+        ok &= (np.where(d >= xtol, np.maximum(left, right), 0.0) <= tol[:, None]).all(axis=1)
+        mid = np.where(ok, cross, pts[:, 2])
+        a, b, k = np.concatenate([a, mid]), np.concatenate([mid, b]), np.concatenate([k, k])
+
+    pieces = np.concatenate(pieces)
+    return [_assemble(pieces[pieces[:, 4] == i, :4], upper, rtol, xtol) for i in range(count)]
+
+def _assemble(pieces: np.ndarray, upper: float, rtol: float, xtol: float) -> PiecewiseLinear:
+    pieces = pieces[np.argsort(pieces[:, 0])]
+    # Junta trechos vizinhos da mesma reta: início do segmento, fim dele (= início do trecho) e fim do trecho colineares
+    segments = []; jump = False
+    for x0, x1, y0, y1 in pieces:
+        if x1 - x0 <= xtol: jump = True; continue # Salto: o intervalo mínimo fica com a reta do segmento anterior
+        if segments and not jump:
+            s0, v0 = segments[-1][0], segments[-1][1]
+            if abs(v0 + (x0 - s0) * (y1 - v0) / (x1 - s0) - y0) <= rtol * (1.0 + max(abs(v0), abs(y0), abs(y1))):
+                segments[-1][2:] = [x1, y1]; continue
+        segments.append([x0, y0, x1, y1]); jump = False
+    seg = np.array(segments)
+    return PiecewiseLinear(seg[:, 0], seg[:, 1], (seg[:, 3] - seg[:, 1]) / (seg[:, 2] - seg[:, 0]), upper)
+
+
+# ======================== TABELAS DO MOTOR =========================
+
+def compile_net(country_code: str, other_deductions: float = 0.0, state_code=None, state_rate=None, dependentes=0,
+                tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, upper: float = UPPER_DEFAULT, period: str = None) -> PiecewiseLinear:
+    """Salário mensal -> líquido mensal de `calc_country_net`, com as demais entradas fixas."""
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    return compile_piecewise(lambda s: calculator.evaluate_vec(s, other_deductions, state_rate, dependentes, state_code)["net"], upper)
+
+def compile_net_many(country_code: str, inputs: Sequence[Tuple[int, Any, Optional[float]]], other_deductions: float = 0.0,
+                     tables_ext=None, br_inss_tbl=None, br_irrf_tbl=None, upper: float = UPPER_DEFAULT, period: str = None) -> List[PiecewiseLinear]:
+    """`compile_net` de várias combinações (dependentes, estado, alíquota estadual) do mesmo país, compiladas juntas."""
+    calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl, period).get(country_code)
+    deps = np.array([d for d, _, _ in inputs], dtype=np.int64)
+    codes = sorted({s for _, s, _ in inputs if s}); idx = np.array([codes.index(s) if s else len(codes) for _, s, _ in inputs])
+    # Sem estado numa combinação com outras que têm: alíquota zero e a categoria "sem tabela", como em batch_io.compute_batch
+    rates = None if all(r is None for _, _, r in inputs) else np.array([r or 0.0 for _, _, r in inputs])
+    fn = lambda s, k: calculator.evaluate_vec(s, other_deductions, None if rates is None else rates[k], deps[k], (codes, idx[k]) if codes else None)["net"]
+    return compile_piecewise_many(fn, len(inputs), upper)
+
+def compile_employer_cost(country_code: str, bonus: float = 0.0, bonus_share: float = 0.0, tables_ext=None,
+                          upper: float = UPPER_DEFAULT, period: str = None) -> PiecewiseLinear:
+    """Salário mensal -> custo anual do empregador (`calc_employer_charges`).
+
+    O bônus anual é `bonus + bonus_share * 12 * salário` (ex.: `bonus_share` = % de STI alvo), o que mantém a função linear por partes.
+    """
+    tables_ext = resolve_tables(tables_ext, period)
+    return compile_piecewise(lambda s: employer_cost_vec(country_code, s, bonus + bonus_share * 12.0 * s, tables_ext), upper)
+
+# Os tetos em UF/UMA mudam com o período de pagamento, então o cache é por período (mês corrente por padrão)
+def net_table(country_code: str, other_deductions: float = 0.0, state_code=None, state_rate=None, dependentes=0, period: str = None) -> PiecewiseLinear:
+    """`compile_net` com as tabelas carregadas do app, compilada uma vez por combinação de entradas."""
+    return _net_table(country_code, other_deductions, state_code, state_rate, dependentes, period or current_period())
+
+def employer_cost_table(country_code: str, bonus: float = 0.0, bonus_share: float = 0.0, period: str = None) -> PiecewiseLinear:
+    """`compile_employer_cost` com as tabelas carregadas do app."""
+    return _employer_cost_table(country_code, bonus, bonus_share, period or current_period())
+
+@lru_cache(maxsize=64)
+def _net_table(country_code: str, other_deductions: float, state_code, state_rate, dependentes, period: str) -> PiecewiseLinear:
+    _, tables_ext, br_inss_tbl, br_irrf_tbl = load_tables_data()
+    return compile_net(country_code, other_deductions, state_code, state_rate, dependentes, tables_ext, br_inss_tbl, br_irrf_tbl, period=period)
+
+@lru_cache(maxsize=64)
+def _employer_cost_table(country_code: str, bonus: float, bonus_share: float, period: str) -> PiecewiseLinear:
+    return compile_employer_cost(country_code, bonus, bonus_share, load_tables_data()[1], period=period)
+
+
+def validate(table: PiecewiseLinear, scalar_fn: Callable[[float], float], samples: int = 20000, seed: int = 0) -> Dict[str, float]:
+    """Compara a tabela com a função escalar numa grade aleatória densa (metade uniforme, metade log-uniforme).
+
+    Inclui os próprios pontos de quebra e seus vizinhos imediatos, onde um erro de localização apareceria.
+    """
+    rng = np.random.default_rng(seed); upper = table.upper
+    near = np.concatenate([table.breakpoints + d for d in (-1e-4, 0.0, 1e-4)])
+    x = np.concatenate([rng.uniform(0.0, upper, samples // 2), np.exp(rng.uniform(0.0, np.log(upper), samples - samples // 2)), near[near >= 0]])
+    expected = np.array([scalar_fn(float(v)) for v in x]); got = table(x)
+    err = np.abs(got - expected); rel = err / np.maximum(np.abs(expected), 1.0)
+    worst = int(np.argmax(rel))
+    return {"samples": int(x.size), "max_abs_err": float(err.max()), "max_rel_err": float(rel[worst]), "worst_salary": float(x[worst])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila líquido e custo do empregador em tabelas lineares por partes e valida contra o cálculo escalar.")
+    parser.add_argument("--country", action="append", help="País (repetível); padrão: todos")
+    parser.add_argument("--state", help="Sigla do estado (EUA) ou província (Canadá)")
+    parser.add_argument("--state-rate", type=float, help="Alíquota estadual fixa (EUA, sem tabela)")
+    parser.add_argument("--dependents", type=int, default=0)
+    parser.add_argument("--other", type=float, default=0.0, help="Outras deduções mensais")
+    parser.add_argument("--bonus-share", type=float, default=0.0, help="Bônus anual como fração do salário anual")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--show", action="store_true", help="Lista os trechos de cada tabela")
+    args = parser.parse_args(argv)
+
+    _, tables_ext, br_inss_tbl, br_irrf_tbl = load_tables_data()
+    for country in args.country or list(COUNTRIES):
+        t0 = time.perf_counter()
+        net = compile_net(country, args.other, args.state, args.state_rate, args.dependents, tables_ext, br_inss_tbl, br_irrf_tbl)
+        cost = compile_employer_cost(country, 0.0, args.bonus_share, tables_ext)
+        ms = (time.perf_counter() - t0) * 1000.0
+        net_check = validate(net, lambda s: calc_country_net(country, s, args.other, args.state, args.state_rate, args.dependents, tables_ext, br_inss_tbl, br_irrf_tbl).net, args.samples)
+        cost_check = validate(cost, lambda s: calc_employer_charges(country, s, args.bonus_share * 12.0 * s, tables_ext)[0], args.samples)
+        salary = np.random.default_rng(1).uniform(0.0, 50000.0, 1_000_000); calculator = get_calculator_registry(tables_ext, br_inss_tbl, br_irrf_tbl).get(country)
+        t0 = time.perf_counter(); calculator.evaluate_vec(salary, args.other, args.state_rate, args.dependents, args.state); t1 = time.perf_counter(); net(salary); t2 = time.perf_counter()
+        print(f"{country}: compilado em {ms:.1f} ms | líquido {len(net)} trechos, erro rel. máx. {net_check['max_rel_err']:.2e} "
+              f"| custo {len(cost)} trechos, erro rel. máx. {cost_check['max_rel_err']:.2e} ({net_check['samples']} pontos) "
+              f"| 1M salários: avaliador {(t1 - t0) * 1000:.0f} ms, tabela {(t2 - t1) * 1000:.0f} ms")
+        if args.show:
+            for name, table in (("líquido", net), ("custo", cost)):
+                print(f"  {name}:")
+                for row in table.rows(): print(f"    {row['from']:>16,.2f} – {row['to']:>16,.2f}  valor {row['value']:>18,.2f}  inclinação {row['slope']:.6f}")
+
+
+if __name__ == "__main__":
+    main()
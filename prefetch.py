@@ -0,0 +1,110 @@
+# -------------------------------------------------------------
+# 🔮 Pré-cálculo Especulativo em Segundo Plano (cache por sessão)
+# Quem alterna países na sidebar costuma manter salário e bônus: enquanto a
+# página de um país está aberta, uma thread calcula os mesmos resultados para
+# os outros países e guarda num cache LRU limitado da sessão. Trocar de país
+# vira uma consulta ao cache em vez de cálculo + renderização.
+#   - O trabalho só começa depois que as entradas "assentam" (SETTLE_SECONDS
+#     sem novo agendamento); cada novo agendamento cancela o anterior.
+#   - A thread do script nunca espera: numa falta de cache (ou com o pré-cálculo
+#     ainda em andamento) ela calcula normalmente.
+#   - Poucos jobs rodam ao mesmo tempo entre todas as sessões (MAX_RUNNING).
+# Sem dependência do Streamlit: no app, uma instância fica no st.session_state.
+#
+# Uso:
+#   prefetch = Prefetcher()
+#   calc = prefetch.get(("net", country, salary), lambda: calc_country_net(country, salary))
+#   prefetch.schedule(signature, [(("net", c, salary), lambda c=c: calc_country_net(c, salary)) for c in others])
+# -------------------------------------------------------------
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+
+SETTLE_SECONDS = 0.5 # Espera sem novos agendamentos antes de começar a calcular
+MAX_ENTRIES = 64 # Resultados guardados por sessão (LRU)
+MAX_RUNNING = 2 # Jobs calculando ao mesmo tempo no processo (todas as sessões)
+
+_RUNNING = threading.BoundedSemaphore(MAX_RUNNING)
+_MISSING = object()
+
+Task = Tuple[Hashable, Callable[[], Any]]
+
+
+class _Job:
+    __slots__ = ("signature", "tasks", "cancelled")
+
+    def __init__(self, signature: Hashable, tasks: List[Task]):
+        self.signature = signature; self.tasks = tasks; self.cancelled = threading.Event()
+
+
+class Prefetcher:
+    """Cache LRU limitado + um job em segundo plano cancelável que o preenche."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, settle: float = SETTLE_SECONDS):
+        self.max_entries = max_entries; self.settle = settle
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._job: Optional[_Job] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "prefetched": 0, "cancelled": 0, "errors": 0}
+
+    def get(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Valor de `key` no cache; se faltar, `fn()` na thread atual (o resultado também fica guardado)."""
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING: self._cache.move_to_end(key); self.stats["hits"] += 1; return value
+            self.stats["misses"] += 1
+        value = fn()
+        with self._lock: self._put(key, value)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock: return self._cache.get(key, default)
+
+    def schedule(self, signature: Hashable, tasks: Sequence[Task]) -> bool:
+        """Agenda o pré-cálculo de `tasks` (em ordem), cancelando o job anterior.
+
+        A mesma `signature` do job atual não reagenda nada; chaves já em cache são ignoradas.
+        Devolve True se uma thread foi iniciada.
+        """
+        with self._lock:
+            if self._job is not None and self._job.signature == signature: return False
+            self._cancel()
+            job = self._job = _Job(signature, [(k, fn) for k, fn in tasks if k not in self._cache])
+        if not job.tasks: return False
+        threading.Thread(target=self._run, args=(job,), name="prefetch", daemon=True).start()
+        return True
+
+    def cancel(self):
+        with self._lock: self._cancel(); self._job = None
+
+    def clear(self):
+        with self._lock: self._cancel(); self._job = None; self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _cancel(self):
+        if self._job is not None and not self._job.cancelled.is_set(): self._job.cancelled.set()
+
+    def _put(self, key: Hashable, value: Any):
+        self._cache[key] = value; self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries: self._cache.popitem(last=False)
+
+    def _run(self, job: _Job):
+        # Cancelado durante a espera: as entradas mudaram antes de assentar
+        if job.cancelled.wait(self.settle): return
+        while not _RUNNING.acquire(timeout=0.1):
+            if job.cancelled.is_set(): return
+        try:
+            for key, fn in job.tasks:
+                if job.cancelled.is_set(): self.stats["cancelled"] += 1; return
+                if self.peek(key, _MISSING) is not _MISSING: continue
+                try: value = fn()
+                except Exception:
+                    # Especulação: o erro real aparece quando o usuário abrir este país
+                    self.stats["errors"] += 1; continue
+                # A chave inclui todas as entradas: mesmo vindo de um job já cancelado o valor continua válido
+                with self._lock: self._put(key, value); self.stats["prefetched"] += 1
+        finally:
+            _RUNNING.release()
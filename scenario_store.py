@@ -0,0 +1,344 @@
+# -------------------------------------------------------------
+# 💾 Armazenamento de Cenários (SQLite local)
+# Guarda simulações individuais e execuções em lote: entradas, impressão digital
+# das tabelas de regras usadas e resultados por empregado. Os resultados ficam em
+# blocos colunares (Arrow IPC comprimido), um por país/nível STI de cada lote,
+# inseridos em massa numa única transação. Carregar um cenário lê poucos blobs
+# (sem montar uma tupla Python por linha) e a comparação de dois cenários é uma
+# junção colunar em memória, sem refazer nenhum cálculo.
+#
+# Uso:
+#   python scenario_store.py list --country Brasil
+#   python scenario_store.py save-batch "Reajuste 2025" saida.parquet
+#   python scenario_store.py diff 3 7 --top 20
+#   python scenario_store.py bench --rows 50000
+# -------------------------------------------------------------
+
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from payroll_engine import (CONFIG_DIR, COUNTRY_TABLES_DICT, BR_INSS_TBL, BR_IRRF_TBL, COUNTRY_CALCULATORS, TAX_BRACKETS_DATA,
+                            US_STATE_RATES, STI_CONFIG_DATA, calc_params, resolve_tables)
+from indexed_units import current_period
+
+SCENARIO_DB = os.environ.get("SCENARIO_DB", os.path.join(CONFIG_DIR, "scenarios.db"))
+IPC_OPTIONS = ipc.IpcWriteOptions(compression="zstd" if pa.Codec.is_available("zstd") else None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,                 -- 'single' | 'batch'
+    created_at TEXT NOT NULL,           -- ISO 8601 (UTC)
+    country TEXT,                       -- NULL em lotes com vários países
+    sti_area TEXT,
+    sti_level TEXT,
+    rules_fingerprint TEXT NOT NULL,
+    inputs TEXT NOT NULL,               -- JSON
+    result TEXT,                        -- JSON (demonstrativo da simulação individual)
+    n_rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_scenarios_country ON scenarios(country, created_at);
+CREATE INDEX IF NOT EXISTS ix_scenarios_created ON scenarios(created_at);
+CREATE INDEX IF NOT EXISTS ix_scenarios_name ON scenarios(name, created_at);
+CREATE INDEX IF NOT EXISTS ix_scenarios_sti ON scenarios(sti_level, created_at);
+
+-- Resultados por empregado em blocos colunares: um blob Arrow IPC por (lote, país, nível STI)
+CREATE TABLE IF NOT EXISTS scenario_chunks (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    chunk INTEGER NOT NULL,
+    country TEXT,
+    sti_level TEXT,
+    n_rows INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (scenario_id, chunk)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_chunks_country ON scenario_chunks(country, scenario_id);
+CREATE INDEX IF NOT EXISTS ix_chunks_sti ON scenario_chunks(sti_level, scenario_id);
+"""
+
+ROW_SCHEMA = pa.schema([("employee_key", pa.string()), ("country", pa.string()), ("state", pa.string()), ("sti_level", pa.string()),
+                        ("salary", pa.float64()), ("bonus", pa.float64()), ("dependents", pa.int64()), ("other_deductions", pa.float64()),
+                        ("total_ded", pa.float64()), ("net", pa.float64()), ("fgts", pa.float64()), ("employer_cost", pa.float64())])
+DIFF_FIELDS = ("net", "total_ded", "fgts", "employer_cost")
+
+
+def rules_fingerprint(*tables: Any) -> str:
+    """Impressão digital (SHA-256 curto) das tabelas de regras; sem argumentos, das tabelas carregadas pelo motor."""
+    if not tables: return _default_fingerprint(current_period())
+    payload = json.dumps(tables, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+@lru_cache(maxsize=4)
+def _default_fingerprint(period: str) -> str:
+    # As tabelas do motor são carregadas uma vez por processo; os tetos em UF/UMA mudam com o período de pagamento
+    return rules_fingerprint(COUNTRY_TABLES_DICT, BR_INSS_TBL, BR_IRRF_TBL, COUNTRY_CALCULATORS, TAX_BRACKETS_DATA, US_STATE_RATES, STI_CONFIG_DATA,
+                             calc_params(period), resolve_tables(COUNTRY_TABLES_DICT, period)["EMPLOYER_COST"])
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ScenarioStore:
+    """Cenários salvos num arquivo SQLite (um por máquina/usuário; `:memory:` para testes)."""
+
+    def __init__(self, path: str = SCENARIO_DB):
+        self.path = path
+        # check_same_thread=False: a conexão é compartilhada pelas threads das sessões do Streamlit (get_store);
+        # toda transação e leitura passa pelo _lock, para que o commit de uma sessão não inclua a escrita pela metade de outra
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:": self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock: self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock, self.conn: yield
+
+    # ---------------------------- gravação ----------------------------
+
+    def _insert_scenario(self, name: str, kind: str, inputs: Dict[str, Any], country: Optional[str] = None, sti_area: Optional[str] = None,
+                         sti_level: Optional[str] = None, result: Optional[Dict[str, Any]] = None, fingerprint: Optional[str] = None) -> int:
+        cur = self.conn.execute(
+            "INSERT INTO scenarios (name, kind, created_at, country, sti_area, sti_level, rules_fingerprint, inputs, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, kind, _now(), country, sti_area, sti_level, fingerprint or rules_fingerprint(),
+             json.dumps(inputs, ensure_ascii=False, default=str), None if result is None else json.dumps(result, ensure_ascii=False)))
+        return cur.lastrowid
+
+    def save_single(self, name: str, country: str, inputs: Dict[str, Any], result, employer_cost: Optional[float] = None,
+                    sti_area: Optional[str] = None, sti_level: Optional[str] = None) -> int:
+        """Salva uma simulação do app: entradas, demonstrativo (`PayrollResult`) e uma linha comparável com lotes."""
+        scale = 100 if getattr(result, "cents", False) else 1
+        payload = {"codes": list(result.codes), "amounts": [v / scale for v in result.amounts],
+                   "total_ded": result.total_ded / scale, "net": result.net / scale, "fgts": result.fgts / scale}
+        row = pa.Table.from_pylist([{"employee_key": "1", "country": country, "state": inputs.get("state_code"), "sti_level": sti_level,
+                                     "salary": result.total_earn / scale, "bonus": float(inputs.get("bonus", 0.0)), "dependents": int(inputs.get("dependents", 0) or 0),
+                                     "other_deductions": float(inputs.get("other_deductions", 0.0)), "total_ded": payload["total_ded"], "net": payload["net"],
+                                     "fgts": payload["fgts"], "employer_cost": employer_cost}], schema=ROW_SCHEMA)
+        with self._transaction():
+            sid = self._insert_scenario(name, "single", inputs, country, sti_area, sti_level, payload)
+            self._insert_chunks(sid, row, 0)
+            self.conn.execute("UPDATE scenarios SET n_rows = 1 WHERE id = ?", (sid,))
+        return sid
+
+    def _insert_chunks(self, scenario_id: int, table: pa.Table, first_chunk: int) -> int:
+        """Grava a tabela normalizada em blocos por (país, nível STI) com um único executemany; devolve o próximo nº de bloco."""
+        groups = table.group_by(["country", "sti_level"]).aggregate([]).to_pylist()
+        records = []
+        for i, g in enumerate(groups):
+            mask = _equals(table["country"], g["country"]) if len(groups) > 1 else None
+            if mask is not None: mask = pc.and_(mask, _equals(table["sti_level"], g["sti_level"]))
+            part = table.filter(mask) if mask is not None else table
+            records.append((scenario_id, first_chunk + i, g["country"], g["sti_level"], part.num_rows, _serialize(part)))
+        self.conn.executemany("INSERT INTO scenario_chunks VALUES (?, ?, ?, ?, ?, ?)", records)
+        return first_chunk + len(groups)
+
+    def save_batch(self, name: str, batches: Union[pa.Table, pa.RecordBatch, Iterable[pa.RecordBatch]], inputs: Optional[Dict[str, Any]] = None,
+                   sti_level: Optional[str] = None) -> int:
+        """Salva o resultado de um lote (saída de `batch_io.compute_batch`) com inserção em massa numa só transação.
+
+        Colunas reconhecidas: employee_id, country, state, sti_level, salary, bonus, dependents,
+        other_deductions, total_ded, net, fgts (ou as versões `*_cents` do modo exato) e employer_cost.
+        """
+        if isinstance(batches, pa.Table): batches = batches.to_batches()
+        elif isinstance(batches, pa.RecordBatch): batches = [batches]
+        rows = 0; countries = set(); chunk = 0
+        with self._transaction():
+            sid = self._insert_scenario(name, "batch", inputs or {}, sti_level=sti_level)
+            for batch in batches:
+                table = _normalize(batch, rows)
+                countries.update(c for c in pc.unique(table["country"]).to_pylist() if c is not None)
+                chunk = self._insert_chunks(sid, table, chunk)
+                rows += batch.num_rows
+            country = next(iter(countries)) if len(countries) == 1 else None
+            self.conn.execute("UPDATE scenarios SET n_rows = ?, country = ? WHERE id = ?", (rows, country, sid))
+        return sid
+
+    def delete(self, scenario_id: int):
+        with self._transaction(): self.conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+
+    # ---------------------------- leitura ----------------------------
+
+    def list(self, country: Optional[str] = None, name: Optional[str] = None, sti_level: Optional[str] = None, kind: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Cenários mais recentes primeiro, filtrados pelos campos indexados (datas em ISO 8601)."""
+        where, args = [], []
+        for column, value in (("country", country), ("name", name), ("sti_level", sti_level), ("kind", kind)):
+            if value is not None: where.append(f"{column} = ?"); args.append(value)
+        if since: where.append("created_at >= ?"); args.append(since)
+        if until: where.append("created_at < ?"); args.append(until)
+        sql = "SELECT id, name, kind, created_at, country, sti_area, sti_level, rules_fingerprint, n_rows FROM scenarios"
+        if where: sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            cur = self.conn.execute(sql + " ORDER BY created_at DESC, id DESC LIMIT ?", (*args, limit))
+            names = [d[0] for d in cur.description]; rows = cur.fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def get(self, scenario_id: int) -> Optional[Dict[str, Any]]:
+        """Metadados, entradas e (simulação individual) o demonstrativo salvo."""
+        with self._lock:
+            cur = self.conn.execute("SELECT * FROM scenarios WHERE id = ?", (scenario_id,))
+            row = cur.fetchone(); names = [d[0] for d in cur.description]
+        if row is None: return None
+        out = dict(zip(names, row))
+        out["inputs"] = json.loads(out["inputs"]); out["result"] = json.loads(out["result"]) if out["result"] else None
+        out["stale"] = out["rules_fingerprint"] != rules_fingerprint() # Tabelas de regras mudaram desde que foi salvo
+        return out
+
+    def load_rows(self, scenario_id: int, country: Optional[str] = None, sti_level: Optional[str] = None) -> pa.Table:
+        """Resultados por empregado de um cenário como tabela Arrow; filtros por país/nível STI só leem os blocos deles."""
+        sql = "SELECT data FROM scenario_chunks WHERE scenario_id = ?"; args: Tuple = (scenario_id,)
+        if country is not None: sql += " AND country = ?"; args += (country,)
+        if sti_level is not None: sql += " AND sti_level = ?"; args += (sti_level,)
+        with self._lock: blobs = self.conn.execute(sql + " ORDER BY chunk", args).fetchall()
+        tables = [ipc.open_stream(blob).read_all() for (blob,) in blobs]
+        return pa.concat_tables(tables) if tables else ROW_SCHEMA.empty_table()
+
+    def diff(self, a: int, b: int, fields: Tuple[str, ...] = DIFF_FIELDS, country: Optional[str] = None) -> pa.Table:
+        """Compara dois cenários por empregado: valores em A e B, diferença e status (changed/same/added/removed).
+
+        Junção colunar (hash join do Arrow) pela chave do empregado, sem recalcular nada.
+        """
+        keep = ["employee_key", "country", *fields]
+        left = self.load_rows(a, country).select(keep); right = self.load_rows(b, country).select(keep)
+        joined = left.join(right, keys="employee_key", join_type="full outer", left_suffix="_a", right_suffix="_b", coalesce_keys=True)
+        in_a = pc.is_valid(joined["country_a"]); in_b = pc.is_valid(joined["country_b"])
+        changed = np.zeros(joined.num_rows, dtype=bool)
+        out = {"employee_key": joined["employee_key"], "country": pc.coalesce(joined["country_b"], joined["country_a"])}
+        for f in fields:
+            va = _nan(joined[f"{f}_a"]); vb = _nan(joined[f"{f}_b"])
+            changed |= ~((va == vb) | (np.isnan(va) & np.isnan(vb)))
+            out[f"{f}_a"] = joined[f"{f}_a"]; out[f"{f}_b"] = joined[f"{f}_b"]; out[f"{f}_delta"] = pa.array(vb - va)
+        in_a = in_a.to_numpy(zero_copy_only=False); in_b = in_b.to_numpy(zero_copy_only=False)
+        status = np.where(~in_b, "removed", np.where(~in_a, "added", np.where(changed, "changed", "same")))
+        out["status"] = pa.array(status, type=pa.string())
+        return pa.table(out).sort_by("employee_key")
+
+    def diff_summary(self, a: int, b: int, by: str = "country") -> List[Dict[str, Any]]:
+        """Totais por país (ou `sti_level`) dos dois cenários e a diferença de líquido e custo do empregador."""
+        if by not in ("country", "sti_level"): raise ValueError("Agrupamento deve ser 'country' ou 'sti_level'")
+        aggs = [("employee_key", "count"), ("net", "sum"), ("employer_cost", "sum")]
+        ta = {r[by]: r for r in self.load_rows(a).group_by(by).aggregate(aggs).to_pylist()}
+        tb = {r[by]: r for r in self.load_rows(b).group_by(by).aggregate(aggs).to_pylist()}
+        out = []
+        for key in sorted(set(ta) | set(tb), key=lambda k: (k is None, k or "")):
+            ra = ta.get(key, {}); rb = tb.get(key, {})
+            out.append({by: key, "rows_a": ra.get("employee_key_count", 0), "rows_b": rb.get("employee_key_count", 0),
+                        "net_delta": (rb.get("net_sum") or 0.0) - (ra.get("net_sum") or 0.0),
+                        "employer_cost_delta": (rb.get("employer_cost_sum") or 0.0) - (ra.get("employer_cost_sum") or 0.0)})
+        return out
+
+
+def _nan(column: pa.ChunkedArray) -> np.ndarray:
+    """Coluna numérica como float64, nulos como NaN."""
+    return pc.fill_null(pc.cast(column, pa.float64()), np.nan).to_numpy(zero_copy_only=False)
+
+def _equals(column: pa.ChunkedArray, value: Optional[str]) -> pa.ChunkedArray:
+    return pc.is_null(column) if value is None else pc.fill_null(pc.equal(column, value), False)
+
+def _normalize(batch: pa.RecordBatch, offset: int) -> pa.Table:
+    """Projeta o lote em ROW_SCHEMA (colunas ausentes viram nulas; `*_cents` do modo exato voltam para a moeda)."""
+    schema = batch.schema; n = batch.num_rows
+    cols = {}
+    for field in ROW_SCHEMA:
+        name = field.name
+        idx = schema.get_field_index("employee_id" if name == "employee_key" else name)
+        if idx >= 0: col = pc.cast(batch.column(idx), field.type)
+        elif schema.get_field_index(name + "_cents") >= 0: col = pc.divide(pc.cast(batch.column(name + "_cents"), pa.float64()), 100.0)
+        elif name == "employee_key": col = pa.array(np.arange(offset, offset + n).astype(str), type=pa.string()) # Sem id: posição no lote
+        else: col = pa.nulls(n, field.type)
+        cols[name] = col
+    return pa.table(cols, schema=ROW_SCHEMA)
+
+def _serialize(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema, options=IPC_OPTIONS) as writer: writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@lru_cache(maxsize=None)
+def get_store(path: str = SCENARIO_DB) -> ScenarioStore:
+    """Conexão compartilhada por processo (o app reaproveita a mesma entre reruns e sessões; acesso serializado pelo _lock)."""
+    return ScenarioStore(path)
+
+
+# ======================== BENCHMARK E CLI =========================
+
+def benchmark(n_rows: int = 50_000) -> Dict[str, float]:
+    """Salva dois lotes sintéticos, carrega um e compara os dois; tempos em segundos."""
+    from batch_io import synthetic_table, compute_batch
+    from payroll_engine import load_tables_data
+    _, tables_ext, inss, irrf = load_tables_data()
+    base = synthetic_table(n_rows)
+    raised = base.set_column(base.schema.get_field_index("salary"), "salary", pa.array(base["salary"].to_numpy() * 1.05))
+    a_batches = [compute_batch(b, tables_ext, inss, irrf) for b in base.to_batches()]
+    b_batches = [compute_batch(b, tables_ext, inss, irrf) for b in raised.to_batches()]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ScenarioStore(os.path.join(tmp, "bench.db"))
+        t0 = time.perf_counter(); a = store.save_batch("base", a_batches); t1 = time.perf_counter()
+        b = store.save_batch("reajuste 5%", b_batches); t2 = time.perf_counter()
+        loaded = store.load_rows(a); t3 = time.perf_counter()
+        diff = store.diff(a, b); t4 = time.perf_counter()
+        store.diff_summary(a, b); t5 = time.perf_counter()
+        store.close()
+    assert loaded.num_rows == n_rows and diff.num_rows == n_rows
+    return {"rows": n_rows, "save_s": t1 - t0, "rows_per_s": n_rows / (t1 - t0), "load_s": t3 - t2, "diff_s": t4 - t3, "summary_s": t5 - t4, "save2_s": t2 - t1}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cenários salvos (SQLite): listar, salvar lotes e comparar.")
+    parser.add_argument("--db", default=SCENARIO_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    ls = sub.add_parser("list"); ls.add_argument("--country"); ls.add_argument("--name"); ls.add_argument("--sti-level"); ls.add_argument("--limit", type=int, default=50)
+    sb = sub.add_parser("save-batch", help="Salva a saída de batch_io.py run"); sb.add_argument("name"); sb.add_argument("path")
+    df = sub.add_parser("diff"); df.add_argument("a", type=int); df.add_argument("b", type=int); df.add_argument("--top", type=int, default=10)
+    bench = sub.add_parser("bench"); bench.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench":
+        r = benchmark(args.rows)
+        print(f"{r['rows']:,} linhas: salvar {r['save_s']:.2f}s ({r['rows_per_s']:,.0f} linhas/s), carregar {r['load_s'] * 1000:.0f} ms, "
+              f"comparar {r['diff_s'] * 1000:.0f} ms, resumo {r['summary_s'] * 1000:.0f} ms")
+        return
+    store = ScenarioStore(args.db)
+    if args.cmd == "list":
+        for s in store.list(country=args.country, name=args.name, sti_level=args.sti_level, limit=args.limit):
+            print(f"{s['id']:>5}  {s['created_at']}  {s['kind']:<6}  {s['country'] or '—':<15}  {s['n_rows']:>8,}  {s['rules_fingerprint']}  {s['name']}")
+    elif args.cmd == "save-batch":
+        from batch_io import read_batches
+        sid = store.save_batch(args.name, read_batches(args.path), inputs={"source": os.path.abspath(args.path)})
+        print(f"Cenário {sid} salvo ({store.get(sid)['n_rows']:,} linhas)")
+    else:
+        diff = store.diff(args.a, args.b)
+        status = diff["status"].to_pylist()
+        print({s: status.count(s) for s in ("changed", "same", "added", "removed")})
+        for row in store.diff_summary(args.a, args.b):
+            print(f"  {row['country'] or '—':<15} {row['rows_a']:>8,} -> {row['rows_b']:>8,}  líquido {row['net_delta']:+,.2f}  custo {row['employer_cost_delta']:+,.2f}")
+        delta = np.nan_to_num(np.abs(_nan(diff["net_delta"])))
+        for i in np.argsort(-delta)[:args.top].tolist():
+            print(f"  {diff['employee_key'][i].as_py():<12} {diff['country'][i].as_py() or '—':<15} líquido {diff['net_a'][i].as_py()} -> {diff['net_b'][i].as_py()}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
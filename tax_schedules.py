@@ -0,0 +1,130 @@
+# -------------------------------------------------------------
+# 🏛️ Tabelas Progressivas por Jurisdição (federal, estadual, provincial)
+# As tabelas de tax_brackets.json são indexadas por código de jurisdição
+# ("US", "US-CA", "CA", "CA-ON", ...) e empilhadas numa matriz única
+# (jurisdições x faixas), com o imposto acumulado de cada faixa pré-calculado.
+# Um lote com estados/províncias misturados é avaliado de uma vez: cada linha
+# só aponta para a sua jurisdição, sem consultar dicionários linha a linha.
+# Há uma cópia da matriz em centavos inteiros para o cálculo exato (fixed_point).
+# -------------------------------------------------------------
+
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fixed_point import to_cents, rate_units
+
+
+class ScheduleSet:
+    """Conjunto de tabelas progressivas anuais compiladas por código de jurisdição.
+
+    Cada tabela tem faixas [limite inferior, alíquota marginal], uma dedução opcional
+    abatida da renda (`deduction`) e um crédito opcional (`credit_amount`) concedido à
+    alíquota da primeira faixa (ex.: Basic Personal Amount no Canadá).
+    A última linha da matriz é uma jurisdição "sem tabela", que sempre resulta em zero.
+    """
+
+    def __init__(self, schedules: Dict[str, Dict[str, Any]]):
+        self.codes = tuple(sorted(schedules))
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.missing = len(self.codes)
+        width = max([len(s.get("brackets", [])) for s in schedules.values()] + [1])
+
+        n = self.missing + 1
+        self._thresholds = np.full((n, width), np.inf); self._thresholds[:, 0] = 0.0
+        self._rates = np.zeros((n, width)); self._cum = np.zeros((n, width))
+        self._deduction = np.zeros(n); self._credit = np.zeros(n)
+        self._scalar = {}; self._scalar_units = {}
+        # Cópia inteira: limites/dedução em centavos, alíquotas em milionésimos, acumulado e crédito em centavos x RATE_SCALE
+        big = np.iinfo(np.int64).max
+        self._thr_c = np.full((n, width), big, dtype=np.int64); self._thr_c[:, 0] = 0
+        self._rates_u = np.zeros((n, width), dtype=np.int64); self._cum_u = np.zeros((n, width), dtype=np.int64)
+        self._ded_c = np.zeros(n, dtype=np.int64); self._credit_u = np.zeros(n, dtype=np.int64)
+        for i, code in enumerate(self.codes):
+            spec = schedules[code]
+            brackets = sorted((float(lo), float(rate)) for lo, rate in spec.get("brackets", [])) or [(0.0, 0.0)]
+            cum = [0.0]
+            for (lo, rate), (nxt, _) in zip(brackets, brackets[1:]): cum.append(cum[-1] + (nxt - lo) * rate)
+            deduction = float(spec.get("deduction", 0.0))
+            credit = float(spec.get("credit_amount", 0.0)) * float(spec.get("credit_rate", brackets[0][1]))
+            k = len(brackets)
+            self._thresholds[i, :k] = [b[0] for b in brackets]; self._rates[i, :k] = [b[1] for b in brackets]; self._cum[i, :k] = cum
+            self._deduction[i] = deduction; self._credit[i] = credit
+            # Faixas em ordem decrescente para a busca escalar parar na primeira que couber
+            self._scalar[code] = (tuple(zip(self._thresholds[i, :k].tolist(), self._rates[i, :k].tolist(), cum))[::-1], deduction, credit)
+
+            thr_c = [to_cents(b[0]) for b in brackets]; rates_u = [rate_units(b[1]) for b in brackets]; cum_u = [0]
+            for lo, nxt, rate in zip(thr_c, thr_c[1:], rates_u): cum_u.append(cum_u[-1] + (nxt - lo) * rate)
+            credit_u = to_cents(float(spec.get("credit_amount", 0.0))) * rate_units(float(spec.get("credit_rate", brackets[0][1])))
+            self._thr_c[i, :k] = thr_c; self._rates_u[i, :k] = rates_u; self._cum_u[i, :k] = cum_u
+            self._ded_c[i] = to_cents(deduction); self._credit_u[i] = credit_u
+            self._scalar_units[code] = (tuple(zip(thr_c, rates_u, cum_u))[::-1], to_cents(deduction), credit_u)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+    def tax(self, code: str, income: float) -> float:
+        """Imposto anual de uma renda anual na jurisdição `code` (zero se não houver tabela)."""
+        sched = self._scalar.get(code)
+        if sched is None: return 0.0
+        brackets, deduction, credit = sched
+        taxable = max(income - deduction, 0.0)
+        for lo, rate, cum in brackets:
+            if taxable >= lo: return max(cum + (taxable - lo) * rate - credit, 0.0)
+        return 0.0
+
+    def tax_units(self, code: str, income_c: int) -> int:
+        """Imposto anual exato em centavos x RATE_SCALE para uma renda anual em centavos (sem arredondar)."""
+        sched = self._scalar_units.get(code)
+        if sched is None: return 0
+        brackets, deduction, credit = sched
+        taxable = max(income_c - deduction, 0)
+        for lo, rate, cum in brackets:
+            if taxable >= lo: return max(cum + (taxable - lo) * rate - credit, 0)
+        return 0
+
+    def tax_units_vec(self, rows: np.ndarray, income_c: np.ndarray) -> np.ndarray:
+        """Versão int64 de `tax_units` para jurisdições misturadas."""
+        rows = np.broadcast_to(np.asarray(rows, dtype=np.intp), np.shape(income_c))
+        taxable = np.maximum(income_c - self._ded_c[rows], 0)
+        k = (self._thr_c[rows] <= taxable[..., None]).sum(axis=-1) - 1
+        tax = self._cum_u[rows, k] + (taxable - self._thr_c[rows, k]) * self._rates_u[rows, k]
+        return np.maximum(tax - self._credit_u[rows], 0)
+
+    def bracket(self, code: str, income: float) -> Tuple[int, float]:
+        """Faixa atingida (índice a partir de 0) e alíquota marginal de uma renda anual; (-1, 0.0) sem tabela."""
+        sched = self._scalar.get(code)
+        if sched is None: return -1, 0.0
+        brackets, deduction, _ = sched
+        taxable = max(income - deduction, 0.0)
+        for k, (lo, rate, _) in enumerate(brackets):
+            if taxable >= lo: return len(brackets) - 1 - k, rate
+        return 0, brackets[-1][1]
+
+    def rows(self, codes: Iterable[Optional[str]]) -> np.ndarray:
+        """Linha da matriz para cada código (a linha "sem tabela" quando o código não existe)."""
+        return np.array([self.index.get(c, self.missing) for c in codes], dtype=np.intp)
+
+    def tax_vec(self, rows: np.ndarray, income: np.ndarray) -> np.ndarray:
+        """Imposto anual para rendas de jurisdições misturadas, num único passe sobre a matriz empilhada."""
+        rows = np.broadcast_to(np.asarray(rows, dtype=np.intp), np.shape(income))
+        taxable = np.maximum(income - self._deduction[rows], 0.0)
+        k = (self._thresholds[rows] <= taxable[..., None]).sum(axis=-1) - 1
+        tax = self._cum[rows, k] + (taxable - self._thresholds[rows, k]) * self._rates[rows, k]
+        return np.maximum(tax - self._credit[rows], 0.0)
+
+
+def as_categories(codes) -> Optional[Tuple[Sequence[Optional[str]], np.ndarray]]:
+    """Normaliza códigos por empregado para (categorias distintas, índice por linha).
+
+    Aceita um par já codificado (ex.: `pc.dictionary_encode` do lote), um código único ou um
+    array de códigos. Índices negativos ou fora das categorias significam "sem código".
+    """
+    if codes is None: return None
+    if isinstance(codes, tuple) and len(codes) == 2: return list(codes[0]), np.asarray(codes[1], dtype=np.intp)
+    if isinstance(codes, str): return [codes], np.zeros((), dtype=np.intp)
+    values = np.asarray(codes, dtype=object)
+    present = values != None  # noqa: E711 (comparação elemento a elemento)
+    cats, inverse = np.unique(values[present].astype(str), return_inverse=True)
+    idx = np.full(values.shape, -1, dtype=np.intp); idx[present] = inverse
+    return cats.tolist(), idx
@@ -0,0 +1,71 @@
+# Servidor HRIS simulado para os testes de hris_ingest: mesma API paginada, com latência e falhas opcionais
+from typing import Any, Dict, Iterable, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import random
+import threading
+import time
+
+from payroll_engine import COUNTRIES, US_STATE_RATES, CA_PROVINCES
+from hris_ingest import DATA_KEY, TOTAL_PAGES_KEY
+
+
+class MockHRISServer:
+    """Servidor HTTP local que imita a API do HRIS, com latência e falhas 503 opcionais.
+
+    `fail_rate` sorteia falhas em qualquer página; `fail_pages` falham sempre. `retry_after` vai no
+    cabeçalho Retry-After das respostas 503. `served` guarda as páginas entregues com sucesso, em ordem.
+
+    Uso: `with MockHRISServer(n_employees=5000, fail_rate=0.1) as url: run_ingestion(url)`.
+    """
+
+    def __init__(self, n_employees: int = 10000, latency: float = 0.0, fail_rate: float = 0.0, seed: int = 42,
+                 fail_pages: Iterable[int] = (), retry_after: Optional[str] = None):
+        rng = random.Random(seed)
+        countries = list(COUNTRIES.keys()); states = [k for k in US_STATE_RATES.keys() if len(k) == 2]
+        self.employees = []
+        for i in range(n_employees):
+            country = rng.choice(countries)
+            self.employees.append({"id": i, "country": country, "salary": round(rng.uniform(1500, 40000), 2), "bonus": round(rng.uniform(0, 80000), 2),
+                                   "dependents": rng.randint(0, 3), "other_deductions": rng.choice([0, 150, 420.5]),
+                                   "state": rng.choice(states) if country == "Estados Unidos" else rng.choice(CA_PROVINCES) if country == "Canadá" else None})
+        self.latency = latency; self.fail_rate = fail_rate; self.fail_pages = set(fail_pages); self.retry_after = retry_after
+        self.requests = 0; self.served: List[int] = []
+        self._rng = random.Random(seed + 1); self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler(self):
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive, para o pool de conexões ser reaproveitado
+            disable_nagle_algorithm = True # Cabeçalho e corpo saem em escritas separadas: sem isso cada resposta espera o ACK atrasado
+            def log_message(self, *args): pass
+            def _send(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status); self.send_header("Content-Type", "application/json")
+                if status == 503 and server.retry_after is not None: self.send_header("Retry-After", server.retry_after)
+                self.send_header("Content-Length", str(len(payload))); self.end_headers(); self.wfile.write(payload)
+            def do_GET(self):
+                url = urlparse(self.path); qs = parse_qs(url.query)
+                page = int(qs.get("page", ["1"])[0]); size = int(qs.get("page_size", ["500"])[0])
+                with server._lock:
+                    server.requests += 1; fail = server._rng.random() < server.fail_rate or page in server.fail_pages
+                    if not fail: server.served.append(page)
+                if server.latency: time.sleep(server.latency)
+                if url.path != "/employees": return self._send(404, {"error": "not found"})
+                if fail: return self._send(503, {"error": "unavailable"})
+                total_pages = max(1, -(-len(server.employees) // size))
+                data = server.employees[(page - 1) * size: page * size]
+                self._send(200, {DATA_KEY: data, "page": page, TOTAL_PAGES_KEY: total_pages})
+        return Handler
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        return self.url
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown(); self.httpd.server_close()
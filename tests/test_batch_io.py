@@ -0,0 +1,15 @@
+import pyarrow as pa
+
+from batch_io import compute_batch, skipped_rows
+from payroll_engine import load_tables_data
+
+
+def test_unsupported_countries_get_null_results():
+    _, tables_ext, br_inss, br_irrf = load_tables_data()
+    batch = pa.RecordBatch.from_pydict({"country": ["Brasil", "Narnia", None], "salary": [5000.0, 5000.0, 5000.0]})
+    for exact in (False, True):
+        result = compute_batch(batch, tables_ext, br_inss, br_irrf, exact)
+        assert skipped_rows(result) == 2
+        for name in result.schema.names[2:]:
+            assert result.column(name).is_valid().to_pylist() == [True, False, False]
+    assert compute_batch(batch, tables_ext, br_inss, br_irrf).column("net")[0].as_py() > 0
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+import pytest
+import requests
+
+import hris_ingest
+from batch_io import compute_batch
+from hris_ingest import HRISClient, ingest, retry_after_seconds, run_ingestion
+from mock_hris import MockHRISServer
+
+
+def test_records_match_employees_across_pages(tmp_path):
+    out = str(tmp_path / "resultado.parquet")
+    with MockHRISServer(n_employees=1234) as url:
+        stats = run_ingestion(url, out, page_size=100, max_concurrency=3)
+    assert stats["pages"] == 13 and stats["records"] == 1234 and stats["retries"] == 0
+    table = pq.read_table(out)
+    assert sorted(int(i) for i in table["employee_id"].to_pylist()) == list(range(1234))
+    assert table["net"].null_count == 0
+
+def test_transient_failures_are_retried():
+    server = MockHRISServer(n_employees=2000, fail_rate=0.3)
+    with server as url:
+        stats = run_ingestion(url, page_size=100, backoff=0.001, max_retries=20)
+    assert stats["records"] == 2000
+    assert stats["retries"] > 0 and stats["retries"] == server.requests - stats["pages"]
+
+def test_retry_after_is_capped():
+    with MockHRISServer(n_employees=1000, fail_rate=0.3, retry_after="86400") as url:
+        t0 = time.perf_counter()
+        stats = run_ingestion(url, page_size=100, max_retries=20, max_retry_delay=0.01)
+    assert stats["records"] == 1000 and stats["retries"] > 0
+    assert time.perf_counter() - t0 < 10.0
+
+def test_retry_after_http_date():
+    now = datetime(2015, 10, 21, 7, 20, tzinfo=timezone.utc)
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT", now) == 480.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:00:00 GMT", now) == 0.0
+    assert retry_after_seconds("120") == 120.0
+    assert retry_after_seconds("amanhã") is None and retry_after_seconds(None) is None
+
+def test_exhausted_retries_raise_and_cancel_siblings():
+    server = MockHRISServer(n_employees=2000, latency=0.005, fail_pages={3})
+    async def scenario():
+        client = HRISClient(server.url, page_size=10, max_concurrency=4, max_retries=2, backoff=0.001)
+        try:
+            with pytest.raises(requests.HTTPError): await ingest(client, lambda batch: None)
+            return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        finally:
+            client.close()
+    with server:
+        pending = asyncio.run(scenario())
+        time.sleep(0.2); requests_after = server.requests; time.sleep(0.3)
+        assert server.requests == requests_after # Nenhum worker continua buscando páginas
+    assert pending == []
+    assert len(server.served) < 200 // 2
+
+def _max_lead(monkeypatch, queue_size: int) -> int:
+    """Maior distância entre páginas entregues pelo servidor e páginas já consumidas, com um consumidor lento."""
+    server = MockHRISServer(n_employees=1200)
+    consumed = 0; lead = 0
+    # Consumidor lento nas duas etapas: o cálculo (em thread, o loop segue livre para os downloads) e o on_result
+    slow_compute = lambda *args: (time.sleep(0.01), compute_batch(*args))[1]
+    monkeypatch.setattr(hris_ingest, "compute_batch", slow_compute)
+    def on_result(batch):
+        nonlocal consumed, lead
+        lead = max(lead, len(server.served) - consumed)
+        time.sleep(0.01); consumed += 1
+    with server as url:
+        client = HRISClient(url, page_size=20, max_concurrency=2)
+        try: stats = asyncio.run(ingest(client, on_result, queue_size=queue_size))
+        finally: client.close()
+    assert stats["records"] == 1200
+    return lead
+
+def test_bounded_queue_applies_backpressure(monkeypatch):
+    queue_size, concurrency = 2, 2
+    # Na fila + uma página retida por worker (esperando vaga ou em voo) + a que está sendo consumida
+    assert _max_lead(monkeypatch, queue_size) <= queue_size + concurrency + 1
+    assert _max_lead(monkeypatch, 1000) > 2 * (queue_size + concurrency + 1)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from batch_io import compute_batch, synthetic_table
+from impact_analysis import TOL, _bench_rules, _delta, analyze, load_rules, net_ranges, net_ranges_many
+from piecewise import compile_net
+
+
+def _full_deltas(population, old, new):
+    batch = population.combine_chunks().to_batches()[0]
+    before = compute_batch(batch, old.tables_ext, old.br_inss, old.br_irrf); after = compute_batch(batch, new.tables_ext, new.br_inss, new.br_irrf)
+    return _delta(before, after, "net"), _delta(before, after, "employer_cost")
+
+def test_incremental_matches_full_recompute():
+    population = synthetic_table(20000, seed=3); old = load_rules()
+    for new in (_bench_rules(), _bench_rules(1.10, 1.06)): # A segunda reaproveita as tabelas compiladas de `old`
+        result = analyze(population, old, new)
+        net, cost = _full_deltas(population, old, new)
+        assert result["changed"] == int(((np.abs(net) > TOL) | (np.abs(cost) > TOL)).sum()) > 0
+        assert abs(sum(c["net_delta"] for c in result["countries"]) - net.sum()) < 1e-6
+        assert abs(sum(c["employer_cost_delta"] for c in result["countries"]) - cost.sum()) < 1e-6
+
+def test_batched_compile_matches_single():
+    old = load_rules(); new = _bench_rules()
+    groups = [(0, None), (2, None), (1, "CA"), (3, "NY")]
+    for country in ("Brasil", "Estados Unidos"):
+        batched = net_ranges_many(country, old, new, groups, 200000.0)
+        for (dependentes, state), (ranges, knots) in zip(groups, batched):
+            single_ranges, single_knots = net_ranges(country, load_rules(), _bench_rules(), dependentes, state, 200000.0)
+            assert ranges == single_ranges and np.array_equal(knots, single_knots)
+    table = old.compiled_nets("Brasil", [(2, None, None)], 200000.0)[0]
+    assert np.array_equal(table.xs, compile_net("Brasil", dependentes=2, tables_ext=old.tables_ext, br_inss_tbl=old.br_inss,
+                                                br_irrf_tbl=old.br_irrf, upper=200000.0).xs)
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from monte_carlo import simulate_employer_cost, EMP_TILE
+
+
+def _workforce(n: int, countries) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({"country": rng.choice(countries, n), "salary": rng.uniform(2000.0, 30000.0, n),
+                         "area": rng.choice(["Non Sales", "Sales"], n), "level": rng.choice(["Executive", "Director", "Others"], n)})
+
+def test_max_cells_does_not_change_results():
+    workforce = _workforce(3 * EMP_TILE, ["Brasil", "México"])
+    fx_spot = {"Brasil": 0.2, "México": 0.05}
+    base = simulate_employer_cost(workforce, 700, seed=42, fx_spot=fx_spot, max_cells=50_000_000)
+    for max_cells in (2_000_000, 300_000, 1_000):
+        pd.testing.assert_frame_equal(simulate_employer_cost(workforce, 700, seed=42, fx_spot=fx_spot, max_cells=max_cells), base, check_exact=True)
+
+def test_seed_changes_results():
+    workforce = _workforce(500, ["Brasil"])
+    a = simulate_employer_cost(workforce, 500, seed=1); b = simulate_employer_cost(workforce, 500, seed=2)
+    assert a.loc["Brasil", "P50"] != b.loc["Brasil", "P50"]
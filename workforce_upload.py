@@ -0,0 +1,337 @@
+# -------------------------------------------------------------
+# 📤 Processamento de Planilhas de Empregados Enviadas pelo App (CSV / XLSX)
+# O arquivo enviado é copiado para um temporário e processado numa thread, em
+# blocos de CHUNK_ROWS linhas: cada bloco passa por batch_io.compute_batch
+# (líquido, FGTS e custo do empregador), ganha a situação STI da linha e é
+# gravado em streaming num CSV de resultado. Só um bloco fica em memória por
+# vez, então arquivos com centenas de milhares de linhas não pesam no servidor.
+# O script do Streamlit só lê o progresso (linhas feitas, total e taxa) e pode
+# cancelar o job; poucos jobs rodam ao mesmo tempo no processo (MAX_RUNNING).
+# Sem dependência do Streamlit: no app, o job fica no st.session_state.
+#
+# Uso:
+#   python workforce_upload.py run empregados.xlsx resultado.csv
+#   python workforce_upload.py bench --rows 200000
+#
+# Colunas de entrada: as de batch_io (country, salary e, opcionais, bonus, dependents,
+# other_deductions, state) mais, opcionais, sti_area ("Non Sales"/"Sales") e sti_level.
+# Colunas acrescentadas: total_ded, net, fgts, employer_cost, sti_pct e sti_status ("in"/"out");
+# linhas com país vazio ou não suportado ficam com o resultado vazio e são contadas à parte (`skipped`).
+# CSV: separador "," (decimal com ponto) ou ";" (decimal com vírgula), em UTF-8 ou cp1252.
+# -------------------------------------------------------------
+
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+import argparse
+import codecs
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from payroll_engine import STI_RANGES, load_tables_data
+from batch_io import BatchWriter, compute_batch, peak_rss_mb, skipped_rows, synthetic_table
+
+UPLOAD_EXT = (".csv", ".xlsx")
+CHUNK_ROWS = 20_000 # Linhas por bloco processado (também a granularidade do progresso)
+CSV_BLOCK_SIZE = 4 << 20 # Bytes lidos do CSV por vez
+MAX_RUNNING = 2 # Jobs processando ao mesmo tempo no processo (todas as sessões)
+PREVIEW_ROWS = 50
+TEXT_COLUMNS = ("country", "state", "sti_area", "sti_level")
+NUMERIC_COLUMNS = ("salary", "bonus", "dependents", "other_deductions")
+STI_DEFAULT_AREA = "Non Sales"
+
+_RUNNING = threading.BoundedSemaphore(MAX_RUNNING)
+
+
+# ============================== LEITURA EM BLOCOS ==============================
+def _extension(name: str) -> str:
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in UPLOAD_EXT: raise ValueError(f"Formato não suportado: '{ext}' (use .csv ou .xlsx)")
+    return ext
+
+def _csv_encoding(path: str) -> str:
+    """utf-8 quando o arquivo inteiro decodifica como UTF-8; senão cp1252 (CSV salvo pelo Excel no Windows)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""): decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8"
+
+def _csv_header(path: str, encoding: str) -> str:
+    with open(path, "r", encoding="utf-8-sig" if encoding == "utf-8" else encoding, errors="replace") as f: return f.readline().strip()
+
+def _csv_delimiter(header: str) -> str:
+    # Planilhas exportadas em pt/es usam ";" como separador e vírgula decimal (10000,50)
+    return ";" if header.count(";") > header.count(",") else ","
+
+def count_rows(path: str) -> Optional[int]:
+    """Linhas de dados do arquivo (sem o cabeçalho); None quando não dá para saber sem ler tudo."""
+    if _extension(path) == ".csv":
+        lines = 0; last = b"\n"
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""): lines += block.count(b"\n"); last = block[-1:]
+        return max(lines + (last != b"\n") - 1, 0)
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = wb.worksheets[0].max_row
+        return rows - 1 if rows else None
+    finally:
+        wb.close()
+
+def _csv_chunks(path: str, chunk: int) -> Iterator[pa.RecordBatch]:
+    encoding = _csv_encoding(path); header = _csv_header(path, encoding); delimiter = _csv_delimiter(header)
+    columns = {c.strip().strip('"') for c in header.split(delimiter)}
+    # Tipos fixos: o leitor em streaming infere pelo 1º bloco, e uma coluna vazia no início (ex.: bonus) quebraria os blocos seguintes
+    column_types = {c: pa.string() for c in TEXT_COLUMNS if c in columns}
+    column_types.update({c: pa.float64() for c in NUMERIC_COLUMNS if c in columns})
+    convert = pa_csv.ConvertOptions(column_types=column_types, decimal_point="," if delimiter == ";" else ".")
+    try:
+        reader = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, encoding=encoding),
+                                 parse_options=pa_csv.ParseOptions(delimiter=delimiter), convert_options=convert)
+        for batch in reader:
+            for offset in range(0, batch.num_rows, chunk): yield batch.slice(offset, chunk)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Valor inválido no CSV: {e}. As colunas {', '.join(NUMERIC_COLUMNS)} devem conter apenas números "
+                         f"(sem separador de milhar; decimal com {'vírgula' if delimiter == ';' else 'ponto'}).") from e
+
+def _rows_to_batch(header: list, rows: list) -> pa.RecordBatch:
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    arrays = []
+    for name, values in zip(header, columns):
+        if name in NUMERIC_COLUMNS:
+            numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+            bad = [v for v, x in zip(values, numbers) if v is not None and str(v).strip() != "" and np.isnan(x)]
+            if bad: raise ValueError(f"Coluna '{name}' com valor não numérico: {bad[0]!r}")
+            arrays.append(pa.array(numbers, type=pa.float64()))
+        else: arrays.append(pa.array([None if v is None else str(v).strip() for v in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, names=header)
+
+def _xlsx_chunks(path: str, chunk: int) -> Iterator[pa.RecordBatch]:
+    """Primeira planilha do arquivo, linha a linha (modo read_only do openpyxl, sem carregar a pasta inteira)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ValueError("Leitura de .xlsx requer o pacote openpyxl (pip install openpyxl)") from e
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else f"col{i}" for i, h in enumerate(next(rows, ()))]
+        buffer = []
+        for row in rows:
+            if all(v is None for v in row): continue
+            buffer.append(tuple(row[:len(header)]) + (None,) * (len(header) - len(row)))
+            if len(buffer) >= chunk: yield _rows_to_batch(header, buffer); buffer = []
+        if buffer: yield _rows_to_batch(header, buffer)
+    finally:
+        wb.close()
+
+def read_chunks(path: str, chunk: int = CHUNK_ROWS) -> Iterator[pa.RecordBatch]:
+    """Blocos de até `chunk` linhas do arquivo enviado (.csv ou .xlsx)."""
+    yield from (_csv_chunks if _extension(path) == ".csv" else _xlsx_chunks)(path, chunk)
+
+
+# ============================== CÁLCULO POR BLOCO ==============================
+def _text(batch: pa.RecordBatch, name: str) -> Optional[pa.Array]:
+    idx = batch.schema.get_field_index(name)
+    return None if idx < 0 else pc.cast(batch.column(idx), pa.string())
+
+def sti_status(batch: pa.RecordBatch, tables_ext: Dict[str, Any]):
+    """(bônus / salário anual, "in"/"out") por linha, pela faixa STI de sti_area/sti_level.
+
+    Como no simulador: "Others" só tem teto; os demais níveis exigem mínimo <= % <= máximo.
+    Linhas sem nível (ou com área/nível desconhecidos) ficam com situação nula.
+    """
+    n = batch.num_rows
+    salary = pc.fill_null(batch.column("salary"), 0.0).to_numpy(zero_copy_only=False).astype(np.float64)
+    idx = batch.schema.get_field_index("bonus")
+    bonus = np.zeros(n) if idx < 0 else pc.fill_null(batch.column(idx), 0.0).to_numpy(zero_copy_only=False).astype(np.float64)
+    countries = pc.dictionary_encode(_text(batch, "country"))
+    months_by_country = tables_ext.get("REMUN_MONTHS", {})
+    months = np.array([months_by_country.get(c, 12.0) for c in countries.dictionary.to_pylist()] + [12.0])
+    annual = salary * months[pc.fill_null(countries.indices, len(countries.dictionary)).to_numpy(zero_copy_only=False)]
+    pct = np.divide(bonus, annual, out=np.zeros(n), where=annual > 0)
+
+    status = np.full(n, None, dtype=object)
+    levels = _text(batch, "sti_level")
+    if levels is None: return pct, pa.array(status, type=pa.string())
+    areas = _text(batch, "sti_area")
+    areas = pa.array([STI_DEFAULT_AREA] * n, type=pa.string()) if areas is None else pc.fill_null(areas, STI_DEFAULT_AREA)
+    # Faixa resolvida uma vez por par (área, nível) distinto, não por linha
+    pairs = pc.dictionary_encode(pc.binary_join_element_wise(areas, levels, "\x1f"))
+    lo = np.zeros(len(pairs.dictionary) + 1); hi = np.full(len(pairs.dictionary) + 1, np.nan); cap_only = np.zeros(len(lo), dtype=bool)
+    for i, key in enumerate(pairs.dictionary.to_pylist()):
+        area, level = key.split("\x1f")
+        rng = STI_RANGES.get(area, {}).get(level)
+        if not rng: continue
+        lo[i] = rng[0] or 0.0; hi[i] = rng[1] if rng[1] is not None else lo[i]; cap_only[i] = level == "Others"
+    code = pc.fill_null(pairs.indices, len(pairs.dictionary)).to_numpy(zero_copy_only=False)
+    known = ~np.isnan(hi[code])
+    inside = (pct <= hi[code] + 1e-12) & (cap_only[code] | (pct >= lo[code] - 1e-12))
+    status[known] = np.where(inside[known], "in", "out")
+    return pct, pa.array(status, type=pa.string())
+
+def process_chunk(batch: pa.RecordBatch, tables_ext: Dict[str, Any], br_inss_tbl: Dict[str, Any], br_irrf_tbl: Dict[str, Any]) -> pa.RecordBatch:
+    """Bloco de entrada + colunas de resultado de batch_io + sti_pct e sti_status."""
+    for name in ("country", "salary"):
+        if batch.schema.get_field_index(name) < 0: raise ValueError(f"Coluna obrigatória ausente: '{name}'")
+    for name in NUMERIC_COLUMNS:
+        idx = batch.schema.get_field_index(name); typ = batch.schema.field(idx).type if idx >= 0 else None
+        if typ is not None and not (pa.types.is_integer(typ) or pa.types.is_floating(typ) or pa.types.is_null(typ)):
+            raise ValueError(f"Coluna '{name}' não é numérica (tipo {typ}); use apenas números, sem separador de milhar")
+    # Siglas e níveis numéricos numa planilha (ex.: state = 1) viram texto antes do cálculo
+    arrays = [pc.cast(col, pa.string()) if name in TEXT_COLUMNS and not pa.types.is_string(col.type) else col
+              for name, col in zip(batch.schema.names, batch.columns)]
+    batch = pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+    result = compute_batch(batch, tables_ext, br_inss_tbl, br_irrf_tbl)
+    pct, status = sti_status(batch, tables_ext)
+    return pa.RecordBatch.from_arrays(result.columns + [pa.array(pct), status], names=result.schema.names + ["sti_pct", "sti_status"])
+
+
+# ================================== JOB =====================================
+class UploadJob:
+    """Processamento de um arquivo enviado numa thread; o script só consulta o progresso e pode cancelar.
+
+    Estados: "queued" (esperando vaga), "running", "done", "cancelled" ou "error" (mensagem em `error`).
+    Os arquivos ficam numa pasta temporária do job, apagada por `cleanup()` ou quando o job é coletado
+    (no app, ao fim da sessão que o guarda no st.session_state).
+    """
+
+    def __init__(self, name: str, data: BinaryIO, chunk: int = CHUNK_ROWS, workdir: str = None):
+        ext = _extension(name)
+        self.name = name; self.chunk = chunk; self.state = "queued"; self.error: Optional[str] = None
+        self.total: Optional[int] = None; self.done = 0; self.skipped = 0
+        self.summary: Dict[str, Dict[str, float]] = {}; self.preview: Optional[pd.DataFrame] = None
+        self.started = time.perf_counter(); self.finished: Optional[float] = None; self._t_run: Optional[float] = None
+        self._cancel = threading.Event()
+        self.workdir = tempfile.mkdtemp(prefix="upload_", dir=workdir)
+        self._remove_files = weakref.finalize(self, shutil.rmtree, self.workdir, ignore_errors=True)
+        self.input_path = os.path.join(self.workdir, "entrada" + ext); self.output_path = os.path.join(self.workdir, "resultado.csv")
+        self.thread = threading.Thread(target=self._run, args=(data,), name="upload", daemon=True)
+        self.thread.start()
+
+    @property
+    def running(self) -> bool:
+        return self.state in ("queued", "running")
+
+    @property
+    def elapsed(self) -> float:
+        return ((self.finished or time.perf_counter()) - self._t_run) if self._t_run else 0.0
+
+    @property
+    def rate(self) -> float:
+        """Linhas por segundo desde o início do processamento."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total: return 1.0 if self.state == "done" else None
+        return min(self.done / self.total, 1.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cleanup(self):
+        """Cancela (se ainda rodando) e remove a pasta temporária do job."""
+        self.cancel(); self.thread.join(timeout=5.0); self._remove_files()
+
+    def _run(self, data: BinaryIO):
+        while not _RUNNING.acquire(timeout=0.1):
+            if self._cancel.is_set(): self.state = "cancelled"; self.finished = time.perf_counter(); return
+        writer = None
+        try:
+            self.state = "running"; self._t_run = time.perf_counter()
+            with open(self.input_path, "wb") as f: shutil.copyfileobj(data, f, 1 << 20)
+            self.total = count_rows(self.input_path)
+            _, tables_ext, br_inss_tbl, br_irrf_tbl = load_tables_data()
+            for batch in read_chunks(self.input_path, self.chunk):
+                if self._cancel.is_set(): break
+                result = process_chunk(batch, tables_ext, br_inss_tbl, br_irrf_tbl)
+                if writer is None:
+                    writer = BatchWriter(self.output_path, result.schema)
+                    self.preview = result.slice(0, PREVIEW_ROWS).to_pandas()
+                writer.write(result); self._summarize(result)
+                self.done += result.num_rows; self.skipped += skipped_rows(result)
+            self.state = "cancelled" if self._cancel.is_set() else "done"
+        except Exception as e:
+            self.state = "error"; self.error = str(e)
+        finally:
+            if writer is not None: writer.close()
+            _RUNNING.release(); self.finished = time.perf_counter()
+            # Só o resultado de um job concluído fica para download
+            for path in (self.input_path,) if self.state == "done" else (self.input_path, self.output_path):
+                if os.path.exists(path): os.remove(path)
+
+    def _summarize(self, result: pa.RecordBatch):
+        table = pa.Table.from_batches([result]).append_column("sti_out", pc.cast(pc.equal(result.column("sti_status"), "out"), pa.int64()))
+        grouped = table.group_by("country").aggregate([("net", "count"), ("net", "sum"), ("employer_cost", "sum"), ("sti_out", "sum")])
+        for row in grouped.to_pylist():
+            if not row["net_count"]: continue # País vazio ou não suportado: só entra em `skipped`
+            acc = self.summary.setdefault(row["country"], {"rows": 0, "net": 0.0, "employer_cost": 0.0, "sti_out": 0})
+            acc["rows"] += row["net_count"]; acc["net"] += row["net_sum"] or 0.0
+            acc["employer_cost"] += row["employer_cost_sum"] or 0.0; acc["sti_out"] += row["sti_out_sum"] or 0
+
+
+def wait(job: UploadJob, poll: float = 0.5, progress: bool = False) -> UploadJob:
+    while job.running:
+        if progress and job.state == "running": print(f"\r{job.done:,}/{job.total or '?'} linhas  {job.rate:,.0f} linhas/s", end="", flush=True)
+        time.sleep(poll)
+    if progress: print()
+    return job
+
+
+# ======================== BENCHMARK (ARQUIVO SINTÉTICO) =========================
+def benchmark(n_rows: int = 200_000, fmt: str = "csv", workdir: str = None) -> Dict[str, Any]:
+    """Processa um arquivo sintético de `n_rows` linhas como se tivesse sido enviado pelo app."""
+    table = synthetic_table(n_rows)
+    levels = np.array(list(STI_RANGES.get(STI_DEFAULT_AREA, {})) or ["Others"])
+    table = table.append_column("sti_level", pa.array(levels[np.random.default_rng(7).integers(0, len(levels), n_rows)]))
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        src = os.path.join(tmp, "empregados." + fmt)
+        if fmt == "csv": pa_csv.write_csv(table, src)
+        else: table.to_pandas().to_excel(src, index=False)
+        input_mb = os.path.getsize(src) / 2**20; del table
+        with open(src, "rb") as data: job = wait(UploadJob(src, data, workdir=tmp))
+        if job.state != "done": raise RuntimeError(job.error or job.state)
+        out_mb = os.path.getsize(job.output_path) / 2**20; job.cleanup()
+    return {"rows": job.done, "seconds": job.elapsed, "rows_per_s": job.rate, "input_mb": input_mb, "output_mb": out_mb,
+            "peak_mb": peak_rss_mb()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Líquido, custo do empregador e situação STI de uma planilha de empregados (.csv ou .xlsx).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="Processa uma planilha e grava o resultado em CSV")
+    run.add_argument("input"); run.add_argument("output")
+    run.add_argument("--chunk", type=int, default=CHUNK_ROWS)
+    bench = sub.add_parser("bench", help="Processa uma planilha sintética")
+    bench.add_argument("--rows", type=int, default=200_000); bench.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+    bench.add_argument("--workdir", default=None)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        with open(args.input, "rb") as data: job = wait(UploadJob(args.input, data, args.chunk), progress=True)
+        if job.state != "done": raise SystemExit(f"Falha: {job.error or job.state}")
+        shutil.move(job.output_path, args.output)
+        print(f"{job.done:,} linhas em {job.elapsed:.2f}s ({job.rate:,.0f} linhas/s) -> {args.output}")
+        if job.skipped: print(f"{job.skipped:,} linhas com país vazio ou não suportado ficaram sem resultado")
+    else:
+        r = benchmark(args.rows, args.format, args.workdir)
+        peak = "n/d" if r["peak_mb"] is None else f"{r['peak_mb']:.0f} MB"
+        print(f"{r['rows']:,} linhas em {r['seconds']:.2f}s: {r['rows_per_s']:,.0f} linhas/s | entrada {r['input_mb']:.1f} MB, "
+              f"saída {r['output_mb']:.1f} MB | pico de memória {peak}")
+
+
+if __name__ == "__main__":
+    main()